@@ -14,11 +14,36 @@
 """
 
 import re
+import sys
+import hashlib
+from functools import lru_cache
+from pathlib import Path
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+_DIGITS_TABLE = str.maketrans('', '', '0123456789')
+# Признак возможного индикаторного поля в строке без цифр: 'as5-' -> 's-', 'p1h-' -> 'h-',
+# плюс bs/wa/pd. Нет совпадения - в исходной строке нет ни одного поля
+_FIELD_MARKER_RE = re.compile(r'[a-zA-Z]-|\b(?:bs|wa|pd)\b')
+
+# Кэш результатов парсинга между запусками (ключ - содержимое лога и версия парсера)
+PARSE_CACHE_DIR = Path('results') / '.cache'
+
+# Фиксированные регулярные выражения компилируются один раз при импорте
+_VOLUME_RE = re.compile(r'\|([0-9.]+)K\|')
+_RANGE_RE = re.compile(r'rng:([0-9.]+)')
+# 3.33, -4.12, --7.19 - одна альтернатива вместо перебора шаблонов
+_NUMERIC_VALUE_RE = re.compile(r'^(?:--?)?\d+(?:\.\d+)?$')
+
+
+@lru_cache(maxsize=None)
+def _compiled(pattern: str) -> 're.Pattern':
+    """Скомпилированный шаблон из field_patterns/metadata_patterns (словари можно подменять снаружи)"""
+    return re.compile(pattern)
+
+
 class AdvancedLogParser:
     """
     ИСПРАВЛЕННЫЙ парсер для извлечения ВСЕХ полей из финансовых логов
@@ -30,6 +55,8 @@ class AdvancedLogParser:
         self.metadata_patterns = self._create_metadata_patterns()
         self.parsed_data = []
         self.field_statistics = {}
+        self._template_cache: Dict[str, bool] = {}
+        self._template_hits = 0
         
     def _create_field_patterns(self) -> Dict[str, str]:
         """Создание ИСПРАВЛЕННЫХ паттернов для извлечения полей"""
@@ -98,6 +125,7 @@ class AdvancedLogParser:
         print(f"📋 Найдено {len(lines)} строк")
         
         parsed_records = []
+        self._template_hits = 0
         
         for i, line in enumerate(lines):
             try:
@@ -118,6 +146,8 @@ class AdvancedLogParser:
             return pd.DataFrame()
         
         df = pd.DataFrame(parsed_records)
+        print(f"🧩 Кэш шаблонов: {len(self._template_cache)} шаблонов, "
+              f"попаданий {self._template_hits}/{len(lines)}")
         
         # Статистика извлеченных полей
         self._generate_parsing_statistics(df)
@@ -125,6 +155,61 @@ class AdvancedLogParser:
         print(f"✅ Извлечено {len(df)} записей с {len(df.columns)} полями")
         return df
     
+    def parse_log_file_cached(self, file_path: str, use_cache: bool = True) -> pd.DataFrame:
+        """
+        parse_log_file с кэшем результата в results/.cache
+        
+        Один и тот же лог разбирается один раз для main.py, скальп- и дамп/памп-анализатора.
+        
+        Args:
+            file_path: путь к файлу лога
+            use_cache: брать результат из кэша, если лог и парсер не менялись
+                       (False - всегда парсить заново и обновить кэш)
+        """
+        cache_path = PARSE_CACHE_DIR / f"{self._parse_cache_key(file_path)}.pkl"
+        df = self._load_parse_cache(cache_path) if use_cache else None
+        if df is None:
+            df = self.parse_log_file(file_path)
+            if not df.empty:
+                self._save_parse_cache(cache_path, df)
+        return df
+    
+    def _parse_cache_key(self, file_path: str) -> str:
+        """Хеш содержимого лога + исходного кода и паттернов парсера"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        
+        # Паттерны берутся с экземпляра: main.py подменяет их перед парсингом
+        digest.update(Path(sys.modules[type(self).__module__].__file__).read_bytes())
+        digest.update(repr((self.field_patterns, self.metadata_patterns)).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _load_parse_cache(self, cache_path: Path) -> Optional[pd.DataFrame]:
+        """DataFrame из кэша парсинга или None"""
+        if not cache_path.exists():
+            return None
+        
+        try:
+            df = pd.read_pickle(cache_path)
+        except Exception as e:
+            print(f"⚠️ Кэш парсинга не прочитан ({e}), парсим заново")
+            return None
+        
+        print(f"💾 Результат парсинга из кэша: {cache_path}")
+        return df
+    
+    def _save_parse_cache(self, cache_path: Path, df: pd.DataFrame) -> None:
+        """Сохранение результата парсинга (через временный файл - без полузаписанного кэша)"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            df.to_pickle(tmp_path)
+            tmp_path.replace(cache_path)
+        except Exception as e:
+            print(f"⚠️ Кэш парсинга не сохранен: {e}")
+    
     def _parse_single_line(self, line: str, line_num: int) -> Optional[Dict]:
         """Парсинг одной строки лога"""
         if not line or line.startswith('#'):
@@ -136,8 +221,23 @@ class AdvancedLogParser:
         metadata = self._extract_metadata(line)
         record.update(metadata)
         
+        # Ключ шаблона: все до последнего '|' без цифр (строки одного события
+        # отличаются только числами). В кэше - признак того, что индикаторные
+        # поля шаблона находятся только в последнем токене. Признак считается
+        # по самому ключу, а не по первой строке шаблона: цифры в имени поля
+        # (as5 / as15) ключ не различает, поэтому результат разбора первой
+        # строки на другие строки шаблона переносить нельзя
+        head, _, tail = line.rpartition('|')
+        key = head.translate(_DIGITS_TABLE)
+        tail_only = self._template_cache.get(key)
+        if tail_only is None:
+            tail_only = bool(head) and _FIELD_MARKER_RE.search(key) is None
+            self._template_cache[key] = tail_only
+        else:
+            self._template_hits += 1
+        
         # Извлечение ВСЕХ индикаторных полей
-        indicator_fields = self._extract_all_indicator_fields(line)
+        indicator_fields = self._extract_all_indicator_fields(tail if tail_only else line)
         record.update(indicator_fields)
         
         return record
@@ -147,12 +247,12 @@ class AdvancedLogParser:
         metadata = {}
         
         # Timestamp
-        ts_match = re.search(self.metadata_patterns['timestamp'], line)
+        ts_match = _compiled(self.metadata_patterns['timestamp']).search(line)
         if ts_match:
             metadata['timestamp'] = ts_match.group(1)
         
         # OHLC
-        ohlc_match = re.search(self.metadata_patterns['ohlc'], line)
+        ohlc_match = _compiled(self.metadata_patterns['ohlc']).search(line)
         if ohlc_match:
             metadata['open'] = float(ohlc_match.group(1))
             metadata['high'] = float(ohlc_match.group(2))
@@ -160,12 +260,12 @@ class AdvancedLogParser:
             metadata['close'] = float(ohlc_match.group(4))
         
         # Volume
-        vol_match = re.search(r'\|([0-9.]+)K\|', line)
+        vol_match = _VOLUME_RE.search(line)
         if vol_match:
             metadata['volume'] = float(vol_match.group(1))
         
         # Range
-        rng_match = re.search(r'rng:([0-9.]+)', line)
+        rng_match = _RANGE_RE.search(line)
         if rng_match:
             metadata['range'] = float(rng_match.group(1))
         
@@ -195,7 +295,7 @@ class AdvancedLogParser:
         fields = {}
         
         # Универсальное извлечение всех полей формата prefix+suffix-value
-        universal_matches = re.findall(self.field_patterns['universal_field'], line)
+        universal_matches = _compiled(self.field_patterns['universal_field']).findall(line)
         
         for prefix, suffix, value in universal_matches:
             field_name = f"{prefix}{suffix}"
@@ -236,7 +336,7 @@ class AdvancedLogParser:
                     fields[field_name] = value
         
         # Специальные HTF поля (bs, wa, pd)
-        special_matches = re.findall(self.field_patterns['special_htf'], line)
+        special_matches = _compiled(self.field_patterns['special_htf']).findall(line)
         for field, value in special_matches:
             if field in self.special_htf_fields:
                 fields[field] = value if value else 1  # 1 если просто присутствует
@@ -244,14 +344,14 @@ class AdvancedLogParser:
         
         # Контекст зрелости (progress поля)
         # LTF progress
-        p_ltf_matches = re.findall(self.field_patterns['progress_ltf'], line)
+        p_ltf_matches = _compiled(self.field_patterns['progress_ltf']).findall(line)
         for suffix, value in p_ltf_matches:
             field_name = f"p{suffix}"
             fields[field_name] = float(value)
             fields[f"{field_name}_type"] = 'LTF_PROGRESS'
         
         # HTF progress 
-        p_htf_matches = re.findall(self.field_patterns['progress_htf'], line)
+        p_htf_matches = _compiled(self.field_patterns['progress_htf']).findall(line)
         for suffix, value in p_htf_matches:
             field_name = f"p{suffix}"
             fields[field_name] = float(value)
@@ -264,17 +364,8 @@ class AdvancedLogParser:
         # Убираем % если есть
         clean_value = value.replace('%', '')
         
-        # Проверяем паттерны числовых значений
-        numeric_patterns = [
-            r'^-?\d+(?:\.\d+)?$',      # 3.33, -4.12
-            r'^--\d+(?:\.\d+)?$',      # --7.19, --4.12
-        ]
-        
-        for pattern in numeric_patterns:
-            if re.match(pattern, clean_value):
-                return True
-        
-        return False
+        # Проверяем паттерн числовых значений
+        return _NUMERIC_VALUE_RE.match(clean_value) is not None
     
     def _parse_numeric_value(self, value: str) -> float:
         """Парсит числовое значение из строки"""
@@ -22,6 +22,30 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
+# Быстрая сериализация JSON (numpy-скаляры кодируются в C) - если установлен orjson
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _write_json(obj, path: Path) -> None:
+    """
+    Запись JSON результатов: orjson или стандартный json
+    
+    Неподдерживаемые типы (Timestamp и т.п.) в обоих случаях пишутся через str.
+    NaN в orjson становится null (валидный JSON).
+    """
+    if ORJSON_AVAILABLE:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        path.write_bytes(orjson.dumps(obj, default=str, option=options))
+        return
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f, indent=2, ensure_ascii=False, default=str)
+
+
 class DumpPumpAnalyzer:
     """Анализатор паттернов для контртрендового скальпинга"""
     
@@ -31,12 +55,16 @@ class DumpPumpAnalyzer:
         self.events = []
         self.patterns = {}
         
+        # Цены high/low как float64-массивы - один раз на detect_events, не на каждое событие
+        self._high_prices = None
+        self._low_prices = None
+        
     def load_and_parse_data(self, file_path: str) -> pd.DataFrame:
         """Загрузка и парсинг данных"""
         print("🔄 Загрузка и парсинг данных...")
         
         # Парсинг данных
-        self.data = self.parser.parse_log_file(file_path)
+        self.data = self.parser.parse_log_file_cached(file_path)
         
         if self.data.empty:
             raise ValueError("❌ Не удалось загрузить данные")
@@ -87,6 +115,8 @@ class DumpPumpAnalyzer:
             return []
         
         events = []
+        self._high_prices = self.data['high'].to_numpy(dtype=np.float64)
+        self._low_prices = self.data['low'].to_numpy(dtype=np.float64)
         
         # Находим локальные минимумы и максимумы
         lows = self.data[self.data['is_local_low'] == True].copy()
@@ -125,16 +155,16 @@ class DumpPumpAnalyzer:
     def _analyze_low_event(self, idx: int, low_row: pd.Series) -> Optional[Dict]:
         """Анализ лои: дамп с откатом или продолжение падения"""
         
-        # Ищем следующие 30 записей после лои
-        next_data = self.data.iloc[idx:idx+30].copy() if idx+30 < len(self.data) else self.data.iloc[idx:].copy()
+        # Ищем следующие 30 записей после лои - позиционный срез массива, без копии DataFrame
+        next_highs = self._high_prices[idx:idx + 30]
         
-        if len(next_data) < 5:
+        if len(next_highs) < 5:
             return None
         
         low_price = low_row['low']
         
-        # Ищем максимальный отскок после лои
-        max_high_after = next_data['high'].max()
+        # Ищем максимальный отскок после лои (fmax пропускает NaN, как Series.max)
+        max_high_after = np.fmax.reduce(next_highs)
         rebound_pct = ((max_high_after - low_price) / low_price) * 100
         
         # Определяем тип события
@@ -164,16 +194,16 @@ class DumpPumpAnalyzer:
     def _analyze_high_event(self, idx: int, high_row: pd.Series) -> Optional[Dict]:
         """Анализ хаи: памп с откатом или продолжение роста"""
         
-        # Ищем следующие 30 записей после хаи
-        next_data = self.data.iloc[idx:idx+30].copy() if idx+30 < len(self.data) else self.data.iloc[idx:].copy()
+        # Ищем следующие 30 записей после хаи - позиционный срез массива, без копии DataFrame
+        next_lows = self._low_prices[idx:idx + 30]
         
-        if len(next_data) < 5:
+        if len(next_lows) < 5:
             return None
         
         high_price = high_row['high']
         
-        # Ищем минимальный откат после хаи
-        min_low_after = next_data['low'].min()
+        # Ищем минимальный откат после хаи (fmin пропускает NaN, как Series.min)
+        min_low_after = np.fmin.reduce(next_lows)
         decline_pct = ((high_price - min_low_after) / high_price) * 100
         
         # Определяем тип события
@@ -479,29 +509,25 @@ class DumpPumpAnalyzer:
         
         # Сохраняем паттерны
         if self.patterns:
-            with open(output_path / "patterns_analysis.json", 'w', encoding='utf-8') as f:
-                json.dump(self.patterns, f, indent=2, ensure_ascii=False, default=str)
+            _write_json(self.patterns, output_path / "patterns_analysis.json")
             print(f"   ✅ Сохранен анализ паттернов")
         
         # Создаем простые таблицы
         simple_tables = self.generate_simple_tables()
         if simple_tables:
-            with open(output_path / "simple_tables.json", 'w', encoding='utf-8') as f:
-                json.dump(simple_tables, f, indent=2, ensure_ascii=False, default=str)
+            _write_json(simple_tables, output_path / "simple_tables.json")
             print(f"   ✅ Сохранены простые таблицы")
         
         # Дискриминативные паттерны
         discriminative = self.find_discriminative_patterns()
         if discriminative:
-            with open(output_path / "discriminative_patterns.json", 'w', encoding='utf-8') as f:
-                json.dump(discriminative, f, indent=2, ensure_ascii=False, default=str)
+            _write_json(discriminative, output_path / "discriminative_patterns.json")
             print(f"   ✅ Сохранены дискриминативные паттерны")
         
         # VETO паттерны
         veto_patterns = self.find_veto_patterns()
         if veto_patterns:
-            with open(output_path / "veto_patterns.json", 'w', encoding='utf-8') as f:
-                json.dump(veto_patterns, f, indent=2, ensure_ascii=False, default=str)
+            _write_json(veto_patterns, output_path / "veto_patterns.json")
             print(f"   ✅ Сохранены VETO паттерны")
         
         # Создаем понятный отчет
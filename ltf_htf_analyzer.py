@@ -22,6 +22,18 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import classification_report, roc_auc_score, precision_recall_curve
 
+# Регулярные выражения компилируются один раз на модуль, а не на каждую строку лога
+_BRACKETED_LINE_RE = re.compile(r'\[([^\]]+)\]:\s*(.+)')
+_OHLC_RE = re.compile(r'o:([\d.]+).*?h:([\d.]+).*?l:([\d.]+).*?c:([\d.]+)')
+_RANGE_RE = re.compile(r'rng:([\d.]+)')
+_OHLC_RNG_RE = re.compile(r'o:[\d.]+\|h:[\d.]+\|l:[\d.]+\|c:[\d.]+\|rng:[\d.]+\|?')
+_NUMBER_RE = re.compile(r'[+-]?\d*\.?\d+')
+# Штатная раскладка хвоста свечи: o:|h:|l:|c:|rng:|поля (одно совпадение вместо трех проходов)
+_FIXED_OHLC_RE = re.compile(r'o:([\d.]+)\|h:([\d.]+)\|l:([\d.]+)\|c:([\d.]+)\|rng:([\d.]+)(?:\|(.*))?', re.DOTALL)
+
+# Строковые колонки записей с малым числом уникальных значений -> category
+_CATEGORICAL_COLUMNS = ('log_type', 'event_name', 'timeframe', 'color', 'candle_type', 'data_source')
+
 
 class LTFHTFAnalyzer:
     """
@@ -122,6 +134,7 @@ class LTFHTFAnalyzer:
         
         ltf_records = []
         htf_records = []
+        self._field_columns = set()
         
         with open(file_path, 'r', encoding='utf-8') as f:
             for line_num, line in enumerate(f, 1):
@@ -153,9 +166,9 @@ class LTFHTFAnalyzer:
                     print(f"⚠️ Ошибка парсинга строки {line_num}: {e}")
                     continue
         
-        # Создание DataFrame
-        self.ltf_data = pd.DataFrame(ltf_records) if ltf_records else pd.DataFrame()
-        self.htf_data = pd.DataFrame(htf_records) if htf_records else pd.DataFrame()
+        # Создание DataFrame (сырые значения полей и время конвертируются одним проходом)
+        self.ltf_data = self._convert_record_columns(ltf_records) if ltf_records else pd.DataFrame()
+        self.htf_data = self._convert_record_columns(htf_records) if htf_records else pd.DataFrame()
         
         print(f"✅ Парсинг завершен:")
         print(f"   LTF записей: {len(self.ltf_data)}")
@@ -181,7 +194,7 @@ class LTFHTFAnalyzer:
     def _parse_bracketed_format(self, line, line_num):
         """Парсинг формата [timestamp]: LTF|event_name|..."""
         try:
-            match = re.match(r'\[([^\]]+)\]:\s*(.+)', line)
+            match = _BRACKETED_LINE_RE.match(line)
             if not match:
                 return None, None
             
@@ -201,7 +214,7 @@ class LTFHTFAnalyzer:
             candle_data, field_data = self._parse_candle_and_fields(candle_part)
             
             record = {
-                'log_timestamp': pd.to_datetime(timestamp_str),
+                'log_timestamp': timestamp_str,
                 'log_type': log_type,
                 'event_name': event_name,
                 'timeframe': tf,
@@ -261,12 +274,11 @@ class LTFHTFAnalyzer:
                     if '-' in item:
                         field_parts = item.split('-', 1)
                         if len(field_parts) == 2:
-                            field_name = field_parts[0]
-                            field_value = self._parse_field_value(field_parts[1])
-                            field_data[field_name] = field_value
+                            field_data[field_parts[0]] = field_parts[1]
+            self._field_columns.update(field_data)
             
             record = {
-                'log_timestamp': pd.to_datetime(event_timestamp),
+                'log_timestamp': event_timestamp,
                 'log_type': log_type,
                 'event_name': event_name,
                 'timeframe': tf,
@@ -295,7 +307,7 @@ class LTFHTFAnalyzer:
                     candle_data, field_data = self._parse_candle_and_fields(candle_part)
                     
                     record = {
-                        'log_timestamp': pd.to_datetime('now'),
+                        'log_timestamp': 'now',
                         'log_type': 'MIXED',
                         'event_name': parts[0] if len(parts) > 0 else 'unknown',
                         'timeframe': '1',
@@ -372,9 +384,21 @@ class LTFHTFAnalyzer:
         # Объединение всех оставшихся частей для парсинга полей
         remaining_data = '|'.join(parts[6:]) if len(parts) > 6 else ''
         
+        # Быстрый путь: штатная раскладка целиком одним fullmatch. Второй блок rng: в полях
+        # (его тоже вырезал бы sub ниже) - только через общий путь
+        fixed = _FIXED_OHLC_RE.fullmatch(remaining_data)
+        if fixed is not None and 'rng:' not in (fixed.group(6) or ''):
+            open_, high, low, close, range_ = fixed.group(1, 2, 3, 4, 5)
+            candle_data['open'] = float(open_)
+            candle_data['high'] = float(high)
+            candle_data['low'] = float(low)
+            candle_data['close'] = float(close)
+            candle_data['range'] = float(range_)
+            self._split_fields(fixed.group(6), field_data)
+            return candle_data, field_data
+        
         # Парсинг OHLC данных
-        ohlc_pattern = r'o:([\d.]+).*?h:([\d.]+).*?l:([\d.]+).*?c:([\d.]+)'
-        ohlc_match = re.search(ohlc_pattern, remaining_data)
+        ohlc_match = _OHLC_RE.search(remaining_data)
         if ohlc_match:
             candle_data['open'] = float(ohlc_match.group(1))
             candle_data['high'] = float(ohlc_match.group(2))
@@ -382,19 +406,19 @@ class LTFHTFAnalyzer:
             candle_data['close'] = float(ohlc_match.group(4))
         
         # Парсинг range
-        rng_pattern = r'rng:([\d.]+)'
-        rng_match = re.search(rng_pattern, remaining_data)
+        rng_match = _RANGE_RE.search(remaining_data)
         if rng_match:
             candle_data['range'] = float(rng_match.group(1))
         
         # Парсинг полей
-        ohlc_rng_pattern = r'o:[\d.]+\|h:[\d.]+\|l:[\d.]+\|c:[\d.]+\|rng:[\d.]+\|?'
-        field_part = re.sub(ohlc_rng_pattern, '', remaining_data)
-        
+        field_part = _OHLC_RNG_RE.sub('', remaining_data)
+        self._split_fields(field_part, field_data)
+        return candle_data, field_data
+    
+    def _split_fields(self, field_part, field_data):
+        """Поля 'имя-значение' через ',' или '|' -> field_data (значения - строки до _convert_field_columns)"""
         if field_part:
-            field_items = field_part.replace('|', ',').split(',')
-            
-            for item in field_items:
+            for item in field_part.replace('|', ',').split(','):
                 item = item.strip()
                 if not item:
                     continue
@@ -402,12 +426,9 @@ class LTFHTFAnalyzer:
                 if '-' in item:
                     parts_field = item.split('-', 1)
                     if len(parts_field) == 2:
-                        field_name = parts_field[0]
-                        field_value = parts_field[1]
-                        parsed_value = self._parse_field_value(field_value)
-                        field_data[field_name] = parsed_value
+                        field_data[parts_field[0]] = parts_field[1]
         
-        return candle_data, field_data
+        self._field_columns.update(field_data)
     
     def _parse_percentage(self, value_str):
         """Парсинг процентных значений"""
@@ -424,50 +445,93 @@ class LTFHTFAnalyzer:
             return float(volume_str.replace('M', '')) * 1000000
         return float(volume_str) if volume_str.replace('.', '').isdigit() else 0
     
-    def _parse_field_value(self, value_str):
-        """Универсальный парсер значений полей"""
-        if not value_str or value_str == '':
-            return 0.0
-            
-        clean_value = str(value_str).replace('%', '').replace('σ', '')
+    def _convert_record_columns(self, records):
+        """
+        DataFrame из записей с векторной конвертацией сырых колонок: время, значения полей, категории
+        
+        Время конвертируется до построения фрейма: записи с некорректным временем
+        отбрасываются заранее и не влияют на набор и порядок колонок полей
+        """
+        timestamps, valid = self._convert_timestamps(pd.Series([record['log_timestamp'] for record in records]))
+        if valid is not None:
+            records = [record for record, is_valid in zip(records, valid) if is_valid]
+            if not records:
+                return pd.DataFrame()
+        
+        df = pd.DataFrame(records)
+        df['log_timestamp'] = timestamps
+        df = self._convert_field_columns(df)
+        
+        # Коды + словарь вместо object-колонки Python-строк: в разы меньше памяти,
+        # сравнения и фильтры идут по целочисленным кодам
+        for col in _CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        return df
+    
+    def _convert_timestamps(self, raw):
+        """
+        Конвертация сырых меток времени одним pd.to_datetime (формат определяется по первым значениям,
+        повторы берутся из кэша). Смешанные форматы/часовые пояса - поштучно по уникальным значениям,
+        строки с некорректным временем отбрасываются, как и при построчном парсинге
+        
+        Returns:
+            (время корректных строк, маска корректных строк или None, если корректны все)
+        """
+        try:
+            return pd.to_datetime(raw, cache=True), None
+        except (ValueError, TypeError, OverflowError):
+            pass
+        
+        parsed = {}
+        for value in pd.unique(raw):
+            try:
+                parsed[value] = pd.to_datetime(value)
+            except (ValueError, TypeError, OverflowError) as e:
+                print(f"⚠️ Некорректное время '{value}': {e}")
+        
+        valid = raw.isin(list(parsed))
+        return pd.Series([parsed[value] for value in raw[valid]]), valid.to_numpy()
+    
+    def _convert_field_columns(self, df):
+        """Конвертация сырых значений полей в числа одним векторным проходом"""
+        columns = [col for col in df.columns if col in self._field_columns]
+        if not columns:
+            return df
+        
+        # Длинный формат (row_id, name) -> raw_value. Пропуски отбрасываются явно:
+        # stack() в pandas >= 3 их сохраняет, а поле, которого нет в строке,
+        # должно остаться NaN, а не стать 0.0
+        raw_values = df[columns].stack().dropna()
+        if raw_values.empty:
+            df[columns] = np.nan
+            return df
+        
+        values = self._parse_field_values(raw_values.astype(str)).unstack()
+        df[columns] = values.reindex(index=df.index, columns=columns)
+        return df
+    
+    @staticmethod
+    def _parse_field_values(raw_values):
+        """Универсальный векторный парсер значений полей"""
+        clean = raw_values.str.replace('%', '', regex=False).str.replace('σ', '', regex=False)
         
         # Обработка восклицательных знаков
-        if '!!!' in clean_value:
-            clean_value = clean_value.replace('!!!', '')
-            multiplier = 3.0
-        elif '!!' in clean_value:
-            clean_value = clean_value.replace('!!', '')
-            multiplier = 2.0
-        elif '!' in clean_value:
-            clean_value = clean_value.replace('!', '')
-            multiplier = 1.5
-        else:
-            multiplier = 1.0
+        has_3 = clean.str.contains('!!!', regex=False)
+        has_2 = ~has_3 & clean.str.contains('!!', regex=False)
+        has_1 = ~has_3 & ~has_2 & clean.str.contains('!', regex=False)
+        multiplier = np.select([has_3, has_2, has_1], [3.0, 2.0, 1.5], default=1.0)
+        for mask, signal in ((has_3, '!!!'), (has_2, '!!'), (has_1, '!')):
+            if mask.any():
+                clean[mask] = clean[mask].str.replace(signal, '', regex=False)
         
         # Обработка суффиксов времени
         for suffix in ['_24h', '_1h', '_4h', '_1d', '_1w']:
-            clean_value = clean_value.replace(suffix, '')
+            clean = clean.str.replace(suffix, '', regex=False)
         
-        if not clean_value or clean_value in ['', '-', '+', '.']:
-            return 0.0
-        
-        try:
-            numeric_pattern = r'^[+-]?\d*\.?\d+$'
-            if re.match(numeric_pattern, clean_value):
-                if '.' in clean_value:
-                    result = float(clean_value) * multiplier
-                else:
-                    result = int(clean_value) * multiplier
-                return result
-            else:
-                number_pattern = r'[+-]?\d*\.?\d+'
-                number_match = re.search(number_pattern, clean_value)
-                if number_match:
-                    return float(number_match.group()) * multiplier
-                else:
-                    return 0.0
-        except (ValueError, TypeError):
-            return 0.0
+        # Первое число в строке (для чистых чисел - вся строка), иначе 0
+        numbers = pd.to_numeric(clean.str.extract(r'([+-]?\d*\.?\d+)', expand=False), errors='coerce')
+        return (numbers * multiplier).fillna(0.0)
     
     def analyze_temporal_lags_fixed(self, data, field_groups, type_name):
         """
@@ -479,7 +543,9 @@ class LTFHTFAnalyzer:
         if data is None or len(data) == 0:
             return {}
         
-        df = data.copy()
+        # Поверхностная копия: ниже колонки только добавляются/заменяются целиком,
+        # поэтому исходный фрейм не меняется, а данные не дублируются
+        df = data.copy(deep=False)
         
         # Сначала определяем события если их нет
         if 'is_event' not in df.columns:
@@ -576,10 +642,10 @@ class LTFHTFAnalyzer:
         df['price_change_abs'] = df['price_change_abs'].fillna(0)
         df['volume_log'] = df['volume_log'].replace([np.inf, -np.inf], 0).fillna(0)
         
-        # Статистические пороги
-        vol_threshold = df['price_volatility'].quantile(0.8)
-        change_threshold = df['price_change_abs'].quantile(0.8)
-        volume_threshold = df['volume_log'].quantile(0.8)
+        # Статистические пороги: один np.quantile (introselect по столбцам) вместо трех Series.quantile
+        vol_threshold, change_threshold, volume_threshold = np.quantile(
+            df[['price_volatility', 'price_change_abs', 'volume_log']].to_numpy(dtype=np.float64), 0.8, axis=0
+        )
         
         # Определение событий
         df['is_event'] = (
@@ -609,8 +675,7 @@ class LTFHTFAnalyzer:
                             elif isinstance(value, str):
                                 # Попытка извлечь число из строки
                                 clean_value = value.replace('%', '').replace('σ', '').replace('!', '')
-                                number_pattern = r'[+-]?\d*\.?\d+'
-                                number_match = re.search(number_pattern, clean_value)
+                                number_match = _NUMBER_RE.search(clean_value)
                                 if number_match:
                                     numeric_value = abs(float(number_match.group()))
                                 else:
@@ -638,7 +703,7 @@ class LTFHTFAnalyzer:
             return {}
         
         # Определение событий
-        ltf_with_events = self._detect_events_for_data(self.ltf_data.copy())
+        ltf_with_events = self._detect_events_for_data(self.ltf_data.copy(deep=False))
         
         # Исправленный анализ временных лагов
         ltf_lags = self.analyze_temporal_lags_fixed(
@@ -687,7 +752,7 @@ class LTFHTFAnalyzer:
             return {}
         
         # Определение событий
-        htf_with_events = self._detect_events_for_data(self.htf_data.copy())
+        htf_with_events = self._detect_events_for_data(self.htf_data.copy(deep=False))
         
         # Исправленный анализ временных лагов
         htf_lags = self.analyze_temporal_lags_fixed(
@@ -731,7 +796,7 @@ class LTFHTFAnalyzer:
         """Построение признаков для конкретного типа"""
         print(f"🔧 Построение признаков для {type_name}...")
         
-        df = data.copy()
+        df = data.copy(deep=False)  # Колонки заменяются целиком - глубокая копия не нужна
         feature_columns = []
         
         # Базовые ценовые признаки
@@ -823,21 +888,23 @@ class LTFHTFAnalyzer:
         print(f"🎯 Поиск порогов для {type_name}...")
         
         threshold_results = {}
+        events = data['is_event'].to_numpy()
         
         for feature in features.columns:
             try:
                 feature_data = pd.to_numeric(features[feature], errors='coerce').fillna(0)
-                events = data['is_event']
                 
                 if feature_data.std() < 0.01:
                     continue
                 
-                thresholds = np.percentile(feature_data, np.arange(10, 100, 10))
+                values = feature_data.to_numpy(dtype=np.float64)
+                abs_values = np.abs(values)  # Один раз на признак, а не на каждый порог
+                thresholds = np.percentile(values, np.arange(10, 100, 10))
                 best_threshold = None
                 best_score = 0
                 
                 for threshold in thresholds:
-                    binary_feature = (abs(feature_data) > threshold).astype(int)
+                    binary_feature = (abs_values > threshold).astype(np.int8)
                     
                     if binary_feature.sum() > 10:
                         try:
@@ -852,7 +919,7 @@ class LTFHTFAnalyzer:
                     threshold_results[feature] = {
                         'threshold': best_threshold,
                         'roc_auc': best_score,
-                        'activation_rate': (abs(feature_data) > best_threshold).mean()
+                        'activation_rate': (abs_values > best_threshold).mean()
                     }
             except Exception:
                 continue
@@ -867,30 +934,29 @@ class LTFHTFAnalyzer:
         if not thresholds:
             return None
         
-        scoring_features = []
-        feature_weights = {}
+        threshold_features = [feature for feature in thresholds if feature in features.columns]
+        scoring_features = [f"{feature}_activated" for feature in threshold_features]
+        feature_weights = {binary_col: thresholds[feature]['roc_auc']
+                           for feature, binary_col in zip(threshold_features, scoring_features)}
         
-        for feature, threshold_info in thresholds.items():
-            if feature in features.columns:
-                try:
-                    binary_col = f"{feature}_activated"
-                    feature_data = pd.to_numeric(features[feature], errors='coerce').fillna(0)
-                    features[binary_col] = (abs(feature_data) > threshold_info['threshold']).astype(int)
-                    scoring_features.append(binary_col)
-                    feature_weights[binary_col] = threshold_info['roc_auc']
-                except Exception:
-                    continue
+        if threshold_features:
+            # Все бинарные признаки одним сравнением (N, K) > (K,) и одной вставкой в features
+            values = np.abs(features[threshold_features].fillna(0).to_numpy(dtype=np.float64))
+            threshold_values = np.array([thresholds[feature]['threshold'] for feature in threshold_features],
+                                        dtype=np.float64)
+            features[scoring_features] = (values > threshold_values).astype(np.int8)
         
         if scoring_features and len(scoring_features) > 0:
             try:
-                X = features[scoring_features]
-                y = data['is_event']
+                # Непрерывный float32 блок: sklearn не делает внутреннюю копию/транспонирование
+                X = np.ascontiguousarray(features[scoring_features].to_numpy(dtype=np.float32))
+                y = data['is_event'].to_numpy(dtype=np.int8)
                 
                 if y.sum() == 0:
                     return None
                 
-                # Обучение модели
-                rf = RandomForestClassifier(n_estimators=100, random_state=42)
+                # Обучение модели (деревья строятся на всех ядрах)
+                rf = RandomForestClassifier(n_estimators=100, n_jobs=-1, random_state=42)
                 rf.fit(X, y)
                 
                 feature_importance = dict(zip(scoring_features, rf.feature_importances_))
@@ -924,14 +990,14 @@ class LTFHTFAnalyzer:
         try:
             split_point = int(len(features) * 0.7)
             
-            X_train = features.iloc[:split_point]
-            X_val = features.iloc[split_point:]
-            y_train = data['is_event'].iloc[:split_point]
-            y_val = data['is_event'].iloc[split_point:]
-            
             scoring_features = scoring_system['features']
             model = scoring_system['model']
             
+            X = np.ascontiguousarray(features[scoring_features].to_numpy(dtype=np.float32))
+            y = data['is_event'].to_numpy(dtype=np.int8)
+            X_train, X_val = X[:split_point], X[split_point:]
+            y_train, y_val = y[:split_point], y[split_point:]
+            
             if y_train.sum() == 0 or y_val.sum() == 0:
                 return {
                     'roc_auc': 0.5,
@@ -942,10 +1008,10 @@ class LTFHTFAnalyzer:
                     'meets_requirements': False
                 }
             
-            model.fit(X_train[scoring_features], y_train)
+            model.fit(X_train, y_train)
             
-            y_pred_proba = model.predict_proba(X_val[scoring_features])[:, 1]
-            y_pred = model.predict(X_val[scoring_features])
+            y_pred_proba = model.predict_proba(X_val)[:, 1]
+            y_pred = model.predict(X_val)
             
             validation_results = {
                 'roc_auc': roc_auc_score(y_val, y_pred_proba),
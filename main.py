@@ -11,23 +11,61 @@
 ПРИНЦИП: ДАННЫЕ САМИ ПОКАЗЫВАЮТ ЧТО ВАЖНО
 """
 
+import os
 import pandas as pd
 import numpy as np
 import re
+import io
+import heapq
+import hashlib
+import inspect
 import yaml
 import json
+from collections import Counter
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import roc_auc_score, classification_report, precision_recall_curve
-from scipy import stats
+from sklearn.inspection import permutation_importance
+from scipy import special, stats
 from scipy.stats import pearsonr, spearmanr
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+# Бинарные таблицы результатов (Feather) - если установлен pyarrow
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.csv
+    import pyarrow.feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Быстрая сериализация JSON (numpy-скаляры кодируются в C) - если установлен orjson
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Параллельная обработка колонок (joblib поставляется вместе со sklearn)
+try:
+    from joblib import Parallel, delayed
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
+
+# JIT-компиляция вычислительных ядер - если установлен numba
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Импорт продвинутых модулей (если доступны)
 try:
@@ -39,6 +77,43 @@ except ImportError as e:
     print("💡 Работаем с базовой функциональностью")
     ADVANCED_MODULES_AVAILABLE = False
 
+# Регулярные выражения резервного парсера компилируются один раз при импорте.
+# Группы именованные: синтаксис общий для re и RE2 (pyarrow extract_regex)
+_TIMESTAMP_RE = re.compile(r'\[(?P<timestamp>[^\]]+)\]')
+_OHLC_RE = re.compile(r'o:(?P<open>[0-9.]+).*?h:(?P<high>[0-9.]+).*?l:(?P<low>[0-9.]+).*?c:(?P<close>[0-9.]+)')
+_VOLUME_RE = re.compile(r'\|(?P<volume>[0-9.]+)K\|')
+_RANGE_RE = re.compile(r'rng:(?P<range>[0-9.]+)')
+_FIELD_PAIR_RE = re.compile(r'([a-zA-Z]+\d+)-([^,|]+)')
+# Пропуск в строке CSV корреляционной матрицы
+_NAN_CELL_RE = re.compile(r',nan(?=[,\n])')
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _extrema_events_kernel(prices, window, min_change, out):
+        """Локальные экстремумы со значимым движением - один проход по ценам"""
+        for i in prange(window, len(prices) - window):
+            current = prices[i]
+            left_max = left_min = prices[i - window]
+            for j in range(i - window + 1, i):
+                left_max = max(left_max, prices[j])
+                left_min = min(left_min, prices[j])
+            right_max = right_min = current
+            for j in range(i + 1, i + window):
+                right_max = max(right_max, prices[j])
+                right_min = min(right_min, prices[j])
+            
+            is_extremum = ((current == left_max and current == right_max) or
+                           (current == left_min and current == right_min))
+            base = prices[i - window]
+            price_change = abs(current - base) / base if base != 0 else 0.0
+            out[i] = is_extremum and price_change >= min_change
+
+
+def _is_numeric_dtype(dtype):
+    """Числовой тип любой разрядности (парсер отдает int8/int32/float32), кроме bool"""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
 
 class HonestDataDrivenAnalyzer:
     """
@@ -63,7 +138,11 @@ class HonestDataDrivenAnalyzer:
         
         # Результаты анализа
         self.parsed_data = None
+        self._data_shape = None
+        self._report_ts = None
         self.features = None
+        self._col_meta = None
+        self._feature_meta = None
         self.events = None
         self.field_correlations = {}
         self.field_roc_scores = {}
@@ -74,9 +153,16 @@ class HonestDataDrivenAnalyzer:
         self.scoring_system = None
         self.validation_results = None
         
+        # Таблицы результатов: Feather + CSV по запросу (флаг --csv)
+        self.write_csv = self.config.get('reporting', {}).get('csv_output', False)
+        
+        # Повторный запуск на том же логе берет результат парсинга из кэша (флаг --no-cache)
+        self.parse_cache = self.config.get('performance', {}).get('parse_cache', True)
+        
         # Создание папки результатов
         self.results_dir = Path("results")
         self.results_dir.mkdir(exist_ok=True)
+        self._outputs = []  # Файлы, записанные текущим create_honest_reports
         
     def _load_config(self, config_path):
         """Загрузка конфигурации"""
@@ -94,6 +180,14 @@ class HonestDataDrivenAnalyzer:
             'veto': {
                 'min_anticorrelation': -0.1, # Минимальная антикорреляция для VETO
                 'effectiveness_threshold': 0.3 # Порог эффективности блокировки
+            },
+            'performance': {
+                'n_jobs': -1,              # Потоки для поколоночного анализа (-1 = все ядра)
+                'parse_chunk_mb': 64,      # Размер блока потокового чтения лога (МБ)
+                'parse_cache': True        # Кэш результата парсинга в results/.cache
+            },
+            'reporting': {
+                'csv_output': False        # Таблицы дополнительно в CSV (всегда, если нет pyarrow)
             }
         }
         
@@ -115,10 +209,14 @@ class HonestDataDrivenAnalyzer:
         print("📊 ТОЛЬКО РЕАЛЬНАЯ СТАТИСТИКА И КОРРЕЛЯЦИИ")
         print("=" * 70)
         
+        # Время запуска - единая метка для всех отчетов этого прогона
+        self._report_ts = datetime.now()
+        
         try:
             # Шаг 1: Парсинг (честный)
             if not self.parse_log_file(file_path):
                 return {'status': 'error', 'message': 'Ошибка парсинга файла'}
+            self._data_shape = self.parsed_data.shape
             
             # Шаг 2: Создание признаков (честный)
             if not self.create_features():
@@ -163,7 +261,7 @@ class HonestDataDrivenAnalyzer:
                 'status': 'success',
                 'results_folder': results_folder,
                 'validation_results': self.validation_results,
-                'files_created': len(list(self.results_dir.glob("*.*")))
+                'files_created': len(self._outputs)
             }
             
         except Exception as e:
@@ -182,26 +280,20 @@ class HonestDataDrivenAnalyzer:
                 # Создаем безопасную обертку для парсера
                 self._patch_advanced_parser()
                 
-                # Теперь используем исправленный парсер
-                self.raw_parsing_data = self.advanced_parser.parse_log_file(file_path)
-                
-                if self.raw_parsing_data.empty:
-                    print("❌ Продвинутый парсер не извлек данные")
-                    return False
-                
-                # ОБЯЗАТЕЛЬНОЕ LTF/HTF разделение согласно ТЗ
-                ltf_data, htf_data = self.advanced_parser.get_ltf_htf_separation(self.raw_parsing_data)
-                
-                # Интеграция результатов
-                integration_results = self.parser_integration.replace_old_parser(file_path)
+                # Парсинг исправленным парсером, ОБЯЗАТЕЛЬНОЕ LTF/HTF разделение согласно ТЗ
+                # и интеграция результатов - один проход парсера (с кэшем между запусками)
+                integration_results = self.parser_integration.replace_old_parser(
+                    file_path, use_cache=self.parse_cache)
                 
                 if integration_results:
                     self.parsed_data = integration_results.get('full_data', pd.DataFrame())
+                    self.raw_parsing_data = self.parsed_data
                     print(f"✅ Извлечено записей: {len(self.parsed_data)}")
                     print(f"✅ Извлечено полей: {len(self.parsed_data.columns)}")
                     print(f"✅ LTF/HTF разделение выполнено согласно ТЗ")
                     return True
                 else:
+                    print("❌ Продвинутый парсер не извлек данные")
                     return False
                     
             except Exception as e:
@@ -255,91 +347,258 @@ class HonestDataDrivenAnalyzer:
         
         print(f"✅ Безопасная статистика: {len(df)} записей с {len(df.columns)} полями")
 
-    def _fallback_parse_log_file(self, file_path):
-        """Резервный честный парсинг"""
+    def _fallback_parse_log_file(self, file_path, chunk_bytes=None):
+        """
+        Резервный честный парсинг - векторно, байтовыми блоками файла
+        
+        Вместо regex-цепочки и словаря на каждую строку:
+        - базовые поля (timestamp, OHLC, объем, range) - одно извлечение на шаблон
+          по всем строкам (с pyarrow - extract_regex на C++);
+        - поля данных - findall по строкам одним map, дальше плоские массивы;
+        - строковая обработка значений и float() - только по уникальным значениям;
+        - широкая таблица собирается numpy-индексацией.
+        Порядок и типы колонок - как у DataFrame из построчных записей. Файл читается
+        блоками по chunk_bytes (по умолчанию performance.parse_chunk_mb), пик памяти
+        ограничен блоком, а не размером файла.
+        """
         print("⚠️ Используется резервный парсер...")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            data = []
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    try:
-                        parsed_record = self._parse_single_line_honest(line, i)
-                        if parsed_record:
-                            data.append(parsed_record)
-                    except Exception as e:
-                        continue
+            byte_ranges = self._log_byte_ranges(file_path, chunk_bytes)
+            last = len(byte_ranges) - 1
+            workers = min(self._parse_workers(), len(byte_ranges))
+            
+            # Блоки независимы: разбор параллельно в потоках (извлечение regex в
+            # pyarrow и numpy-операции отпускают GIL), сквозные номера строк - после
+            def parse_range(i):
+                return self._parse_log_range(file_path, *byte_ranges[i], is_last=i == last)
+            
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    parsed = list(executor.map(parse_range, range(len(byte_ranges))))
+            else:
+                parsed = [parse_range(i) for i in range(len(byte_ranges))]
             
-            if data:
-                self.parsed_data = pd.DataFrame(data)
-                print(f"✅ Резервный парсер: {len(self.parsed_data)} записей")
-                return True
+            frames = self._with_line_offsets(parsed)
+            if not frames:
+                return False
             
-            return False
+            # Колонки новых блоков добавляются в порядке первого появления; int64
+            # остается только у колонок, целых и полных во всех блоках
+            self.parsed_data = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            print(f"✅ Резервный парсер: {len(self.parsed_data)} записей")
+            return True
             
         except Exception as e:
             print(f"❌ Ошибка резервного парсинга: {e}")
             return False
 
-    def _parse_single_line_honest(self, line, line_num):
-        """Честный парсинг одной строки"""
-        parts = line.split('|')
-        if len(parts) < 3:
+    def iter_log_chunks(self, file_path, chunk_bytes=None):
+        """
+        Потоковый разбор лога: DataFrame на каждый байтовый блок (аналог chunksize=)
+        
+        line_number - сквозной номер строки файла.
+        """
+        byte_ranges = self._log_byte_ranges(file_path, chunk_bytes)
+        line_offset = 0
+        for i, (start, end) in enumerate(byte_ranges):
+            n_lines, frame = self._parse_log_range(file_path, start, end, is_last=i == len(byte_ranges) - 1)
+            if frame is not None:
+                frame['line_number'] += line_offset
+                yield frame
+            line_offset += n_lines
+
+    def _parse_log_range(self, file_path, start, end, is_last=True):
+        """Разбор одного байтового блока: (число строк блока, DataFrame или None)"""
+        lines = self._read_log_lines(file_path, start, end, is_last)
+        return len(lines), self._parse_log_lines(lines)
+
+    def _with_line_offsets(self, parsed):
+        """Блоки (число строк, DataFrame) -> DataFrame со сквозными номерами строк файла"""
+        frames = []
+        line_offset = 0
+        for n_lines, frame in parsed:
+            if frame is not None:
+                frame['line_number'] += line_offset
+                frames.append(frame)
+            line_offset += n_lines
+        return frames
+
+    def _parse_workers(self):
+        """Число потоков из performance.n_jobs (-1 = все ядра)"""
+        n_jobs = self.config.get('performance', {}).get('n_jobs', -1)
+        return (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+
+    def _log_byte_ranges(self, file_path, chunk_bytes=None):
+        """Байтовые диапазоны [start, end) около chunk_bytes, выровненные по началу строк"""
+        if chunk_bytes is None:
+            chunk_bytes = int(self.config.get('performance', {}).get('parse_chunk_mb', 64) * 1024 * 1024)
+        
+        size = Path(file_path).stat().st_size
+        starts = [0]
+        with open(file_path, 'rb') as f:
+            while starts[-1] + chunk_bytes < size:
+                f.seek(starts[-1] + chunk_bytes)
+                f.readline()  # дочитываем строку, на которую попала граница
+                if f.tell() >= size:
+                    break
+                starts.append(f.tell())
+        
+        return list(zip(starts, starts[1:] + [size]))
+
+    def _read_log_lines(self, file_path, start, end, is_last=True):
+        """Строки байтового диапазона (перевод строк - как при чтении в текстовом режиме)"""
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            text = f.read(end - start).decode('utf-8')
+        
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        lines = [line.strip() for line in text.split('\n')]
+        
+        # Блок не последний - заканчивается '\n', пустой хвост split не является строкой
+        if not is_last:
+            lines.pop()
+        return lines
+
+    def _parse_log_lines(self, lines):
+        """Векторный разбор строк одного блока -> DataFrame (None - нет записей)"""
+        # Номер строки блока = line_number; отброшенные строки дальше становятся пустыми
+        keep = np.fromiter((bool(line) and not line.startswith('#') and line.count('|') >= 2
+                            for line in lines), dtype=bool, count=len(lines))
+        if not keep.any():
             return None
         
-        record = {'line_number': line_num}
-        
-        # Timestamp
-        timestamp_match = re.search(r'\[([^\]]+)\]', line)
-        if timestamp_match:
-            record['timestamp'] = timestamp_match.group(1)
-        
-        # OHLC
-        ohlc_match = re.search(r'o:([0-9.]+).*?h:([0-9.]+).*?l:([0-9.]+).*?c:([0-9.]+)', line)
-        if ohlc_match:
-            record['open'] = float(ohlc_match.group(1))
-            record['high'] = float(ohlc_match.group(2))
-            record['low'] = float(ohlc_match.group(3))
-            record['close'] = float(ohlc_match.group(4))
-        
-        # Volume
-        volume_match = re.search(r'\|([0-9.]+K)\|', line)
-        if volume_match:
-            volume_str = volume_match.group(1)
-            record['volume'] = float(volume_str.replace('K', '')) * 1000
-        
-        # Range
-        rng_match = re.search(r'rng:([0-9.]+)', line)
-        if rng_match:
-            record['range'] = float(rng_match.group(1))
-        
-        # ЧЕСТНОЕ извлечение полей данных
-        field_matches = re.findall(r'([a-zA-Z]+\d+)-([^,|]+)', line)
-        for field_name, field_value in field_matches:
-            if field_name.startswith('nw'):
-                # Для NW полей сохраняем и число, и сигнал
-                exclamation_count = field_value.count('!')
-                if exclamation_count > 0:
-                    record[field_name] = exclamation_count
-                    record[f"{field_name}_signal"] = field_value
-                else:
-                    try:
-                        record[field_name] = float(field_value.replace('%', ''))
-                    except:
-                        record[field_name] = 0
+        kept_rows = np.flatnonzero(keep)
+        kept_lines = [lines[row] for row in kept_rows]
+        
+        # Базовые поля свечи
+        base = {'line_number': kept_rows.astype(np.int64)}
+        base['timestamp'] = self._extract_groups(kept_lines, _TIMESTAMP_RE)['timestamp']
+        raw_numbers = self._extract_groups(kept_lines, _OHLC_RE)
+        raw_numbers.update(self._extract_groups(kept_lines, _VOLUME_RE))
+        raw_numbers.update(self._extract_groups(kept_lines, _RANGE_RE))
+        
+        # Строки с нечисловым захватом (например '1.2.3') отбрасываются целиком
+        invalid = np.zeros(len(kept_rows), dtype=bool)
+        for name, raw in raw_numbers.items():
+            base[name] = pd.to_numeric(pd.Series(raw), errors='coerce').to_numpy(dtype=np.float64)
+            invalid |= pd.notna(raw) & np.isnan(base[name])
+        base['volume'] = base['volume'] * 1000
+        base['timestamp'] = np.where(pd.isna(base['timestamp']), np.nan, base['timestamp'])
+        
+        valid = ~invalid
+        rows = kept_rows[valid]
+        base = {name: column[valid] for name, column in base.items() if pd.notna(column[valid]).any()}
+        
+        # Поля данных: findall по строкам одним map, затем плоские массивы (строка, имя, значение)
+        per_line = list(map(_FIELD_PAIR_RE.findall, [lines[row] for row in rows]))
+        cell_counts = np.fromiter(map(len, per_line), dtype=np.int64, count=len(per_line))
+        cell_rows = np.repeat(rows, cell_counts)
+        pairs = list(chain.from_iterable(per_line))
+        names = np.array([name for name, _ in pairs], dtype=object)
+        raws = np.array([raw for _, raw in pairs], dtype=object)
+        
+        codes, field_names = pd.factorize(names)
+        field_codes = {name: code for code, name in enumerate(field_names)}
+        row_pos = np.searchsorted(rows, cell_rows)
+        n_rows, n_fields = len(rows), len(field_names)
+        
+        # Значения - по уникальным строкам: NW поля - число '!' + исходный сигнал,
+        # остальные - float без '%'/'σ' (не число -> 0). Сразу float64 + маска
+        # "не число", без object-массивов на каждую ячейку
+        raw_codes, raw_uniques = pd.factorize(raws)
+        without_percent = [raw.replace('%', '') for raw in raw_uniques]
+        nw_numbers, nw_missing = self._floats_with_mask(without_percent)
+        other_numbers, other_missing = self._floats_with_mask([raw.replace('σ', '') for raw in without_percent])
+        
+        is_nw = np.array([name.startswith('nw') for name in field_names], dtype=bool)[codes]
+        bangs = np.array([raw.count('!') for raw in raw_uniques], dtype=np.int64)[raw_codes]
+        numbers = np.where(is_nw, nw_numbers[raw_codes], other_numbers[raw_codes])
+        not_number = np.where(is_nw, nw_missing[raw_codes], other_missing[raw_codes])
+        
+        is_signal = is_nw & (bangs > 0)
+        values = np.where(is_signal, bangs, np.where(not_number, 0.0, numbers))
+        is_int = is_signal | not_number
+        
+        # Колонки по первому появлению: ключ (строка, группа, позиция в записи)
+        match_in_row = np.arange(len(cell_rows)) - np.searchsorted(cell_rows, cell_rows, side='left')
+        first_seen = {}
+        for slot, (name, column) in enumerate(base.items()):
+            first_seen[name] = (rows[np.flatnonzero(pd.notna(column))[0]], 0, slot)
+        
+        _, first_cell = np.unique(codes, return_index=True)
+        for code, cell in enumerate(first_cell):
+            first_seen[field_names[code]] = (cell_rows[cell], 1, 2 * match_in_row[cell])
+        
+        signal_cells = np.flatnonzero(is_signal)
+        signal_codes, first_signal = np.unique(codes[signal_cells], return_index=True)
+        for code, cell in zip(signal_codes, signal_cells[first_signal]):
+            first_seen[f"{field_names[code]}_signal"] = (cell_rows[cell], 1, 2 * match_in_row[cell] + 1)
+        
+        # Повтор поля в строке: значение - последнее (позиция - первая, см. выше)
+        flat_key = row_pos * n_fields + codes
+        last = ~pd.Series(flat_key).duplicated(keep='last').to_numpy()
+        
+        wide = np.full((n_rows, n_fields), np.nan)
+        wide[row_pos[last], codes[last]] = values[last]
+        filled = np.bincount(codes[last], minlength=n_fields)
+        has_float = np.bincount(codes[last], weights=~is_int[last], minlength=n_fields) > 0
+        
+        # Сигнал - последняя сигнальная запись поля в строке
+        signal_last = signal_cells[~pd.Series(flat_key[signal_cells]).duplicated(keep='last').to_numpy()]
+        signal_wide = np.full((n_rows, n_fields), np.nan, dtype=object)
+        signal_wide[row_pos[signal_last], codes[signal_last]] = raws[signal_last]
+        
+        data = {}
+        for name in sorted(first_seen, key=first_seen.get):
+            if name in base:
+                data[name] = base[name]
+            elif name.endswith('_signal'):
+                data[name] = signal_wide[:, field_codes[name[:-len('_signal')]]]
             else:
-                # Остальные поля
-                try:
-                    clean_value = field_value.replace('%', '').replace('σ', '')
-                    record[field_name] = float(clean_value)
-                except:
-                    record[field_name] = 0
+                code = field_codes[name]
+                int_column = filled[code] == n_rows and not has_float[code]
+                data[name] = wide[:, code].astype(np.int64) if int_column else wide[:, code]
+        
+        return pd.DataFrame(data) if data else None
+
+    def _extract_groups(self, lines, pattern):
+        """
+        Первое совпадение pattern в каждой строке -> {имя группы: object-массив (None - нет)}
         
-        return record
+        pattern - скомпилированный шаблон с именованными группами (общий синтаксис re
+        и RE2). С pyarrow извлечение идет extract_regex по всему массиву строк, иначе -
+        pattern.search.
+        """
+        group_names = list(pattern.groupindex)
+        
+        if PYARROW_AVAILABLE:
+            matched = pyarrow.compute.extract_regex(pyarrow.array(lines, type=pyarrow.string()), pattern.pattern)
+            return {name: pyarrow.compute.struct_field(matched, name).to_numpy(zero_copy_only=False)
+                    for name in group_names}
+        
+        found = [pattern.search(line) for line in lines]
+        return {name: np.array([match.group(name) if match else None for match in found], dtype=object)
+                for name in group_names}
+
+    @staticmethod
+    def _float_or_none(text):
+        """float(text) или None, если строка не число (для поуникальной конвертации)"""
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
+    @classmethod
+    def _floats_with_mask(cls, texts):
+        """Строки -> (float64-массив, маска "не число"); на месте не-чисел - 0.0"""
+        numbers = [cls._float_or_none(text) for text in texts]
+        missing = np.fromiter((number is None for number in numbers), dtype=bool, count=len(numbers))
+        values = np.fromiter((0.0 if number is None else number for number in numbers),
+                             dtype=np.float64, count=len(numbers))
+        return values, missing
 
     def create_features(self):
         """ИСПРАВЛЕНО: Создание признаков с ПРИОРИТЕТОМ ИНДИКАТОРАМ"""
@@ -361,6 +620,7 @@ class HonestDataDrivenAnalyzer:
             
             # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: Очистка данных
             self.features = self._clean_mixed_data_types(self.features)
+            self._build_column_meta()
             
             print(f"✅ Создано признаков: {len(self.features.columns)}")
             return True
@@ -371,6 +631,60 @@ class HonestDataDrivenAnalyzer:
             traceback.print_exc()
             return False
 
+    def _build_column_meta(self):
+        """
+        Метаданные колонок признаков - считаются ОДИН раз после создания признаков
+        
+        Поколоночные циклы анализа используют готовые списки/множества вместо
+        повторных проверок имен (endswith('_signal')) и типов на каждом проходе.
+        """
+        skip = {'line_number', 'timestamp'}
+        analyzable = [column for column in self.features.columns if column not in skip]
+        
+        self._col_meta = {
+            'skip': skip,
+            'analyzable': analyzable,
+            'numeric': {column for column in analyzable 
+                        if _is_numeric_dtype(self.features[column].dtype)},
+            'signal': {column for column in analyzable if column.endswith('_signal')}
+        }
+        
+        # Числовые колонки как структура массивов (SoA): непрерывный float64 массив
+        # на колонку, поколоночные проходы не создают Series на каждое обращение
+        self._feature_cols = {
+            column: np.ascontiguousarray(self.features[column].to_numpy(dtype=np.float64))
+            for column in analyzable if column in self._col_meta['numeric']
+        }
+
+    def _numeric_values(self, column, features_aligned=None):
+        """Числовая колонка как ndarray - из SoA, если признаки не переиндексированы"""
+        if features_aligned is None or features_aligned is self.features:
+            return self._feature_cols[column]
+        return features_aligned[column].to_numpy(dtype=np.float64)
+
+    def _build_feature_meta(self):
+        """
+        Таблица разбора имен признаков скоринга - один раз после построения системы
+        
+        feature -> (base_field, field_type, lookup_key), где lookup_key - имя VETO для
+        veto_fields или тип сигнала для signal_performance. Методы сохранения берут
+        готовую запись вместо цепочек replace/split на каждый признак.
+        """
+        meta = {}
+        for feature in self.scoring_system['features']:
+            if feature.endswith('_veto'):
+                veto_name = feature[:-len('_veto')]
+                base_field = veto_name.replace('_high', '').replace('_low', '')
+                meta[feature] = (base_field, 'veto', veto_name)
+            elif '_excl' in feature:
+                base_field, signal_part = feature.split('_excl', 2)[:2]
+                signal_type = signal_part.replace('_activated', '').replace('_', '!')
+                meta[feature] = (base_field, 'categorical', signal_type)
+            else:
+                meta[feature] = (feature.replace('_activated', ''), 'numeric', None)
+        
+        self._feature_meta = meta
+
     def _clean_mixed_data_types(self, df):
         """
         КРИТИЧЕСКАЯ ОЧИСТКА: Исправление смешанных типов данных
@@ -380,7 +694,9 @@ class HonestDataDrivenAnalyzer:
         """
         print("🧹 Очистка смешанных типов данных...")
         
-        cleaned_df = df.copy()
+        # Поверхностная копия: каждая очищаемая колонка заменяется целиком,
+        # так что исходный фрейм не меняется, а нетронутые колонки не копируются
+        cleaned_df = df.copy(deep=False)
         converted_fields = 0
         
         for column in df.columns:
@@ -585,38 +901,15 @@ class HonestDataDrivenAnalyzer:
                 print("❌ Недостаточно ценовых данных")
                 return False
             
-            events_mask = pd.Series([False] * len(self.features), index=self.features.index)
-            
             # 1. ЭКСТРЕМУМЫ ЧЕРЕЗ ЛОКАЛЬНЫЕ МИНИМУМЫ/МАКСИМУМЫ
             window = self.config['events']['lookback_window']
             min_change = self.config['events']['min_price_change']
             
-            for i in range(window, len(prices) - window):
-                current_price = prices.iloc[i]
-                left_window = prices.iloc[i-window:i]
-                right_window = prices.iloc[i:i+window]
-                
-                # Локальный максимум
-                if (current_price == left_window.max() and 
-                    current_price == right_window.max()):
-                    # ИСПРАВЛЕНО: Проверяем значимость движения с защитой от деления на ноль
-                    if prices.iloc[i-window] != 0:
-                        price_change = abs(current_price - prices.iloc[i-window]) / prices.iloc[i-window]
-                    else:
-                        price_change = 0
-                    if price_change >= min_change:
-                        events_mask.iloc[i] = True
-                
-                # Локальный минимум
-                elif (current_price == left_window.min() and 
-                      current_price == right_window.min()):
-                    # ИСПРАВЛЕНО: Проверяем значимость движения с защитой от деления на ноль
-                    if prices.iloc[i-window] != 0:
-                        price_change = abs(current_price - prices.iloc[i-window]) / prices.iloc[i-window]
-                    else:
-                        price_change = 0
-                    if price_change >= min_change:
-                        events_mask.iloc[i] = True
+            # Позиции экстремумов берутся по ценам, маска - по позициям признаков
+            extrema = self._extrema_events(prices.to_numpy(dtype=np.float64), window, min_change)
+            mask = np.zeros(len(self.features), dtype=bool)
+            mask[:len(extrema)] = extrema
+            events_mask = pd.Series(mask, index=self.features.index)
             
             # 2. РЕЗКИЕ ДВИЖЕНИЯ ЧЕРЕЗ ВОЛАТИЛЬНОСТЬ
             returns = prices.pct_change()
@@ -669,6 +962,36 @@ class HonestDataDrivenAnalyzer:
             traceback.print_exc()
             return False
 
+    @staticmethod
+    def _extrema_events(prices, window, min_change):
+        """
+        Маска локальных экстремумов (левое окно [i-window, i), правое [i, i+window))
+        с изменением цены относительно prices[i-window] не меньше min_change
+        """
+        n = len(prices)
+        out = np.zeros(n, dtype=bool)
+        if window < 1 or n <= 2 * window:
+            return out
+        
+        if NUMBA_AVAILABLE:
+            _extrema_events_kernel(np.ascontiguousarray(prices), window, min_change, out)
+            return out
+        
+        # Без numba: максимумы/минимумы скользящих окон через представление без копий
+        windows = np.lib.stride_tricks.sliding_window_view(prices, window)
+        window_max = windows.max(axis=1)
+        window_min = windows.min(axis=1)
+        left, right = slice(0, n - 2 * window), slice(window, n - window)
+        
+        current = prices[window:n - window]
+        base = prices[:n - 2 * window]
+        is_extremum = (((current == window_max[left]) & (current == window_max[right])) |
+                       ((current == window_min[left]) & (current == window_min[right])))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_change = np.where(base != 0, np.abs(current - base) / base, 0.0)
+        out[window:n - window] = is_extremum & (price_change >= min_change)
+        return out
+    
     def calculate_real_field_statistics(self):
         """
         РЕАЛЬНАЯ статистика полей БЕЗ ПРЕДПОЛОЖЕНИЙ
@@ -679,43 +1002,17 @@ class HonestDataDrivenAnalyzer:
             if self.features is None or self.events is None:
                 return False
             
-            events_mask = self.events['events_mask']
             field_stats = {}
             
-            # Анализ всех полей без исключения
-            for column in self.features.columns:
-                if column in ['line_number', 'timestamp']:
-                    continue
-                
-                field_data = self.features[column].dropna()
-                min_samples = self.config.get('analysis', {}).get('min_samples', 10)
-                if len(field_data) < min_samples:
-                    continue
-                
-                stats_dict = {
-                    'field_type': self._determine_field_type(column, field_data),
-                    'total_observations': len(field_data),
-                    'non_zero_observations': (field_data != 0).sum(),
-                    'activation_rate': (field_data != 0).mean(),
-                    'mean': float(field_data.mean()) if field_data.dtype in ['int64', 'float64'] else None,
-                    'std': float(field_data.std()) if field_data.dtype in ['int64', 'float64'] else None,
-                    'min': float(field_data.min()) if field_data.dtype in ['int64', 'float64'] else None,
-                    'max': float(field_data.max()) if field_data.dtype in ['int64', 'float64'] else None,
-                    'percentiles': {}
-                }
-                
-                # Процентили для числовых полей
-                if field_data.dtype in ['int64', 'float64']:
-                    for p in [10, 25, 50, 75, 90, 95, 99]:
-                        stats_dict['percentiles'][f'p{p}'] = float(field_data.quantile(p/100))
-                
-                # Для категориальных полей (например, NW сигналы)
-                if field_data.dtype == 'object':
-                    value_counts = field_data.value_counts()
-                    stats_dict['unique_values'] = value_counts.to_dict()
-                    stats_dict['most_frequent'] = value_counts.index[0] if len(value_counts) > 0 else None
-                
-                field_stats[column] = stats_dict
+            # Анализ всех полей без исключения (колонки независимы - считаем параллельно)
+            columns = self._col_meta['analyzable']
+            numeric_block, positions = self._numeric_block32(
+                [column for column in columns if column in self._col_meta['numeric']]
+            )
+            
+            for column, stats_dict in zip(columns, self._map_columns(self._field_statistics_for_column, columns, numeric_block, positions)):
+                if stats_dict is not None:
+                    field_stats[column] = stats_dict
             
             self.threshold_analysis = field_stats
             
@@ -728,11 +1025,80 @@ class HonestDataDrivenAnalyzer:
             traceback.print_exc()
             return False
 
+    def _map_columns(self, func, columns, *args):
+        """
+        Независимая обработка колонок по всем ядрам (joblib, потоки)
+        
+        Колонки не зависят друг от друга, поэтому func(column, *args) выполняется
+        параллельно; порядок результатов совпадает с порядком columns.
+        """
+        n_jobs = self.config.get('performance', {}).get('n_jobs', -1)
+        
+        if JOBLIB_AVAILABLE and n_jobs != 1 and len(columns) > 1:
+            return Parallel(n_jobs=n_jobs, prefer='threads', batch_size=16)(
+                delayed(func)(column, *args) for column in columns
+            )
+        
+        return [func(column, *args) for column in columns]
+
+    def _numeric_block32(self, columns):
+        """
+        Числовые колонки одним float32 блоком + позиции колонок в блоке
+        
+        float32 вдвое снижает объем читаемой памяти в редукциях (mean/std/квантили).
+        Fortran-порядок: каждая колонка - непрерывный срез block[:, i].
+        Итоговые скаляры приводятся к float, схема JSON не меняется.
+        """
+        block = np.asfortranarray(self.features[columns].to_numpy(dtype=np.float32))
+        positions = {column: i for i, column in enumerate(columns)}
+        return block, positions
+
+    def _field_statistics_for_column(self, column, numeric_block, positions):
+        """Статистика одного поля (None - если данных недостаточно)"""
+        is_numeric = column in positions
+        
+        if is_numeric:
+            values = numeric_block[:, positions[column]]
+            field_data = values[~np.isnan(values)]
+        else:
+            field_data = self.features[column].dropna()
+        
+        min_samples = self.config.get('analysis', {}).get('min_samples', 10)
+        if len(field_data) < min_samples:
+            return None
+        
+        stats_dict = {
+            'field_type': self._determine_field_type(column, field_data),
+            'total_observations': len(field_data),
+            'non_zero_observations': (field_data != 0).sum(),
+            'activation_rate': (field_data != 0).mean(),
+            'mean': float(field_data.mean()) if is_numeric else None,
+            'std': float(field_data.std(ddof=1)) if is_numeric else None,
+            'min': float(field_data.min()) if is_numeric else None,
+            'max': float(field_data.max()) if is_numeric else None,
+            'percentiles': {}
+        }
+        
+        # Процентили для числовых полей (все уровни одним вызовом)
+        if is_numeric:
+            levels = [10, 25, 50, 75, 90, 95, 99]
+            quantiles = np.quantile(field_data, [p/100 for p in levels])
+            for p, value in zip(levels, quantiles):
+                stats_dict['percentiles'][f'p{p}'] = float(value)
+        
+        # Для категориальных полей (например, NW сигналы) - один проход Counter
+        if field_data.dtype == 'object':
+            value_counts = Counter(field_data.to_numpy().tolist()).most_common()
+            stats_dict['unique_values'] = dict(value_counts)
+            stats_dict['most_frequent'] = value_counts[0][0] if value_counts else None
+        
+        return stats_dict
+
     def _determine_field_type(self, column, data):
         """Определение типа поля БЕЗ ПРЕДПОЛОЖЕНИЙ"""
         if 'signal' in column:
             return 'categorical'
-        elif data.dtype in ['int64', 'float64']:
+        elif _is_numeric_dtype(data.dtype):
             return 'numeric'
         elif data.dtype == 'object':
             return 'categorical'
@@ -754,127 +1120,20 @@ class HonestDataDrivenAnalyzer:
             correlations = {}
             roc_scores = {}
             
-            for column in self.features.columns:
-                if column in ['line_number', 'timestamp']:
-                    continue
-                
-                field_data = self.features[column].dropna()
-                min_samples = self.config.get('analysis', {}).get('min_samples', 10)
-                if len(field_data) < min_samples:
-                    continue
-                
-                # Выравниваем индексы
-                common_idx = field_data.index.intersection(events_mask.index)
-                min_samples = self.config.get('analysis', {}).get('min_samples', 10)
-                if len(common_idx) < min_samples:
-                    continue
-                
-                field_aligned = field_data.loc[common_idx]
-                events_aligned = events_mask.loc[common_idx]
-                
-                # Для числовых полей
-                if field_aligned.dtype in ['int64', 'float64']:
-                    # Корреляция Пирсона
-                    try:
-                        corr_pearson, p_val_pearson = pearsonr(field_aligned, events_aligned)
-                        correlations[column] = {
-                            'pearson_correlation': float(corr_pearson),
-                            'pearson_p_value': float(p_val_pearson),
-                            'significant': p_val_pearson < self.config['analysis']['significance_level']
-                        }
-                    except:
-                        correlations[column] = {
-                            'pearson_correlation': 0.0,
-                            'pearson_p_value': 1.0,
-                            'significant': False
-                        }
-                    
-                    # ROC-AUC для разных порогов
-                    try:
-                        # Пробуем разные пороги
-                        thresholds = [field_aligned.quantile(q) for q in [0.5, 0.7, 0.8, 0.9, 0.95]]
-                        best_roc = 0.5
-                        best_threshold = None
-                        
-                        for threshold in thresholds:
-                            if field_aligned.nunique() > 1:  # Проверяем вариативность
-                                binary_pred = (field_aligned > threshold).astype(int)
-                                if binary_pred.nunique() > 1:  # Есть и 0 и 1
-                                    try:
-                                        roc = roc_auc_score(events_aligned, binary_pred)
-                                        if roc > best_roc:
-                                            best_roc = roc
-                                            best_threshold = threshold
-                                    except:
-                                        continue
-                        
-                        roc_scores[column] = {
-                            'best_roc_auc': float(best_roc),
-                            'best_threshold': float(best_threshold) if best_threshold is not None else None,
-                            'activation_rate': float((field_aligned > best_threshold).mean()) if best_threshold is not None else 0.0
-                        }
-                    except:
-                        roc_scores[column] = {
-                            'best_roc_auc': 0.5,
-                            'best_threshold': None,
-                            'activation_rate': 0.0
-                        }
-                
-                # Для категориальных полей (сигнальные) с реальной эффективностью
-                elif column.endswith('_signal'):
-                    try:
-                        unique_signals = field_aligned.unique()
-                        signal_performance = {}
-                        
-                        for signal in unique_signals:
-                            if isinstance(signal, str) and signal.strip():
-                                signal_mask = (field_aligned == signal).astype(int)
-                                if signal_mask.sum() > 0:
-                                    signal_events = events_aligned[signal_mask == 1]
-                                    if len(signal_events) > 0:
-                                        effectiveness = signal_events.mean()
-                                        frequency = signal_mask.mean()
-                                        
-                                        # Статистическая значимость
-                                        try:
-                                            from scipy.stats import chi2_contingency
-                                            
-                                            contingency = pd.crosstab(signal_mask, events_aligned)
-                                            if contingency.shape == (2, 2):
-                                                chi2, p_val, _, _ = chi2_contingency(contingency)
-                                                significant = p_val < self.config['analysis']['significance_level']
-                                            else:
-                                                significant = False
-                                                p_val = 1.0
-                                        except:
-                                            significant = False
-                                            p_val = 1.0
-                                        
-                                        signal_performance[signal] = {
-                                            'effectiveness': float(effectiveness),
-                                            'frequency': float(frequency),
-                                            'count': int(signal_mask.sum()),
-                                            'events_when_signal': int(signal_events.sum()),
-                                            'p_value': float(p_val),
-                                            'significant': significant
-                                        }
-                        
-                        correlations[column] = {
-                            'field_type': 'categorical',
-                            'signal_performance': signal_performance
-                        }
-                        
-                        # Лучший сигнал для ROC
-                        if signal_performance:
-                            best_signal = max(signal_performance.keys(), 
-                                            key=lambda x: signal_performance[x]['effectiveness'])
-                            roc_scores[column] = {
-                                'best_signal': best_signal,
-                                'best_effectiveness': signal_performance[best_signal]['effectiveness'],
-                                'best_frequency': signal_performance[best_signal]['frequency']
-                            }
-                    except Exception as e:
-                        correlations[column] = {'field_type': 'categorical', 'error': str(e)}
+            columns = self._col_meta['analyzable']
+            
+            features_aligned, events_aligned = self._align_with_events(events_mask)
+            
+            # Корреляции Пирсона всех числовых полей - матричным произведением
+            numeric_columns = [column for column in columns if column in self._col_meta['numeric']]
+            pearson = self._pearson_columns(numeric_columns, features_aligned, events_aligned)
+            threshold_roc = self._threshold_roc_columns(numeric_columns, features_aligned, events_aligned)
+            
+            for column, (corr_data, roc_data) in zip(columns, self._map_columns(self._correlations_for_column, columns, features_aligned, events_aligned, pearson, threshold_roc)):
+                if corr_data is not None:
+                    correlations[column] = corr_data
+                if roc_data is not None:
+                    roc_scores[column] = roc_data
             
             self.field_correlations = correlations
             self.field_roc_scores = roc_scores
@@ -895,6 +1154,243 @@ class HonestDataDrivenAnalyzer:
             traceback.print_exc()
             return False
 
+    def _align_with_events(self, events_mask):
+        """
+        Выравнивание признаков и маски событий ОДИН раз на весь поколоночный проход
+        
+        Внутри цикла по колонкам остается только маска NaN конкретной колонки.
+        """
+        common_idx = self.features.index.intersection(events_mask.index)
+        
+        if common_idx.equals(self.features.index) and common_idx.equals(events_mask.index):
+            return self.features, events_mask
+        
+        return self.features.loc[common_idx], events_mask.loc[common_idx]
+
+    def _pearson_columns(self, columns, features_aligned, events_mask, block_columns=64):
+        """
+        Пирсон (r, p-value) для всех колонок против маски событий без цикла по колонкам
+        
+        Каждая колонка использует только свои не-NaN строки: суммы считаются
+        по маске валидности, центрированные колонки умножаются на вектор событий
+        одним GEMV на блок колонок. r = NaN для постоянных входов, p-value -
+        двусторонний по бета-распределению, как в scipy.stats.pearsonr.
+        """
+        events = events_mask.to_numpy(dtype=np.float64)
+        results = {}
+        
+        for block, X, valid in self._numeric_blocks(columns, features_aligned, block_columns):
+            # Бесконечности - редкий случай, для таких колонок считает сам pearsonr
+            finite = np.isfinite(X).sum(axis=0) == valid.sum(axis=0)
+            
+            n = valid.sum(axis=0)
+            x_mean = np.where(valid, X, 0.0).sum(axis=0) / np.maximum(n, 1)
+            xc = np.where(valid, X - x_mean, 0.0)
+            
+            events_sum = valid.T.astype(np.float64) @ events
+            events_mean = events_sum / np.maximum(n, 1)
+            
+            sxy = xc.T @ events
+            sxx = np.einsum('ij,ij->j', xc, xc)
+            syy = events_sum - n * events_mean ** 2
+            
+            # Постоянный вход (все валидные значения равны) - корреляция не определена
+            const_x = np.where(valid, X, np.inf).min(axis=0) == np.where(valid, X, -np.inf).max(axis=0)
+            const_y = (events_sum == 0) | (events_sum == n)
+            
+            with np.errstate(invalid='ignore', divide='ignore'):
+                r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+            r[const_x | const_y] = np.nan
+            
+            ab = n / 2 - 1
+            with np.errstate(invalid='ignore'):
+                # Распределение симметрично: верхний хвост через betainc (есть в любой
+                # scipy из setup.py; betaincc появилась только в 1.11)
+                p = 2 * special.betainc(ab, ab, (1 - np.abs(r)) / 2)
+
+            # n == 2: r строго +-1, p-value = 1 (как в pearsonr)
+            two = n == 2
+            r[two] = np.round(r[two])
+            p[two] = np.where(np.isnan(r[two]), np.nan, 1.0)
+
+            for i, column in enumerate(block):
+                if n[i] < 2:
+                    continue
+                if finite[i]:
+                    results[column] = (float(r[i]), float(p[i]))
+                else:
+                    column_valid = valid[:, i]
+                    results[column] = tuple(map(float, pearsonr(X[column_valid, i], events[column_valid])))
+        
+        return results
+
+    def _numeric_blocks(self, columns, features_aligned, block_columns):
+        """Блоки числовых колонок: (имена, матрица N x B, маска не-NaN)"""
+        for start in range(0, len(columns), block_columns):
+            block = columns[start:start + block_columns]
+            X = np.column_stack([self._numeric_values(column, features_aligned) for column in block])
+            yield block, X, ~np.isnan(X)
+
+    def _threshold_roc_columns(self, columns, features_aligned, events_mask, block_columns=64):
+        """
+        Лучший порог-квантиль по ROC-AUC для всех колонок без вызовов roc_auc_score
+        
+        Для бинарного прогноза (x > порог) ROC-кривая - три точки (0,0), (FPR,TPR), (1,1),
+        площадь по трапециям считается сразу для всех порогов и колонок блока из
+        счетчиков TP/FP. Выбирается первый порог с максимальным AUC > 0.5.
+        """
+        levels = [0.5, 0.7, 0.8, 0.9, 0.95]
+        events = events_mask.to_numpy(dtype=np.float64)
+        results = {}
+        
+        for block, X, valid in self._numeric_blocks(columns, features_aligned, block_columns):
+            n = valid.sum(axis=0)
+            positives = valid.T.astype(np.float64) @ events
+            negatives = n - positives
+            
+            # Пороги-квантили по не-NaN значениям каждой колонки: (уровни x колонки)
+            thresholds = np.nanquantile(X, levels, axis=0)
+            varies = np.nanmin(X, axis=0) != np.nanmax(X, axis=0)
+            
+            # Счетчики прогноза по каждому порогу (NaN > порог = False)
+            activated = np.empty(thresholds.shape)
+            true_pos = np.empty(thresholds.shape)
+            for k, level_thresholds in enumerate(thresholds):
+                predicted = X > level_thresholds
+                activated[k] = predicted.sum(axis=0)
+                true_pos[k] = events @ predicted
+            
+            with np.errstate(invalid='ignore', divide='ignore'):
+                fpr = (activated - true_pos) / negatives
+                tpr = true_pos / positives
+                roc = (fpr * tpr) / 2.0 + ((1 - fpr) * (1.0 + tpr)) / 2.0
+            
+            usable = (activated > 0) & (activated < n) & varies & (positives > 0) & (negatives > 0)
+            roc = np.where(usable, roc, -np.inf)
+            best = np.argmax(roc, axis=0)
+            
+            for i, column in enumerate(block):
+                best_roc = roc[best[i], i]
+                if best_roc > 0.5:
+                    results[column] = {
+                        'best_roc_auc': float(best_roc),
+                        'best_threshold': float(thresholds[best[i], i]),
+                        'activation_rate': float(activated[best[i], i] / n[i])
+                    }
+                else:
+                    results[column] = {
+                        'best_roc_auc': 0.5,
+                        'best_threshold': None,
+                        'activation_rate': 0.0
+                    }
+        
+        return results
+
+    def _correlations_for_column(self, column, features_aligned, events_mask, pearson, threshold_roc):
+        """Корреляция и ROC-AUC одного поля: (corr_data, roc_data), None - если не рассчитано"""
+        is_numeric = column in self._col_meta['numeric']
+        if is_numeric:
+            values = self._numeric_values(column, features_aligned)
+            valid = ~np.isnan(values)
+        else:
+            field_data = features_aligned[column]
+            valid = field_data.notna().to_numpy()
+        min_samples = self.config.get('analysis', {}).get('min_samples', 10)
+        if valid.sum() < min_samples:
+            return None, None
+        
+        corr_data = None
+        roc_data = None
+        
+        # Для числовых полей: Пирсон и лучший порог ROC-AUC посчитаны матрично
+        if is_numeric:
+            # Меньше двух значений - Пирсон не считался (min_samples < 2 в конфиге)
+            pearson_result = pearson.get(column)
+            if pearson_result is None:
+                return None, None
+            corr_pearson, p_val_pearson = pearson_result
+            corr_data = {
+                'pearson_correlation': corr_pearson,
+                'pearson_p_value': p_val_pearson,
+                'significant': p_val_pearson < self.config['analysis']['significance_level']
+            }
+            roc_data = threshold_roc[column]
+        
+        # Для категориальных полей (сигнальные) с реальной эффективностью
+        elif column in self._col_meta['signal']:
+            field_aligned = field_data[valid]
+            events_aligned = events_mask[valid]
+            try:
+                unique_signals = field_aligned.unique()
+                signal_performance = {}
+                
+                for signal in unique_signals:
+                    if isinstance(signal, str) and signal.strip():
+                        signal_mask = (field_aligned == signal).astype(int)
+                        if signal_mask.sum() > 0:
+                            signal_events = events_aligned[signal_mask == 1]
+                            if len(signal_events) > 0:
+                                effectiveness = signal_events.mean()
+                                frequency = signal_mask.mean()
+                                
+                                # Статистическая значимость
+                                try:
+                                    from scipy.stats import chi2_contingency
+                                    
+                                    contingency = self._contingency_2x2(signal_mask, events_aligned)
+                                    if contingency is not None:
+                                        chi2, p_val, _, _ = chi2_contingency(contingency)
+                                        significant = p_val < self.config['analysis']['significance_level']
+                                    else:
+                                        significant = False
+                                        p_val = 1.0
+                                except:
+                                    significant = False
+                                    p_val = 1.0
+                                
+                                signal_performance[signal] = {
+                                    'effectiveness': float(effectiveness),
+                                    'frequency': float(frequency),
+                                    'count': int(signal_mask.sum()),
+                                    'events_when_signal': int(signal_events.sum()),
+                                    'p_value': float(p_val),
+                                    'significant': significant
+                                }
+                
+                corr_data = {
+                    'field_type': 'categorical',
+                    'signal_performance': signal_performance
+                }
+                
+                # Лучший сигнал для ROC
+                if signal_performance:
+                    best_signal = max(signal_performance.keys(), 
+                                    key=lambda x: signal_performance[x]['effectiveness'])
+                    roc_data = {
+                        'best_signal': best_signal,
+                        'best_effectiveness': signal_performance[best_signal]['effectiveness'],
+                        'best_frequency': signal_performance[best_signal]['frequency']
+                    }
+            except Exception as e:
+                corr_data = {'field_type': 'categorical', 'error': str(e)}
+        
+        return corr_data, roc_data
+
+    def _contingency_2x2(self, condition, events):
+        """
+        Таблица сопряженности 2x2 (условие x событие) одним проходом np.bincount
+        
+        Код ячейки = 2*условие + событие; None - если одно из измерений вырождено
+        (аналог pd.crosstab с формой != (2, 2)).
+        """
+        codes = (np.asarray(condition, dtype=np.uint8) << 1) | np.asarray(events, dtype=np.uint8)
+        contingency = np.bincount(codes, minlength=4).reshape(2, 2)
+        
+        if not (contingency.sum(axis=0).all() and contingency.sum(axis=1).all()):
+            return None
+        
+        return contingency
+
     def calculate_real_temporal_lags(self):
         """
         РЕАЛЬНЫЕ временные лаги через статистический анализ
@@ -913,51 +1409,11 @@ class HonestDataDrivenAnalyzer:
             temporal_lags = {}
             max_lag = 20  # Максимальный лаг для анализа
             
-            for column in self.features.columns:
-                if column in ['line_number', 'timestamp']:
-                    continue
-                
-                field_data = self.features[column].dropna()
-                if len(field_data) < 10:
-                    continue
-                
-                # Находим активации поля
-                if field_data.dtype in ['int64', 'float64']:
-                    # Для числовых полей - активация через порог
-                    threshold = field_data.quantile(0.8)
-                    activations = field_data[field_data > threshold].index.tolist()
-                elif column.endswith('_signal'):
-                    # Для сигнальных полей - любое значение
-                    activations = field_data[field_data.notna()].index.tolist()
-                else:
-                    continue
-                
-                if len(activations) < 3:
-                    continue
-                
-                # Анализ лагов между активациями и событиями
-                lags_found = []
-                
-                for event_idx in events_indices:
-                    # Ищем активации ПЕРЕД событием
-                    prior_activations = [act for act in activations if act < event_idx and (event_idx - act) <= max_lag]
-                    
-                    if prior_activations:
-                        # Берем ближайшую активацию
-                        closest_activation = max(prior_activations)
-                        lag = event_idx - closest_activation
-                        lags_found.append(lag)
-                
-                if len(lags_found) >= 3:
-                    temporal_lags[column] = {
-                        'mean_lag': float(np.mean(lags_found)),
-                        'median_lag': float(np.median(lags_found)),
-                        'std_lag': float(np.std(lags_found)),
-                        'min_lag': int(min(lags_found)),
-                        'max_lag': int(max(lags_found)),
-                        'lag_samples': len(lags_found),
-                        'predictive_power': len(lags_found) / len(events_indices)  # Доля событий с предшествующей активацией
-                    }
+            columns = self._col_meta['analyzable']
+            
+            for column, lag_data in zip(columns, self._map_columns(self._temporal_lags_for_column, columns, events_indices, max_lag)):
+                if lag_data is not None:
+                    temporal_lags[column] = lag_data
             
             self.real_temporal_lags = temporal_lags
             
@@ -965,8 +1421,8 @@ class HonestDataDrivenAnalyzer:
             
             # Показываем лучшие предикторы
             if temporal_lags:
-                best_predictors = sorted(temporal_lags.items(), 
-                                       key=lambda x: x[1]['predictive_power'], reverse=True)[:5]
+                best_predictors = heapq.nlargest(5, temporal_lags.items(), 
+                                                  key=lambda x: x[1]['predictive_power'])
                 
                 print("🏆 Лучшие предикторы по времени:")
                 for field, stats in best_predictors:
@@ -980,6 +1436,57 @@ class HonestDataDrivenAnalyzer:
             traceback.print_exc()
             return False
 
+    def _temporal_lags_for_column(self, column, events_indices, max_lag):
+        """Временные лаги одного поля (None - если активаций/лагов недостаточно)"""
+        if column in self._col_meta['numeric']:
+            values = self._numeric_values(column)
+            valid_values = values[~np.isnan(values)]
+            if len(valid_values) < 10:
+                return None
+            
+            # Для числовых полей - активация через порог
+            threshold = np.quantile(valid_values, 0.8)
+            activations = self.features.index[values > threshold].tolist()
+        
+        elif column in self._col_meta['signal']:
+            field_data = self.features[column].dropna()
+            if len(field_data) < 10:
+                return None
+            
+            # Для сигнальных полей - любое значение
+            activations = field_data[field_data.notna()].index.tolist()
+        else:
+            return None
+        
+        if len(activations) < 3:
+            return None
+        
+        # Анализ лагов между активациями и событиями
+        lags_found = []
+        
+        for event_idx in events_indices:
+            # Ищем активации ПЕРЕД событием
+            prior_activations = [act for act in activations if act < event_idx and (event_idx - act) <= max_lag]
+            
+            if prior_activations:
+                # Берем ближайшую активацию
+                closest_activation = max(prior_activations)
+                lag = event_idx - closest_activation
+                lags_found.append(lag)
+        
+        if len(lags_found) >= 3:
+            return {
+                'mean_lag': float(np.mean(lags_found)),
+                'median_lag': float(np.median(lags_found)),
+                'std_lag': float(np.std(lags_found)),
+                'min_lag': int(min(lags_found)),
+                'max_lag': int(max(lags_found)),
+                'lag_samples': len(lags_found),
+                'predictive_power': len(lags_found) / len(events_indices)  # Доля событий с предшествующей активацией
+            }
+        
+        return None
+
     def find_veto_fields(self):
         """
         ПОИСК VETO полей через антикорреляции
@@ -994,81 +1501,12 @@ class HonestDataDrivenAnalyzer:
             events_mask = self.events['events_mask'].astype(int)
             veto_fields = {}
             
-            for column in self.features.columns:
-                if column in ['line_number', 'timestamp']:
-                    continue
-                
-                field_data = self.features[column].dropna()
-                if len(field_data) < 10:
-                    continue
-                
-                # Выравниваем индексы
-                common_idx = field_data.index.intersection(events_mask.index)
-                if len(common_idx) < 10:
-                    continue
-                
-                field_aligned = field_data.loc[common_idx]
-                events_aligned = events_mask.loc[common_idx]
-                
-                if field_aligned.dtype in ['int64', 'float64']:
-                    # Ищем пороги, при которых события РЕЖЕ происходят
-                    for percentile in [0.1, 0.2, 0.3, 0.8, 0.9, 0.95]:
-                        threshold = field_aligned.quantile(percentile)
-                        
-                        # Проверяем активацию выше и ниже порога
-                        if percentile <= 0.3:
-                            # Низкие значения как блокиратор
-                            condition = field_aligned <= threshold
-                            veto_name = f"{column}_low"
-                        else:
-                            # Высокие значения как блокиратор
-                            condition = field_aligned >= threshold
-                            veto_name = f"{column}_high"
-                        
-                        if condition.sum() > 5:  # Достаточно активаций
-                            # События при активации VETO условия
-                            events_with_veto = events_aligned[condition]
-                            events_without_veto = events_aligned[~condition]
-                            
-                            if len(events_without_veto) > 0 and len(events_with_veto) > 0:
-                                veto_event_rate = events_with_veto.mean()
-                                normal_event_rate = events_without_veto.mean()
-                                
-                                # VETO эффективность = насколько сильно снижает частоту событий
-                                if normal_event_rate > 0:
-                                    veto_effectiveness = (normal_event_rate - veto_event_rate) / normal_event_rate
-                                    
-                                    # Статистическая значимость
-                                    try:
-                                        from scipy.stats import chi2_contingency
-                                        
-                                        contingency = pd.crosstab(condition, events_aligned)
-                                        if contingency.shape == (2, 2):
-                                            chi2, p_val, _, _ = chi2_contingency(contingency)
-                                            significant = p_val < self.config['analysis']['significance_level']
-                                        else:
-                                            significant = False
-                                            p_val = 1.0
-                                    except:
-                                        significant = False
-                                        p_val = 1.0
-                                    
-                                    # Сохраняем если эффективность выше порога
-                                    if (veto_effectiveness > self.config['veto']['effectiveness_threshold'] and 
-                                        significant):
-                                        
-                                        veto_fields[veto_name] = {
-                                            'base_field': column,
-                                            'threshold': float(threshold),
-                                            'condition': 'low' if percentile <= 0.3 else 'high',
-                                            'veto_effectiveness': float(veto_effectiveness),
-                                            'normal_event_rate': float(normal_event_rate),
-                                            'veto_event_rate': float(veto_event_rate),
-                                            'activation_frequency': float(condition.mean()),
-                                            'p_value': float(p_val),
-                                            'significant': significant,
-                                            'events_blocked': int((events_without_veto.sum() - events_with_veto.sum()) * condition.mean())
-                                        }
+            columns = self._col_meta['analyzable']
+            
+            features_aligned, events_aligned = self._align_with_events(events_mask)
+            
+            for column_vetos in self._map_columns(self._veto_fields_for_column, columns, features_aligned, events_aligned):
+                veto_fields.update(column_vetos)
             
             self.veto_fields = veto_fields
             
@@ -1076,8 +1514,8 @@ class HonestDataDrivenAnalyzer:
             
             if veto_fields:
                 print("🚫 Лучшие VETO поля:")
-                best_vetos = sorted(veto_fields.items(), 
-                                  key=lambda x: x[1]['veto_effectiveness'], reverse=True)[:3]
+                best_vetos = heapq.nlargest(3, veto_fields.items(), 
+                                             key=lambda x: x[1]['veto_effectiveness'])
                 
                 for veto_name, stats in best_vetos:
                     print(f"   {veto_name}: блокирует {stats['veto_effectiveness']:.1%} событий (p={stats['p_value']:.3f})")
@@ -1090,6 +1528,83 @@ class HonestDataDrivenAnalyzer:
             traceback.print_exc()
             return False
 
+    def _veto_fields_for_column(self, column, features_aligned, events_mask):
+        """VETO условия одного поля: {veto_name: статистика}"""
+        column_vetos = {}
+        
+        if column not in self._col_meta['numeric']:
+            return column_vetos
+        
+        values = self._numeric_values(column, features_aligned)
+        valid = ~np.isnan(values)
+        if valid.sum() < 10:
+            return column_vetos
+        
+        field_aligned = values[valid]
+        events_aligned = events_mask.to_numpy()[valid]
+        
+        # Ищем пороги, при которых события РЕЖЕ происходят
+        # (все квантили - одним partition по набору позиций, без повторной выборки на каждый уровень)
+        percentiles = [0.1, 0.2, 0.3, 0.8, 0.9, 0.95]
+        for percentile, threshold in zip(percentiles, np.quantile(field_aligned, percentiles)):
+            
+            # Проверяем активацию выше и ниже порога
+            if percentile <= 0.3:
+                # Низкие значения как блокиратор
+                condition = field_aligned <= threshold
+                veto_name = f"{column}_low"
+            else:
+                # Высокие значения как блокиратор
+                condition = field_aligned >= threshold
+                veto_name = f"{column}_high"
+            
+            if condition.sum() > 5:  # Достаточно активаций
+                # События при активации VETO условия
+                events_with_veto = events_aligned[condition]
+                events_without_veto = events_aligned[~condition]
+                
+                if len(events_without_veto) > 0 and len(events_with_veto) > 0:
+                    veto_event_rate = events_with_veto.mean()
+                    normal_event_rate = events_without_veto.mean()
+                    
+                    # VETO эффективность = насколько сильно снижает частоту событий
+                    if normal_event_rate > 0:
+                        veto_effectiveness = (normal_event_rate - veto_event_rate) / normal_event_rate
+                        
+                        # Статистическая значимость
+                        try:
+                            from scipy.stats import chi2_contingency
+                            
+                            contingency = self._contingency_2x2(condition, events_aligned)
+                            if contingency is not None:
+                                chi2, p_val, _, _ = chi2_contingency(contingency)
+                                significant = p_val < self.config['analysis']['significance_level']
+                            else:
+                                significant = False
+                                p_val = 1.0
+                        except:
+                            significant = False
+                            p_val = 1.0
+                        
+                        # Сохраняем если эффективность выше порога
+                        if (veto_effectiveness > self.config['veto']['effectiveness_threshold'] and 
+                            significant):
+                            
+                            column_vetos[veto_name] = {
+                                'base_field': column,
+                                'threshold': float(threshold),
+                                'condition': 'low' if percentile <= 0.3 else 'high',
+                                'veto_effectiveness': float(veto_effectiveness),
+                                'normal_event_rate': float(normal_event_rate),
+                                'veto_event_rate': float(veto_event_rate),
+                                'activation_frequency': float(condition.mean()),
+                                'p_value': float(p_val),
+                                'significant': significant,
+                                'events_blocked': int((events_without_veto.sum() - events_with_veto.sum()) * condition.mean())
+                            }
+        
+        return column_vetos
+
     def create_honest_scoring_system(self):
         """
         Честная система скоринга ТОЛЬКО на основе статистики
@@ -1102,10 +1617,11 @@ class HonestDataDrivenAnalyzer:
             
             scoring_features = []
             feature_importance = {}
+            new_columns = {}  # Бинарные признаки добавляются в self.features одним concat
             
             # 1. Числовые поля с реальными ROC-AUC
             for field, roc_data in self.field_roc_scores.items():
-                if field.endswith('_signal'):
+                if field in self._col_meta['signal']:
                     continue  # Обрабатываем отдельно
                 
                 roc_score = roc_data.get('best_roc_auc', 0.5)
@@ -1115,7 +1631,7 @@ class HonestDataDrivenAnalyzer:
                     activated_field = f"{field}_activated"
                     
                     # Создаем бинарный признак
-                    self.features[activated_field] = (self.features[field] > threshold).astype(int)
+                    new_columns[activated_field] = (self._numeric_values(field) > threshold).astype(np.int8)
                     scoring_features.append(activated_field)
                     
                     # Важность = ROC-AUC - 0.5 (превышение над случайностью)
@@ -1124,7 +1640,7 @@ class HonestDataDrivenAnalyzer:
             
             # 2. Категориальные поля (сигнальные) с реальной эффективностью
             for field, corr_data in self.field_correlations.items():
-                if field.endswith('_signal') and 'signal_performance' in corr_data:
+                if field in self._col_meta['signal'] and 'signal_performance' in corr_data:
                     signal_performance = corr_data['signal_performance']
                     
                     for signal, stats in signal_performance.items():
@@ -1133,8 +1649,7 @@ class HonestDataDrivenAnalyzer:
                             activated_field = f"{field}_{signal.replace('!', 'excl')}_activated"
                             
                             # Создаем бинарный признак
-                            signal_mask = (self.features[field] == signal).astype(int)
-                            self.features[activated_field] = signal_mask
+                            new_columns[activated_field] = (self.features[field].to_numpy() == signal).astype(np.int8)
                             scoring_features.append(activated_field)
                             
                             # Важность = эффективность * частота (взвешенная полезность)
@@ -1163,11 +1678,11 @@ class HonestDataDrivenAnalyzer:
                     
                     if base_field in self.features.columns:
                         if condition == 'low':
-                            veto_mask = (self.features[base_field] <= threshold).astype(int)
+                            veto_mask = self._numeric_values(base_field) <= threshold
                         else:
-                            veto_mask = (self.features[base_field] >= threshold).astype(int)
+                            veto_mask = self._numeric_values(base_field) >= threshold
                         
-                        self.features[veto_field] = veto_mask
+                        new_columns[veto_field] = veto_mask.astype(np.int8)
                         scoring_features.append(veto_field)
                         
                         # Отрицательная важность для VETO
@@ -1178,16 +1693,30 @@ class HonestDataDrivenAnalyzer:
                         feature_importance[veto_field] = importance
                         veto_features += 1
             
-            # Нормализация важности
-            total_positive_importance = sum([v for v in feature_importance.values() if v > 0])
-            total_negative_importance = abs(sum([v for v in feature_importance.values() if v < 0]))
+            # Все бинарные признаки - одной вставкой (без фрагментации BlockManager).
+            # copy=False: блоки self.features переиспользуются, копируется только новый int8 блок
+            if new_columns:
+                existing = [column for column in new_columns if column in self.features.columns]
+                base = self.features.drop(columns=existing) if existing else self.features
+                self.features = pd.concat([
+                    base,
+                    pd.DataFrame(new_columns, index=self.features.index)
+                ], axis=1, copy=False)
+            
+            # Нормализация важности (векторно по всем признакам)
+            keys = list(feature_importance)
+            values = np.fromiter((feature_importance[k] for k in keys), dtype=float, count=len(keys))
+            positive = values > 0
+            negative = values < 0
+            
+            total_positive_importance = values[positive].sum()
+            total_negative_importance = abs(values[negative].sum())
             
             if total_positive_importance > 0:
-                for k, v in feature_importance.items():
-                    if v > 0:
-                        feature_importance[k] = v / total_positive_importance * 0.8  # 80% на позитивные
-                    elif v < 0 and total_negative_importance > 0:
-                        feature_importance[k] = v / total_negative_importance * 0.2  # 20% на негативные
+                values[positive] = values[positive] / total_positive_importance * 0.8  # 80% на позитивные
+                if total_negative_importance > 0:
+                    values[negative] = values[negative] / total_negative_importance * 0.2  # 20% на негативные
+                feature_importance = dict(zip(keys, values.tolist()))
             
             self.scoring_system = {
                 'features': scoring_features,
@@ -1198,6 +1727,7 @@ class HonestDataDrivenAnalyzer:
                 'veto_features': veto_features,
                 'methodology': 'data_driven_statistical'
             }
+            self._build_feature_meta()
             
             print(f"✅ Честная система скоринга: {len(scoring_features)} признаков")
             print(f"   📊 Числовых: {self.scoring_system['numeric_features']}")
@@ -1226,8 +1756,10 @@ class HonestDataDrivenAnalyzer:
             if len(available_features) == 0:
                 return False
             
-            X = self.features[available_features].fillna(0)
-            y = self.events['events_mask'].astype(int)
+            # Бинарные признаки скоринга (int8) -> один непрерывный float32 блок:
+            # деревья sklearn работают во float32, внутренней копии при fit не будет
+            X = np.ascontiguousarray(self.features[available_features].fillna(0).to_numpy(dtype=np.float32))
+            y = self.events['events_mask'].to_numpy(dtype=np.int8)
             
             if len(X) < 20:
                 # Минимальная валидация для малых данных
@@ -1245,8 +1777,14 @@ class HonestDataDrivenAnalyzer:
                 # Полная валидация
                 X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
                 
-                model = RandomForestClassifier(n_estimators=100, random_state=42, 
-                                             class_weight='balanced')  # Учитываем дисбаланс классов
+                n_jobs = self.config.get('performance', {}).get('n_jobs', -1)
+                if len(available_features) < 5:
+                    model = RandomForestClassifier(n_estimators=100, n_jobs=n_jobs, random_state=42,
+                                                 class_weight='balanced')  # Учитываем дисбаланс классов
+                else:
+                    # Гистограммный бустинг: биннинг + OpenMP, в разы быстрее RF на многих признаках
+                    model = HistGradientBoostingClassifier(max_iter=100, max_bins=64, random_state=42,
+                                                           class_weight='balanced')
                 model.fit(X_train, y_train)
                 
                 y_pred_proba = model.predict_proba(X_val)[:, 1]
@@ -1259,9 +1797,20 @@ class HonestDataDrivenAnalyzer:
                     'recall': (y_pred * y_val).sum() / max(1, y_val.sum()),
                     'event_rate': y_val.mean(),
                     'features_used': len(available_features),
-                    'feature_importances': dict(zip(available_features, model.feature_importances_))
+                    'model': type(model).__name__
                 }
                 
+                # Встроенные важности есть только у RandomForest; для бустинга -
+                # перестановочные на валидационной выборке (падение ROC-AUC)
+                if hasattr(model, 'feature_importances_'):
+                    importances = model.feature_importances_
+                    self.validation_results['feature_importances_method'] = 'impurity'
+                else:
+                    importances = permutation_importance(model, X_val, y_val, scoring='roc_auc', n_repeats=5,
+                                                         random_state=42, n_jobs=n_jobs).importances_mean
+                    self.validation_results['feature_importances_method'] = 'permutation'
+                self.validation_results['feature_importances'] = dict(zip(available_features, importances))
+                
                 self.validation_results['lift'] = (self.validation_results['precision'] / 
                                                  max(0.01, self.validation_results['event_rate']))
             
@@ -1286,32 +1835,44 @@ class HonestDataDrivenAnalyzer:
         
         log_name = Path(file_path).stem
         results_folder = self.results_dir
+        self._outputs = []
         
         try:
-            # 1. ГЛАВНЫЙ СТАТИСТИЧЕСКИЙ ОТЧЕТ
-            self.create_statistical_analysis_report(results_folder, log_name)
-            
-            # 2. ТЕХНИЧЕСКИЕ ФАЙЛЫ С РЕАЛЬНОЙ СТАТИСТИКОЙ
-            self.save_real_correlations(results_folder)
-            self.save_real_temporal_lags(results_folder)
-            self.save_veto_analysis(results_folder)
-            self.save_field_statistics(results_folder)
-            self.save_events_analysis(results_folder)
-            self.save_honest_weight_matrix(results_folder)
-            self.save_honest_scoring_config(results_folder)
-            
-            # 3. CSV ТАБЛИЦЫ С РЕАЛЬНЫМИ ДАННЫМИ
-            self.create_honest_top_fields(results_folder)
-            self.create_correlation_matrix_csv(results_folder)
-            self.create_veto_effectiveness_csv(results_folder)
-            
-            # 4. ВИЗУАЛИЗАЦИИ НА ОСНОВЕ ДАННЫХ
-            self.create_honest_visualizations(results_folder)
+            # Выходные файлы независимы: кодирование и запись идут в пуле потоков
+            # (запись на диск и orjson отпускают GIL)
+            writers = [
+                # 1. ГЛАВНЫЙ СТАТИСТИЧЕСКИЙ ОТЧЕТ
+                lambda: self.create_statistical_analysis_report(results_folder, log_name),
+                
+                # 2. ТЕХНИЧЕСКИЕ ФАЙЛЫ С РЕАЛЬНОЙ СТАТИСТИКОЙ
+                lambda: self.save_real_correlations(results_folder),
+                lambda: self.save_real_temporal_lags(results_folder),
+                lambda: self.save_veto_analysis(results_folder),
+                lambda: self.save_field_statistics(results_folder),
+                lambda: self.save_events_analysis(results_folder),
+                lambda: self.save_honest_weight_matrix(results_folder),
+                lambda: self.save_honest_scoring_config(results_folder),
+                
+                # 3. CSV ТАБЛИЦЫ С РЕАЛЬНЫМИ ДАННЫМИ
+                lambda: self.create_honest_top_fields(results_folder),
+                lambda: self.create_correlation_matrix_csv(results_folder),
+                lambda: self.create_veto_effectiveness_csv(results_folder)
+            ]
+            
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(writer) for writer in writers]
+                
+                # 4. ВИЗУАЛИЗАЦИИ НА ОСНОВЕ ДАННЫХ - в главном потоке (pyplot не потокобезопасен)
+                self.create_honest_visualizations(results_folder)
+                
+                for future in futures:
+                    future.result()
             
-            created_files = list(results_folder.glob("*.*"))
+            # Список ведется writer-ами - без повторного сканирования каталога
+            created_files = sorted(self._outputs)
             
             print(f"\n✅ СОЗДАНО {len(created_files)} ЧЕСТНЫХ ФАЙЛОВ:")
-            for file in sorted(created_files):
+            for file in created_files:
                 print(f"   📄 {file.name}")
             
             return str(results_folder)
@@ -1325,202 +1886,224 @@ class HonestDataDrivenAnalyzer:
     def create_statistical_analysis_report(self, results_folder, log_name):
         """📋 ГЛАВНЫЙ СТАТИСТИЧЕСКИЙ ОТЧЕТ"""
         
-        report_lines = [
-            "📊 СТАТИСТИЧЕСКИЙ АНАЛИЗ ФИНАНСОВЫХ ДАННЫХ",
-            "=" * 60,
-            f"📅 Дата анализа: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"📁 Файл данных: {log_name}",
-            "",
-            "⚠️  ПРИНЦИП: ТОЛЬКО СТАТИСТИКА, НИКАКИХ ПРЕДПОЛОЖЕНИЙ",
-            "",
-            "🎯 ОСНОВНЫЕ РЕЗУЛЬТАТЫ:",
-            ""
-        ]
-        
-        # Статистика данных
-        if self.parsed_data is not None:
-            total_records = len(self.parsed_data)
-            total_fields = len(self.parsed_data.columns)
-            
-            report_lines.extend([
-                f"📊 Обработано записей: {total_records:,}",
-                f"📊 Извлечено полей: {total_fields}",
-                ""
-            ])
-        
-        # События
-        if self.events:
-            total_events = self.events.get('total_events', 0)
-            event_rate = self.events.get('event_rate', 0) * 100
-            detection_method = self.events.get('detection_method', 'unknown')
-            
-            report_lines.extend([
-                "🎯 АВТОМАТИЧЕСКИ ОПРЕДЕЛЕННЫЕ СОБЫТИЯ:",
-                f"   Найдено событий: {total_events}",
-                f"   Частота событий: {event_rate:.2f}%",
-                f"   Метод определения: {detection_method}",
-                ""
-            ])
-        
-        # Статистика корреляций
-        if self.field_correlations:
-            significant_correlations = 0
-            total_correlations = 0
-            
-            for field, corr_data in self.field_correlations.items():
-                if 'significant' in corr_data:
-                    total_correlations += 1
-                    if corr_data['significant']:
-                        significant_correlations += 1
-                elif 'signal_performance' in corr_data:
-                    for signal, stats in corr_data['signal_performance'].items():
-                        total_correlations += 1
-                        if stats.get('significant', False):
-                            significant_correlations += 1
-            
-            report_lines.extend([
-                "🔍 КОРРЕЛЯЦИОННЫЙ АНАЛИЗ:",
-                f"   Всего проанализировано связей: {total_correlations}",
-                f"   Статистически значимых: {significant_correlations}",
-                f"   Доля значимых связей: {significant_correlations/max(1,total_correlations)*100:.1f}%",
-                ""
-            ])
-        
-        # Лучшие поля по ROC-AUC
-        if self.field_roc_scores:
-            best_fields = sorted(self.field_roc_scores.items(), 
-                               key=lambda x: x[1].get('best_roc_auc', 0.5), reverse=True)[:5]
-            
-            report_lines.extend([
-                "🏆 ПОЛЯ С ЛУЧШЕЙ ПРЕДСКАЗАТЕЛЬНОЙ СИЛОЙ (ROC-AUC):",
-            ])
-            
-            for field, roc_data in best_fields:
-                roc_score = roc_data.get('best_roc_auc', 0.5)
-                if roc_score > 0.55:  # Только лучше случайности
-                    report_lines.append(f"   {field}: ROC-AUC = {roc_score:.3f}")
-            
-            report_lines.append("")
-        
-        # Временные лаги
-        if self.real_temporal_lags:
-            best_predictors = sorted(self.real_temporal_lags.items(), 
-                                   key=lambda x: x[1]['predictive_power'], reverse=True)[:5]
-            
-            report_lines.extend([
-                "⏰ ВРЕМЕННЫЕ ХАРАКТЕРИСТИКИ ПРЕДИКТОРОВ:",
-            ])
-            
-            for field, lag_data in best_predictors:
-                mean_lag = lag_data['mean_lag']
-                predictive_power = lag_data['predictive_power'] * 100
-                report_lines.append(f"   {field}: {mean_lag:.1f} периодов до события ({predictive_power:.1f}% событий)")
-            
-            report_lines.append("")
-        
-        # VETO поля
-        if self.veto_fields:
-            best_vetos = sorted(self.veto_fields.items(), 
-                              key=lambda x: x[1]['veto_effectiveness'], reverse=True)[:3]
-            
-            report_lines.extend([
-                "🚫 НАЙДЕННЫЕ VETO ПОЛЯ (блокираторы ложных сигналов):",
+        # Отчет пишется в файл посекционно - без промежуточного списка строк и join
+        output_file = results_folder / "СТАТИСТИЧЕСКИЙ_АНАЛИЗ.txt"
+        report_ts = self._report_ts or datetime.now()
+        
+        # Шаблоны строк ТОП-секций - форматируются сразу в файл, без промежуточных строк
+        roc_line = "   {}: ROC-AUC = {:.3f}\n".format
+        lag_line = "   {}: {:.1f} периодов до события ({:.1f}% событий)\n".format
+        veto_line = "   {} ({} {:.2f}): блокирует {:.1f}% ложных сигналов\n".format
+        
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines([
+                "📊 СТАТИСТИЧЕСКИЙ АНАЛИЗ ФИНАНСОВЫХ ДАННЫХ\n",
+                "=" * 60 + "\n",
+                f"📅 Дата анализа: {report_ts:%Y-%m-%d %H:%M:%S}\n",
+                f"📁 Файл данных: {log_name}\n",
+                "\n",
+                "⚠️  ПРИНЦИП: ТОЛЬКО СТАТИСТИКА, НИКАКИХ ПРЕДПОЛОЖЕНИЙ\n",
+                "\n",
+                "🎯 ОСНОВНЫЕ РЕЗУЛЬТАТЫ:\n",
+                "\n"
             ])
             
-            for veto_name, veto_data in best_vetos:
-                effectiveness = veto_data['veto_effectiveness'] * 100
-                condition = veto_data['condition']
-                threshold = veto_data['threshold']
-                base_field = veto_data['base_field']
+            # Статистика данных
+            if self.parsed_data is not None:
+                total_records, total_fields = self._data_shape or self.parsed_data.shape
                 
-                report_lines.append(f"   {base_field} ({condition} {threshold:.2f}): блокирует {effectiveness:.1f}% ложных сигналов")
-            
-            report_lines.append("")
-        
-        # Валидация
-        if self.validation_results:
-            val = self.validation_results
-            
-            report_lines.extend([
-                "✅ КАЧЕСТВО МОДЕЛИ (валидация на отложенной выборке):",
-                f"   ROC-AUC: {val['roc_auc']:.3f}",
-                f"   Точность: {val['accuracy']:.3f} ({val['accuracy']*100:.1f}%)",
-                f"   Lift: {val['lift']:.2f}x",
-                f"   Использовано признаков: {val['features_used']}",
-                ""
+                f.writelines([
+                    f"📊 Обработано записей: {total_records:,}\n",
+                    f"📊 Извлечено полей: {total_fields}\n",
+                    "\n"
+                ])
+            
+            # События
+            if self.events:
+                total_events = self.events.get('total_events', 0)
+                event_rate = self.events.get('event_rate', 0) * 100
+                detection_method = self.events.get('detection_method', 'unknown')
+                
+                f.writelines([
+                    "🎯 АВТОМАТИЧЕСКИ ОПРЕДЕЛЕННЫЕ СОБЫТИЯ:\n",
+                    f"   Найдено событий: {total_events}\n",
+                    f"   Частота событий: {event_rate:.2f}%\n",
+                    f"   Метод определения: {detection_method}\n",
+                    "\n"
+                ])
+            
+            # Статистика корреляций
+            if self.field_correlations:
+                # Один проход: флаг значимости для каждой связи (числовой или сигнальной)
+                significance_flags = [
+                    bool(flag)
+                    for corr_data in self.field_correlations.values()
+                    for flag in ((corr_data['significant'],) if 'significant' in corr_data else
+                                 (stats.get('significant', False) 
+                                  for stats in corr_data.get('signal_performance', {}).values()))
+                ]
+                total_correlations = len(significance_flags)
+                significant_correlations = sum(significance_flags)
+                
+                f.writelines([
+                    "🔍 КОРРЕЛЯЦИОННЫЙ АНАЛИЗ:\n",
+                    f"   Всего проанализировано связей: {total_correlations}\n",
+                    f"   Статистически значимых: {significant_correlations}\n",
+                    f"   Доля значимых связей: {significant_correlations/max(1,total_correlations)*100:.1f}%\n",
+                    "\n"
+                ])
+            
+            # Лучшие поля по ROC-AUC
+            if self.field_roc_scores:
+                best_fields = heapq.nlargest(5, self.field_roc_scores.items(), 
+                                              key=lambda x: x[1].get('best_roc_auc', 0.5))
+                
+                f.write("🏆 ПОЛЯ С ЛУЧШЕЙ ПРЕДСКАЗАТЕЛЬНОЙ СИЛОЙ (ROC-AUC):\n")
+                f.writelines(
+                    roc_line(field, roc_data.get('best_roc_auc', 0.5))
+                    for field, roc_data in best_fields
+                    if roc_data.get('best_roc_auc', 0.5) > 0.55  # Только лучше случайности
+                )
+                f.write("\n")
+            
+            # Временные лаги
+            if self.real_temporal_lags:
+                best_predictors = heapq.nlargest(5, self.real_temporal_lags.items(), 
+                                                  key=lambda x: x[1]['predictive_power'])
+                
+                f.write("⏰ ВРЕМЕННЫЕ ХАРАКТЕРИСТИКИ ПРЕДИКТОРОВ:\n")
+                f.writelines(
+                    lag_line(field, lag_data['mean_lag'], lag_data['predictive_power'] * 100)
+                    for field, lag_data in best_predictors
+                )
+                f.write("\n")
+            
+            # VETO поля
+            if self.veto_fields:
+                best_vetos = heapq.nlargest(3, self.veto_fields.items(), 
+                                             key=lambda x: x[1]['veto_effectiveness'])
+                
+                f.write("🚫 НАЙДЕННЫЕ VETO ПОЛЯ (блокираторы ложных сигналов):\n")
+                f.writelines(
+                    veto_line(veto_data['base_field'], veto_data['condition'], veto_data['threshold'],
+                              veto_data['veto_effectiveness'] * 100)
+                    for _, veto_data in best_vetos
+                )
+                f.write("\n")
+            
+            # Валидация
+            if self.validation_results:
+                val = self.validation_results
+                
+                f.writelines([
+                    "✅ КАЧЕСТВО МОДЕЛИ (валидация на отложенной выборке):\n",
+                    f"   ROC-AUC: {val['roc_auc']:.3f}\n",
+                    f"   Точность: {val['accuracy']:.3f} ({val['accuracy']*100:.1f}%)\n",
+                    f"   Lift: {val['lift']:.2f}x\n",
+                    f"   Использовано признаков: {val['features_used']}\n",
+                    "\n"
+                ])
+            
+            # Методология
+            f.writelines([
+                "🔬 МЕТОДОЛОГИЯ АНАЛИЗА:\n",
+                "\n",
+                "1. АВТОМАТИЧЕСКОЕ ОПРЕДЕЛЕНИЕ СОБЫТИЙ:\n",
+                "   - Поиск локальных экстремумов в ценах\n",
+                "   - Анализ волатильности (2σ отклонения)\n",
+                "   - Фильтрация по значимости движений\n",
+                "\n",
+                "2. СТАТИСТИЧЕСКИЙ АНАЛИЗ ПОЛЕЙ:\n",
+                "   - Корреляция Пирсона для числовых полей\n",
+                "   - Таблицы сопряженности для категориальных\n",
+                "   - ROC-AUC для разных пороговых значений\n",
+                "   - Проверка статистической значимости (p < 0.05)\n",
+                "\n",
+                "3. ВРЕМЕННОЙ АНАЛИЗ:\n",
+                "   - Поиск активаций полей перед событиями\n",
+                "   - Расчет средних лагов и стандартных отклонений\n",
+                "   - Оценка предсказательной силы по времени\n",
+                "\n",
+                "4. VETO АНАЛИЗ:\n",
+                "   - Поиск условий, снижающих частоту событий\n",
+                "   - Оценка эффективности блокировки\n",
+                "   - Статистическая значимость антикорреляций\n",
+                "\n",
+                "5. ПРИНЦИПЫ:\n",
+                "   - НИ ОДНО поле не имеет априорного преимущества\n",
+                "   - Только data-driven подход\n",
+                "   - Поиск неожиданных корреляций\n",
+                "   - Полная статистическая объективность\n",
+                "\n",
+                "📁 ДОПОЛНИТЕЛЬНЫЕ ФАЙЛЫ:\n",
+                "   - real_correlations.json = все корреляции с p-значениями\n",
+                "   - real_temporal_lags.json = временные характеристики\n",
+                "   - veto_analysis.json = анализ блокираторов\n",
+                "   - honest_weight_matrix.feather (.csv с флагом --csv) = веса на основе статистики\n",
+                "   - field_statistics.json = детальная статистика полей\n",
+                "\n",
+                "=" * 60 + "\n",
+                "🎊 ЧЕСТНЫЙ АНАЛИЗ БЕЗ ПРЕДВЗЯТОСТИ ЗАВЕРШЕН!\n"
             ])
         
-        # Методология
-        report_lines.extend([
-            "🔬 МЕТОДОЛОГИЯ АНАЛИЗА:",
-            "",
-            "1. АВТОМАТИЧЕСКОЕ ОПРЕДЕЛЕНИЕ СОБЫТИЙ:",
-            "   - Поиск локальных экстремумов в ценах",
-            "   - Анализ волатильности (2σ отклонения)",
-            "   - Фильтрация по значимости движений",
-            "",
-            "2. СТАТИСТИЧЕСКИЙ АНАЛИЗ ПОЛЕЙ:",
-            "   - Корреляция Пирсона для числовых полей",
-            "   - Таблицы сопряженности для категориальных",
-            "   - ROC-AUC для разных пороговых значений",
-            "   - Проверка статистической значимости (p < 0.05)",
-            "",
-            "3. ВРЕМЕННОЙ АНАЛИЗ:",
-            "   - Поиск активаций полей перед событиями",
-            "   - Расчет средних лагов и стандартных отклонений",
-            "   - Оценка предсказательной силы по времени",
-            "",
-            "4. VETO АНАЛИЗ:",
-            "   - Поиск условий, снижающих частоту событий",
-            "   - Оценка эффективности блокировки",
-            "   - Статистическая значимость антикорреляций",
-            "",
-            "5. ПРИНЦИПЫ:",
-            "   - НИ ОДНО поле не имеет априорного преимущества",
-            "   - Только data-driven подход",
-            "   - Поиск неожиданных корреляций",
-            "   - Полная статистическая объективность",
-            "",
-            "📁 ДОПОЛНИТЕЛЬНЫЕ ФАЙЛЫ:",
-            "   - real_correlations.json = все корреляции с p-значениями",
-            "   - real_temporal_lags.json = временные характеристики",
-            "   - veto_analysis.json = анализ блокираторов",
-            "   - honest_weight_matrix.csv = веса на основе статистики",
-            "   - field_statistics.json = детальная статистика полей",
-            "",
-            "=" * 60,
-            "🎊 ЧЕСТНЫЙ АНАЛИЗ БЕЗ ПРЕДВЗЯТОСТИ ЗАВЕРШЕН!"
-        ])
-        
-        # Сохранение отчета
-        output_file = results_folder / "СТАТИСТИЧЕСКИЙ_АНАЛИЗ.txt"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(report_lines))
-        
+        self._outputs.append(output_file)
         print("   📋 СТАТИСТИЧЕСКИЙ_АНАЛИЗ.txt")
 
+    def _to_python(self, obj):
+        """
+        Один рекурсивный проход: numpy/pandas значения -> встроенные типы Python
+        
+        После конвертации стандартный json кодирует все в C без вызова default
+        на каждый numpy-скаляр. NaN/inf -> None, как в orjson (валидный JSON).
+        """
+        if isinstance(obj, dict):
+            return {key if isinstance(key, str) else str(self._to_python(key)): self._to_python(value)
+                    for key, value in obj.items()}
+        if isinstance(obj, (list, tuple, set)):
+            return [self._to_python(value) for value in obj]
+        if isinstance(obj, np.ndarray):
+            return self._to_python(obj.tolist())
+        if isinstance(obj, np.generic):
+            obj = obj.item()
+        if isinstance(obj, float) and not np.isfinite(obj):
+            return None
+        if isinstance(obj, (pd.Timestamp, datetime)):
+            return obj.isoformat()
+        return obj
+
+    def _dump_json(self, obj, path):
+        """
+        Запись JSON результатов: orjson (numpy-скаляры и массивы кодируются в C),
+        без orjson - стандартный json по заранее сконвертированному _to_python объекту
+        """
+        if ORJSON_AVAILABLE:
+            options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            # pd.Timestamp - подкласс datetime, который orjson не кодирует сам: ISO как у datetime
+            default = lambda value: value.isoformat() if isinstance(value, pd.Timestamp) else str(value)
+            path.write_bytes(orjson.dumps(obj, default=default, option=options))
+        else:
+            with open(path, 'w') as f:
+                json.dump(self._to_python(obj), f, indent=2, default=str)
+        self._outputs.append(path)
+
     def save_real_correlations(self, results_folder):
         """💾 Реальные корреляции с p-значениями"""
-        with open(results_folder / 'real_correlations.json', 'w') as f:
-            json.dump(self.field_correlations, f, indent=2, default=str)
+        self._dump_json(self.field_correlations, results_folder / 'real_correlations.json')
         print("   🔍 real_correlations.json")
 
     def save_real_temporal_lags(self, results_folder):
         """💾 Реальные временные лаги"""
-        with open(results_folder / 'real_temporal_lags.json', 'w') as f:
-            json.dump(self.real_temporal_lags, f, indent=2, default=str)
+        self._dump_json(self.real_temporal_lags, results_folder / 'real_temporal_lags.json')
         print("   ⏰ real_temporal_lags.json")
 
     def save_veto_analysis(self, results_folder):
         """💾 Анализ VETO полей"""
-        with open(results_folder / 'veto_analysis.json', 'w') as f:
-            json.dump(self.veto_fields, f, indent=2, default=str)
+        self._dump_json(self.veto_fields, results_folder / 'veto_analysis.json')
         print("   🚫 veto_analysis.json")
 
     def save_field_statistics(self, results_folder):
         """💾 Детальная статистика полей"""
-        with open(results_folder / 'field_statistics.json', 'w') as f:
-            json.dump(self.threshold_analysis, f, indent=2, default=str)
+        self._dump_json(self.threshold_analysis, results_folder / 'field_statistics.json')
         print("   📊 field_statistics.json")
 
     def save_events_analysis(self, results_folder):
@@ -1531,48 +2114,88 @@ class HonestDataDrivenAnalyzer:
             'methodology': 'automatic_extrema_volatility'
         }
         
-        with open(results_folder / 'events_analysis.json', 'w') as f:
-            json.dump(events_analysis, f, indent=2, default=str)
+        self._dump_json(events_analysis, results_folder / 'events_analysis.json')
         print("   🎯 events_analysis.json")
 
+    def _write_table(self, data, results_folder, stem, csv_writer=None):
+        """
+        Запись таблицы результатов: Feather (zstd) + CSV по запросу
+        
+        data - dict колонок или DataFrame (либо функция, возвращающая их: таблица строится
+        только если действительно нужна). С pyarrow таблица один раз переводится в
+        pyarrow.Table, и из этого же колоночного буфера пишутся Feather и CSV.
+        CSV создается при write_csv или если pyarrow не установлен (csv_writer(path) -
+        быстрый writer вместо общего). Возвращает имена созданных файлов.
+        """
+        written = []
+        need_csv = self.write_csv or not PYARROW_AVAILABLE
+        csv_path = results_folder / f"{stem}.csv"
+        
+        if need_csv and csv_writer is not None and csv_writer(csv_path):
+            need_csv = False
+            written.append(csv_path.name)
+            self._outputs.append(csv_path)
+        
+        if callable(data) and (PYARROW_AVAILABLE or need_csv):
+            data = data()
+        
+        if PYARROW_AVAILABLE:
+            if isinstance(data, pd.DataFrame):
+                table = pyarrow.Table.from_pandas(data, preserve_index=False)
+            else:
+                table = pyarrow.table(data)
+            
+            feather_path = results_folder / f"{stem}.feather"
+            try:
+                pyarrow.feather.write_feather(table, feather_path, compression='zstd')
+            except Exception:
+                pyarrow.feather.write_feather(table, feather_path, compression='lz4')
+            written.insert(0, feather_path.name)
+            self._outputs.append(feather_path)
+            
+            if need_csv:
+                pyarrow.csv.write_csv(table, csv_path)
+        elif need_csv:
+            pd.DataFrame(data).to_csv(csv_path, index=False)
+        
+        if need_csv:
+            written.append(csv_path.name)
+            self._outputs.append(csv_path)
+        
+        return written
+
     def save_honest_weight_matrix(self, results_folder):
         """💾 Честная матрица весов"""
         if self.scoring_system:
-            weights_data = []
+            # Колоночные буферы: таблица собирается из колонок без транспонирования строк-словарей
+            weights_data = {column: [] for column in ('feature', 'base_field', 'field_type', 'weight',
+                                                      'weight_source', 'roc_auc', 'statistical_basis')}
+            weight_sources = {
+                'veto': 'veto_effectiveness',
+                'categorical': 'signal_effectiveness',
+                'numeric': 'roc_auc_minus_0.5'
+            }
             
             for feature in self.scoring_system['features']:
                 weight = self.scoring_system['feature_importance'].get(feature, 0)
                 
-                # Определяем тип и источник веса
-                if feature.endswith('_veto'):
-                    base_field = feature.replace('_veto', '').replace('_high', '').replace('_low', '')
-                    weight_source = 'veto_effectiveness'
-                    field_type = 'veto'
-                elif '_excl' in feature:
-                    base_field = feature.split('_excl')[0]
-                    weight_source = 'signal_effectiveness'
-                    field_type = 'categorical'
-                else:
-                    base_field = feature.replace('_activated', '')
-                    weight_source = 'roc_auc_minus_0.5'
-                    field_type = 'numeric'
+                # Тип и источник веса - из таблицы разбора признаков
+                base_field, field_type, _ = self._feature_meta[feature]
+                weight_source = weight_sources[field_type]
                 
                 # Дополнительная статистика
                 roc_data = self.field_roc_scores.get(base_field, {})
                 
-                weights_data.append({
-                    'feature': feature,
-                    'base_field': base_field,
-                    'field_type': field_type,
-                    'weight': weight,
-                    'weight_source': weight_source,
-                    'roc_auc': roc_data.get('best_roc_auc', 0.5),
-                    'statistical_basis': 'data_driven'
-                })
-            
-            weights_df = pd.DataFrame(weights_data)
-            weights_df.to_csv(results_folder / 'honest_weight_matrix.csv', index=False)
-            print("   💰 honest_weight_matrix.csv")
+                weights_data['feature'].append(feature)
+                weights_data['base_field'].append(base_field)
+                weights_data['field_type'].append(field_type)
+                weights_data['weight'].append(weight)
+                weights_data['weight_source'].append(weight_source)
+                weights_data['roc_auc'].append(roc_data.get('best_roc_auc', 0.5))
+                weights_data['statistical_basis'].append('data_driven')
+            
+            written = self._write_table(weights_data, results_folder, 'honest_weight_matrix')
+            print(f"   💰 {', '.join(written)}")
 
     def save_honest_scoring_config(self, results_folder):
         """💾 Честная конфигурация скоринга"""
@@ -1580,7 +2203,7 @@ class HonestDataDrivenAnalyzer:
             config = {
                 'version': 'honest_data_driven_1.0',
                 'methodology': 'statistical_analysis_only',
-                'created': datetime.now().isoformat(),
+                'created': (self._report_ts or datetime.now()).isoformat(),
                 'total_features': self.scoring_system['total_features'],
                 'feature_breakdown': {
                     'numeric_features': self.scoring_system['numeric_features'],
@@ -1599,59 +2222,83 @@ class HonestDataDrivenAnalyzer:
                 'min_correlation': self.config.get('analysis', {}).get('min_correlation', 0.3)
             }
             
-            with open(results_folder / 'honest_scoring_config.json', 'w') as f:
-                json.dump(config, f, indent=2, default=str)
+            self._dump_json(config, results_folder / 'honest_scoring_config.json')
             print("   ⚙️ honest_scoring_config.json")
 
     def create_honest_top_fields(self, results_folder):
         """📊 Честный ТОП полей"""
         if self.scoring_system:
-            top_data = []
+            # Колоночные буферы: таблица собирается из колонок без транспонирования строк-словарей
+            top_data = {column: [] for column in ('rank', 'field', 'activated_field', 'field_type', 'weight',
+                                                  'abs_weight', 'effectiveness', 'p_value', 'significant',
+                                                  'statistical_basis')}
+            
+            # Статистическая основа каждого признака - заранее, плоскими словарями по имени
+            # признака: (эффективность, p-value) без цепочек .get в основном цикле
+            veto_by_feat = {}
+            signal_by_feat = {}
+            roc_by_feat = {}
+            for feature, (base_field, field_type, lookup_key) in self._feature_meta.items():
+                if field_type == 'veto':
+                    veto_stats = self.veto_fields.get(lookup_key, {})
+                    veto_by_feat[feature] = (veto_stats.get('veto_effectiveness', 0),
+                                             veto_stats.get('p_value', 1.0))
+                elif field_type == 'categorical':
+                    signal_stats = (self.field_correlations.get(base_field, {})
+                                    .get('signal_performance', {}).get(lookup_key, {}))
+                    signal_by_feat[feature] = (signal_stats.get('effectiveness', 0),
+                                               signal_stats.get('p_value', 1.0))
+                else:
+                    roc_by_feat[feature] = (self.field_roc_scores.get(base_field, {}).get('best_roc_auc', 0.5),
+                                            self.field_correlations.get(base_field, {}).get('pearson_p_value', 1.0))
             
-            for feature, weight in sorted(self.scoring_system['feature_importance'].items(), 
-                                        key=lambda x: abs(x[1]), reverse=True):
+            for rank, (feature, weight) in enumerate(sorted(self.scoring_system['feature_importance'].items(), 
+                                                            key=lambda x: abs(x[1]), reverse=True), 1):
                 
-                # Определяем тип и статистическую основу
-                if feature.endswith('_veto'):
-                    base_field = feature.replace('_veto', '').replace('_high', '').replace('_low', '')
-                    field_type = 'veto'
-                    statistical_basis = self.veto_fields.get(feature.replace('_veto', ''), {})
-                    effectiveness = statistical_basis.get('veto_effectiveness', 0)
-                    p_value = statistical_basis.get('p_value', 1.0)
-                elif '_excl' in feature:
-                    base_field = feature.split('_excl')[0]
-                    field_type = 'categorical'
-                    # Найти соответствующую статистику
-                    signal_type = feature.split('_excl')[1].replace('_activated', '').replace('_', '!')
-                    corr_data = self.field_correlations.get(base_field, {})
-                    signal_perf = corr_data.get('signal_performance', {})
-                    signal_stats = signal_perf.get(signal_type, {})
-                    effectiveness = signal_stats.get('effectiveness', 0)
-                    p_value = signal_stats.get('p_value', 1.0)
-                else:
-                    base_field = feature.replace('_activated', '')
-                    field_type = 'numeric'
-                    roc_data = self.field_roc_scores.get(base_field, {})
-                    effectiveness = roc_data.get('best_roc_auc', 0.5)
-                    corr_data = self.field_correlations.get(base_field, {})
-                    p_value = corr_data.get('pearson_p_value', 1.0)
+                # Тип и статистическая основа - из таблицы разбора признаков
+                base_field, field_type, _ = self._feature_meta[feature]
+                effectiveness, p_value = veto_by_feat.get(feature) or signal_by_feat.get(feature) or roc_by_feat[feature]
                 
-                top_data.append({
-                    'rank': len(top_data) + 1,
-                    'field': base_field,
-                    'activated_field': feature,
-                    'field_type': field_type,
-                    'weight': weight,
-                    'abs_weight': abs(weight),
-                    'effectiveness': effectiveness,
-                    'p_value': p_value,
-                    'significant': p_value < 0.05,
-                    'statistical_basis': 'data_driven_only'
-                })
-            
-            top_df = pd.DataFrame(top_data)
-            top_df.to_csv(results_folder / 'honest_top_fields.csv', index=False)
-            print("   🏆 honest_top_fields.csv")
+                top_data['rank'].append(rank)
+                top_data['field'].append(base_field)
+                top_data['activated_field'].append(feature)
+                top_data['field_type'].append(field_type)
+                top_data['weight'].append(weight)
+                top_data['abs_weight'].append(abs(weight))
+                top_data['effectiveness'].append(effectiveness)
+                top_data['p_value'].append(p_value)
+                top_data['significant'].append(p_value < 0.05)
+                top_data['statistical_basis'].append('data_driven_only')
+            
+            written = self._write_table(top_data, results_folder, 'honest_top_fields',
+                                        csv_writer=lambda path: self._write_top_fields_csv(top_data, path))
+            print(f"   🏆 {', '.join(written)}")
+
+    def _write_top_fields_csv(self, top_data, csv_path):
+        """
+        Быстрая запись honest_top_fields.csv без логики квотирования pandas
+        
+        Таблица почти целиком числовая: строки формируются одним шаблоном по колонкам.
+        Формат совпадает с to_csv (полная точность float, пустая ячейка для NaN).
+        Возвращает False, если строковые поля требуют квотирования - тогда пишет pandas.
+        """
+        text_columns = ('field', 'activated_field', 'field_type', 'statistical_basis')
+        if any(any(ch in value for ch in ',"\r\n') for column in text_columns for value in top_data[column]):
+            return False
+        
+        def as_float(values):
+            return ['' if value != value else repr(float(value)) for value in values]
+        
+        rows = zip(top_data['rank'], top_data['field'], top_data['activated_field'], top_data['field_type'],
+                   as_float(top_data['weight']), as_float(top_data['abs_weight']),
+                   as_float(top_data['effectiveness']), as_float(top_data['p_value']),
+                   top_data['significant'], top_data['statistical_basis'])
+        
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(','.join(top_data) + '\n')
+            f.writelines('%s,%s,%s,%s,%s,%s,%s,%s,%s,%s\n' % row for row in rows)
+        
+        return True
 
     def create_correlation_matrix_csv(self, results_folder):
         """📊 Матрица корреляций"""
@@ -1659,99 +2306,208 @@ class HonestDataDrivenAnalyzer:
             numeric_features = self.features.select_dtypes(include=[np.number])
             
             if len(numeric_features.columns) > 1:
-                correlation_matrix = numeric_features.corr()
-                correlation_matrix.to_csv(results_folder / 'correlation_matrix.csv')
-                print("   🔗 correlation_matrix.csv")
+                standardized = self._standardized_float32(numeric_features)
+                
+                def build_df():
+                    correlation_matrix = pd.DataFrame(self._correlation_matrix(numeric_features, standardized),
+                                                      index=numeric_features.columns,
+                                                      columns=numeric_features.columns.copy())
+                    correlation_matrix.index.name = 'field'
+                    return correlation_matrix.reset_index()
+                
+                # CSV без пропусков пишется блоками строк прямо из Z - без полной NxN матрицы
+                csv_writer = None
+                if standardized is not None:
+                    csv_writer = lambda path: self._write_correlation_csv(list(numeric_features.columns),
+                                                                          standardized, path)
+                
+                written = self._write_table(build_df, results_folder, 'correlation_matrix', csv_writer=csv_writer)
+                print(f"   🔗 {', '.join(written)}")
+
+    def _standardized_float32(self, numeric_features):
+        """
+        Стандартизованный float32 блок Z = (X - mean) / std для корреляций через GEMM
+        
+        Константные колонки дают NaN (как DataFrame.corr). При пропусках в данных
+        возвращает None - нужен попарный DataFrame.corr.
+        """
+        values = numeric_features.to_numpy(dtype=np.float32)
+        
+        if np.isnan(values).any():
+            return None
+        
+        values -= values.mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values /= values.std(axis=0)
+        
+        return values
+
+    def _correlation_matrix(self, numeric_features, standardized=None):
+        """
+        Матрица корреляций Пирсона одним GEMM по стандартизованному float32 блоку
+        
+        C = Z.T @ Z / n; при пропусках в данных используется попарный DataFrame.corr.
+        """
+        if standardized is None:
+            standardized = self._standardized_float32(numeric_features)
+        if standardized is None:
+            return numeric_features.corr().to_numpy()
+        
+        correlation = (standardized.T @ standardized) / standardized.shape[0]
+        return correlation.astype(np.float64)
+
+    def _write_correlation_csv(self, columns, standardized, csv_path, block_rows=256):
+        """
+        Потоковая запись correlation_matrix.csv блоками строк
+        
+        Для каждого блока считается C[k:k+B] = Z[:, k:k+B].T @ Z / n и сразу пишется
+        через np.savetxt: память B x N вместо N x N. NaN - пустая ячейка, как в to_csv.
+        Возвращает False, если имена полей требуют квотирования - тогда пишет pandas.
+        """
+        if any(any(ch in column for ch in ',"\r\n') for column in columns):
+            return False
+        
+        n_rows, n_columns = standardized.shape
+        row_format = '%s' + ',%.9g' * n_columns
+        
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(','.join(['field'] + columns) + '\n')
+            
+            for start in range(0, n_columns, block_rows):
+                stop = min(start + block_rows, n_columns)
+                block = (standardized[:, start:stop].T @ standardized) / n_rows
+                
+                rows = np.empty((stop - start, n_columns + 1), dtype=object)
+                rows[:, 0] = columns[start:stop]
+                rows[:, 1:] = block.astype(np.float64)
+                
+                buffer = io.StringIO()
+                np.savetxt(buffer, rows, fmt=row_format)
+                f.write(_NAN_CELL_RE.sub(',', buffer.getvalue()))
+        
+        return True
 
     def create_veto_effectiveness_csv(self, results_folder):
         """📊 Эффективность VETO полей"""
         if self.veto_fields:
-            veto_data = []
-            
-            for veto_name, stats in self.veto_fields.items():
-                veto_data.append({
-                    'veto_field': veto_name,
-                    'base_field': stats['base_field'],
-                    'condition': stats['condition'],
-                    'threshold': stats['threshold'],
-                    'veto_effectiveness': stats['veto_effectiveness'],
-                    'normal_event_rate': stats['normal_event_rate'],
-                    'veto_event_rate': stats['veto_event_rate'],
-                    'activation_frequency': stats['activation_frequency'],
-                    'p_value': stats['p_value'],
-                    'significant': stats['significant'],
-                    'events_potentially_blocked': stats['events_blocked']
-                })
-            
-            veto_df = pd.DataFrame(veto_data)
-            veto_df.to_csv(results_folder / 'veto_effectiveness.csv', index=False)
-            print("   🚫 veto_effectiveness.csv")
+            # Колонка таблицы -> ключ статистики VETO; таблица собирается сразу из колонок
+            stat_keys = {
+                'base_field': 'base_field',
+                'condition': 'condition',
+                'threshold': 'threshold',
+                'veto_effectiveness': 'veto_effectiveness',
+                'normal_event_rate': 'normal_event_rate',
+                'veto_event_rate': 'veto_event_rate',
+                'activation_frequency': 'activation_frequency',
+                'p_value': 'p_value',
+                'significant': 'significant',
+                'events_potentially_blocked': 'events_blocked'
+            }
+            veto_data = {'veto_field': list(self.veto_fields)}
+            for column, key in stat_keys.items():
+                veto_data[column] = [stats[key] for stats in self.veto_fields.values()]
+            
+            written = self._write_table(veto_data, results_folder, 'veto_effectiveness')
+            print(f"   🚫 {', '.join(written)}")
 
     def create_honest_visualizations(self, results_folder):
         """🎨 Честные визуализации на основе данных"""
         print("   🎨 Создание честных визуализаций...")
         
+        # DPI из конфигурации (reporting.plot_dpi); tight_layout вместо bbox_inches='tight' -
+        # без второго прохода рендера для измерения границ
+        dpi = self.config.get('reporting', {}).get('plot_dpi', 120)
+        
+        if not (self.field_roc_scores or self.real_temporal_lags or self.veto_fields):
+            return
+        
+        # Данные панелей - отдельно от рисования: по ним же считается хеш дашборда
+        roc_values = [data.get('best_roc_auc', 0.5) for data in self.field_roc_scores.values()]
+        fields = list(self.real_temporal_lags.keys())[:10]  # Топ-10
+        lags = [self.real_temporal_lags[f]['mean_lag'] for f in fields]
+        powers = [self.real_temporal_lags[f]['predictive_power'] for f in fields]
+        veto_names = list(self.veto_fields.keys())
+        effectiveness = [self.veto_fields[v]['veto_effectiveness'] for v in veto_names]
+        
+        # Дашборд - детерминированная функция этих данных и кода рисования: при
+        # совпадении хеша с сохраненным рядом с PNG перерисовка пропускается.
+        # Исходник метода в хеше - правка оформления перерисовывает старый PNG
+        dashboard_path = results_folder / 'analysis_dashboard.png'
+        hash_path = results_folder / 'analysis_dashboard.hash'
+        plot_data = self._to_python({
+            'roc_values': roc_values, 'fields': fields, 'lags': lags, 'powers': powers,
+            'veto_names': veto_names, 'effectiveness': effectiveness, 'dpi': dpi
+        })
+        digest = hashlib.blake2b(json.dumps(plot_data, sort_keys=True).encode('utf-8'))
+        digest.update(inspect.getsource(HonestDataDrivenAnalyzer.create_honest_visualizations).encode('utf-8'))
+        plot_hash = digest.hexdigest()
+        
+        if dashboard_path.exists() and hash_path.exists() and hash_path.read_text().strip() == plot_hash:
+            self._outputs.append(dashboard_path)
+            print("     📊 analysis_dashboard.png (без изменений)")
+            return
+        
+        # matplotlib импортируется только здесь: анализ без графиков (и ранние ошибки)
+        # не платят за его загрузку
+        import matplotlib
+        matplotlib.use('Agg')  # Графики только в файлы - растеризатор Agg без GUI
+        import matplotlib.pyplot as plt
+        
         try:
-            # График 1: ROC-AUC распределение
-            if self.field_roc_scores:
-                roc_values = [data.get('best_roc_auc', 0.5) for data in self.field_roc_scores.values()]
-                
-                plt.figure(figsize=(10, 6))
-                plt.hist(roc_values, bins=20, alpha=0.7, edgecolor='black')
-                plt.axvline(x=0.5, color='red', linestyle='--', label='Случайность (0.5)')
-                plt.xlabel('ROC-AUC')
-                plt.ylabel('Количество полей')
-                plt.title('Распределение ROC-AUC по полям')
-                plt.legend()
-                plt.grid(True, alpha=0.3)
-                plt.savefig(results_folder / 'roc_auc_distribution.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                print("     📊 roc_auc_distribution.png")
-            
-            # График 2: Временные лаги
-            if self.real_temporal_lags:
-                fields = list(self.real_temporal_lags.keys())[:10]  # Топ-10
-                lags = [self.real_temporal_lags[f]['mean_lag'] for f in fields]
-                powers = [self.real_temporal_lags[f]['predictive_power'] for f in fields]
-                
-                fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+            # Все графики - на одной фигуре 2x2: одна инициализация холста и одно PNG-кодирование
+            fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+            ax_roc, ax_veto = axes[0, 0], axes[0, 1]
+            ax_lag, ax_power = axes[1, 0], axes[1, 1]
+            
+            # Панель 1: ROC-AUC распределение
+            if roc_values:
+                counts, edges = np.histogram(roc_values, bins=20)
                 
+                ax_roc.stairs(counts, edges, fill=True, alpha=0.7, edgecolor='black')
+                ax_roc.axvline(x=0.5, color='red', linestyle='--', label='Случайность (0.5)')
+                ax_roc.set_xlabel('ROC-AUC')
+                ax_roc.set_ylabel('Количество полей')
+                ax_roc.set_title('Распределение ROC-AUC по полям')
+                ax_roc.legend()
+                ax_roc.grid(True, alpha=0.3)
+            else:
+                ax_roc.set_axis_off()
+            
+            # Панели 3-4: Временные лаги
+            if fields:
                 # Лаги
-                ax1.barh(fields, lags, color='skyblue', alpha=0.8)
-                ax1.set_xlabel('Средний лаг (периоды)')
-                ax1.set_title('Временные лаги до событий')
+                ax_lag.barh(fields, lags, color='skyblue', alpha=0.8)
+                ax_lag.set_xlabel('Средний лаг (периоды)')
+                ax_lag.set_title('Временные лаги до событий')
                 
                 # Предсказательная сила
-                ax2.barh(fields, powers, color='lightcoral', alpha=0.8)
-                ax2.set_xlabel('Предсказательная сила')
-                ax2.set_title('Доля событий с предшествующей активацией')
-                
-                plt.tight_layout()
-                plt.savefig(results_folder / 'temporal_analysis.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                print("     ⏰ temporal_analysis.png")
-            
-            # График 3: VETO эффективность
-            if self.veto_fields:
-                veto_names = list(self.veto_fields.keys())
-                effectiveness = [self.veto_fields[v]['veto_effectiveness'] for v in veto_names]
-                
-                plt.figure(figsize=(10, 6))
-                bars = plt.bar(range(len(veto_names)), effectiveness, color='orange', alpha=0.8)
-                plt.xlabel('VETO поля')
-                plt.ylabel('Эффективность блокировки')
-                plt.title('Эффективность VETO полей')
-                plt.xticks(range(len(veto_names)), veto_names, rotation=45, ha='right')
-                
-                # Добавляем значения на столбцы
-                for bar, eff in zip(bars, effectiveness):
-                    plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                            f'{eff:.2f}', ha='center', va='bottom')
+                ax_power.barh(fields, powers, color='lightcoral', alpha=0.8)
+                ax_power.set_xlabel('Предсказательная сила')
+                ax_power.set_title('Доля событий с предшествующей активацией')
+            else:
+                ax_lag.set_axis_off()
+                ax_power.set_axis_off()
+            
+            # Панель 2: VETO эффективность
+            if veto_names:
+                bars = ax_veto.bar(range(len(veto_names)), effectiveness, color='orange', alpha=0.8)
+                ax_veto.set_xlabel('VETO поля')
+                ax_veto.set_ylabel('Эффективность блокировки')
+                ax_veto.set_title('Эффективность VETO полей')
+                ax_veto.set_xticks(range(len(veto_names)))
+                ax_veto.set_xticklabels(veto_names, rotation=45, ha='right')
                 
-                plt.tight_layout()
-                plt.savefig(results_folder / 'veto_effectiveness.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                print("     🚫 veto_effectiveness.png")
+                # Добавляем значения на столбцы (одним вызовом для всего контейнера)
+                ax_veto.bar_label(bars, labels=[f'{eff:.2f}' for eff in effectiveness], padding=3)
+            else:
+                ax_veto.set_axis_off()
+            
+            fig.tight_layout()
+            fig.savefig(dashboard_path, dpi=dpi)
+            plt.close(fig)
+            hash_path.write_text(plot_hash)
+            self._outputs.append(dashboard_path)
+            print("     📊 analysis_dashboard.png")
                 
         except Exception as e:
             print(f"     ⚠️ Ошибка создания визуализаций: {e}")
@@ -1761,12 +2517,16 @@ def main():
     """Главная функция"""
     import sys
     
-    if len(sys.argv) != 2:
-        print("Использование: python main.py <путь_к_файлу_лога>")
+    args = [arg for arg in sys.argv[1:] if arg not in ('--csv', '--no-cache')]
+    
+    if len(args) != 1:
+        print("Использование: python main.py <путь_к_файлу_лога> [--csv] [--no-cache]")
         print("Пример: python main.py data/dslog_btc_0508240229_ltf.txt")
+        print("   --csv       дополнительно сохранить таблицы в CSV (по умолчанию Feather)")
+        print("   --no-cache  парсить лог заново, не используя results/.cache")
         return
     
-    log_file = sys.argv[1]
+    log_file = args[0]
     
     if not Path(log_file).exists():
         print(f"❌ Файл не найден: {log_file}")
@@ -1774,6 +2534,10 @@ def main():
     
     # Создание и запуск честного анализатора
     analyzer = HonestDataDrivenAnalyzer()
+    if '--csv' in sys.argv[1:]:
+        analyzer.write_csv = True
+    if '--no-cache' in sys.argv[1:]:
+        analyzer.parse_cache = False
     results = analyzer.run_full_analysis(log_file)
     
     if results['status'] == 'success':
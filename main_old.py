@@ -26,6 +26,13 @@ from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import roc_auc_score, classification_report, precision_recall_curve
 import matplotlib.pyplot as plt
 
+# Быстрая сериализация JSON (numpy-скаляры кодируются в C) - если установлен orjson
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: Импорт продвинутых модулей
 try:
     from advanced_log_parser import AdvancedLogParser
@@ -87,6 +94,10 @@ class FinancialLogAnalyzer:
         self.scoring_system = None
         self.validation_results = None
         self.temporal_analysis = None
+        
+        # Кэш полей по префиксам (сбрасывается при смене набора колонок)
+        self._prefix_fields_cache = {}
+        self._prefix_fields_columns = None
 
     def _load_config(self, config_path):
         """Загрузка конфигурации"""
@@ -813,7 +824,7 @@ class FinancialLogAnalyzer:
                 })
             
             weights_df = pd.DataFrame(weights_data)
-            weights_df.to_csv('results/weight_matrix.csv', index=False)
+            weights_df.to_csv('results/weight_matrix.csv', index=False, float_format='%.6g')
 
     def _save_scoring_config(self):
         """Сохранение конфигурации скоринга"""
@@ -824,8 +835,12 @@ class FinancialLogAnalyzer:
                 'validation_score': self.validation_results['roc_auc'] if self.validation_results else 0
             }
             
-            with open('results/scoring_config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+            if ORJSON_AVAILABLE:
+                options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                Path('results/scoring_config.json').write_bytes(orjson.dumps(config, option=options))
+            else:
+                with open('results/scoring_config.json', 'w') as f:
+                    json.dump(config, f, indent=2)
 
     def _create_basic_report(self):
         """Создание базового отчета"""
@@ -852,8 +867,7 @@ class FinancialLogAnalyzer:
         
         # Проверка извлечения критических полей
         if self.features is not None:
-            critical_fields = [col for col in self.features.columns 
-                             if any(col.startswith(prefix) for prefix in ['nw', 'ef', 'as', 'vc', 'ze'])]
+            critical_fields = self._fields_with_prefixes(('nw', 'ef', 'as', 'vc', 'ze'))
             
             report_lines.extend([
                 "",
@@ -930,11 +944,23 @@ class FinancialLogAnalyzer:
         if self.features is None:
             return 0
         
-        critical_prefixes = ['nw', 'ef', 'as', 'vc', 'ze', 'cvz', 'maz']
-        critical_fields = [col for col in self.features.columns 
-                          if any(col.startswith(prefix) for prefix in critical_prefixes)]
+        critical_prefixes = ('nw', 'ef', 'as', 'vc', 'ze', 'cvz', 'maz')
+        return len(self._fields_with_prefixes(critical_prefixes))
+
+    def _fields_with_prefixes(self, prefixes):
+        """
+        Признаки, начинающиеся с одного из prefixes. Результат кэшируется, пока
+        не изменится набор колонок self.features (добавление колонки создает новый Index)
+        """
+        columns = self.features.columns
+        if self._prefix_fields_columns is not columns:
+            self._prefix_fields_cache = {}
+            self._prefix_fields_columns = columns
+        
+        if prefixes not in self._prefix_fields_cache:
+            self._prefix_fields_cache[prefixes] = [col for col in columns if col.startswith(prefixes)]
         
-        return len(critical_fields)
+        return self._prefix_fields_cache[prefixes]
 
     def create_organized_results(self, log_file_path):
         """Создание организованной структуры результатов (без изменений)"""
@@ -13,11 +13,87 @@
 
 import pandas as pd
 import numpy as np
-import re
 from pathlib import Path
-from typing import Dict, Any, Tuple, Set
+from typing import Dict, Any, List, Tuple, Set
 from advanced_log_parser import AdvancedLogParser
 
+# JIT-компиляция вычислительных ядер - если установлен numba
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Скользящие окна на C - если установлен bottleneck
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+_BANG_CODE = ord('!')
+
+
+def _bang_strings(values) -> Set[str]:
+    """Строки вида '!', '!!', ... среди values - побайтовое сравнение вместо regex"""
+    candidates = [value for value in values if isinstance(value, str) and value[:1] == '!']
+    if not candidates:
+        return set()
+    
+    # Фиксированная ширина UCS-4: строка подходит, если все ее символы - '!'
+    arr = np.array(candidates, dtype=str)
+    codes = arr.view(np.uint32).reshape(len(arr), -1)
+    is_bangs = (codes == _BANG_CODE).sum(axis=1) == np.char.str_len(arr)
+    return set(arr[is_bangs].tolist())
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _count_extremes_kernel(values, q_lo, q_hi, out):
+        """Число полей строки за пределами [q_lo, q_hi] - один проход по матрице"""
+        for i in prange(values.shape[0]):
+            count = 0
+            for j in range(values.shape[1]):
+                v = values[i, j]
+                if v > q_hi[j] or v < q_lo[j]:
+                    count += 1
+            out[i] = count
+
+
+def _count_extremes(values: np.ndarray, q_lo: np.ndarray, q_hi: np.ndarray) -> np.ndarray:
+    """Для каждой строки - сколько полей выше q_hi или ниже q_lo (пороги по столбцам)"""
+    if NUMBA_AVAILABLE:
+        out = np.zeros(values.shape[0], dtype=np.int32)
+        _count_extremes_kernel(np.ascontiguousarray(values), q_lo, q_hi, out)
+        return out
+    
+    return ((values > q_hi) | (values < q_lo)).sum(axis=1, dtype=np.int32)
+
+
+def _column_quantiles(values: np.ndarray, qs) -> List[np.ndarray]:
+    """
+    Квантили по столбцам одним np.partition (линейная интерполяция, как np.quantile)
+    
+    Вместо сортировки выбираются только соседние порядковые статистики нужных
+    квантилей - O(N) на столбец.
+    """
+    last = values.shape[0] - 1
+    positions = [q * last for q in qs]
+    kth = sorted({k for pos in positions for k in (int(pos), min(int(pos) + 1, last))})
+    part = np.partition(values, kth, axis=0)
+    
+    result = []
+    for pos in positions:
+        lo = int(pos)
+        frac = pos - lo
+        below = part[lo]
+        above = part[min(lo + 1, last)]
+        # Та же формула интерполяции, что в numpy - пороги совпадают побитно
+        diff = above - below
+        result.append(above - diff * (1 - frac) if frac >= 0.5 else below + diff * frac)
+    return result
+
+
 class ParserIntegration:
     """
     ИСПРАВЛЕННАЯ интеграция: data-driven приоритизация БЕЗ нарушений
@@ -30,6 +106,14 @@ class ParserIntegration:
         self.parsing_results = {}
         self.special_values_detected = {}
         
+        # Строковое представление не-метаданных полей (общее для всех этапов)
+        self._str_cache = None
+        self._str_cache_source = None
+        
+        # Поля индикаторных групп для последнего набора колонок
+        self._group_fields = {}
+        self._group_fields_source = None
+        
         # ГРУППЫ ИНДИКАТОРНЫХ ПОЛЕЙ (ВСЕ РАВНЫ!)
         self.indicator_groups = {
             'group_1': ['rd', 'md', 'cd', 'cmd', 'macd', 'od', 'dd', 'cvd', 'drd', 'ad', 'ed', 'hd', 'sd'],
@@ -48,12 +132,19 @@ class ParserIntegration:
             'metadata': 0.1       # Метаданные - справочно
         }
         
-    def replace_old_parser(self, log_file_path: str) -> Dict[str, pd.DataFrame]:
-        """Замена парсера с data-driven подходом"""
+    def replace_old_parser(self, log_file_path: str, use_cache: bool = True) -> Dict[str, pd.DataFrame]:
+        """
+        Замена парсера с data-driven подходом
+        
+        Args:
+            log_file_path: путь к файлу лога
+            use_cache: брать результат парсинга из results/.cache, если лог и парсер
+                       не менялись (False - всегда парсить заново и обновить кэш)
+        """
         print("🔄 DATA-DRIVEN парсер (БЕЗ априорных предположений)")
         
-        # Парсинг
-        full_data = self.advanced_parser.parse_log_file(log_file_path)
+        # Парсинг (или готовый результат из кэша)
+        full_data = self.advanced_parser.parse_log_file_cached(log_file_path, use_cache=use_cache)
         
         if full_data.empty:
             print("❌ Не удалось извлечь данные")
@@ -81,15 +172,9 @@ class ParserIntegration:
         """Автоматическое обнаружение специальных значений"""
         print("🔍 Автоматическое обнаружение паттернов...")
         
-        special_patterns = set()
-        
-        for col in data.columns:
-            if col not in self.metadata_fields:
-                unique_values = data[col].dropna().astype(str).unique()
-                
-                for value in unique_values:
-                    if re.match(r'^!+$', str(value)):
-                        special_patterns.add(str(value))
+        # Уникальные значения всех не-метаданных полей разом (пропуски - не строки)
+        unique_values = pd.unique(self._string_view(data).to_numpy().ravel())
+        special_patterns = _bang_strings(unique_values)
         
         if special_patterns:
             self.special_values_detected = {}
@@ -103,32 +188,85 @@ class ParserIntegration:
         else:
             print("   ℹ️ Специальных паттернов не найдено")
     
+    def _string_view(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        astype(str) нечисловых не-метаданных полей - один раз на DataFrame.
+        Числовые колонки не приводятся: строка числа не бывает ни '!...!', ни
+        специальным значением, а активность для них считается по самим числам
+        """
+        if self._str_cache_source is not data:
+            columns = [col for col, dtype in data.dtypes.items()
+                       if col not in self.metadata_fields and not pd.api.types.is_numeric_dtype(dtype)]
+            self._str_cache = data[columns].astype(str)
+            self._str_cache_source = data
+        
+        return self._str_cache
+    
+    def _fields_by_group(self, data: pd.DataFrame) -> Dict[str, List[str]]:
+        """
+        Поля каждой индикаторной группы (порядок: по префиксам группы, внутри -
+        по колонкам). Один проход по колонкам, результат кэшируется по data.columns
+        """
+        if self._group_fields_source is not data.columns:
+            # Колонка относится к префиксу, если ее начало длины len(prefix) есть в таблице
+            prefix_lengths = sorted({len(p) for prefixes in self.indicator_groups.values() for p in prefixes})
+            by_prefix = {p: [] for prefixes in self.indicator_groups.values() for p in prefixes}
+            metadata = set(self.metadata_fields)
+            
+            for col in data.columns:
+                if col in metadata:
+                    continue
+                for length in prefix_lengths:
+                    if length > len(col):
+                        break
+                    matched = by_prefix.get(col[:length])
+                    if matched is not None:
+                        matched.append(col)
+            
+            self._group_fields = {
+                group_name: [col for prefix in prefixes for col in by_prefix[prefix]]
+                for group_name, prefixes in self.indicator_groups.items()
+            }
+            self._group_fields_source = data.columns
+        
+        return self._group_fields
+    
+    def _active_block(self, data: pd.DataFrame, fields: List[str]) -> pd.DataFrame:
+        """
+        Маска активности полей: значение есть и его строка не '0' / 'nan' / ''.
+        Для числовых колонок то же без astype(str): у целых строка '0' - только у нуля,
+        у float ноль записывается как '0.0', так что активно любое непустое значение
+        """
+        str_view = self._string_view(data)
+        text_fields = [f for f in fields if f in str_view.columns]
+        int_fields = [f for f in fields if f not in str_view.columns
+                      and pd.api.types.is_integer_dtype(data[f].dtype)]
+        other_fields = [f for f in fields if f not in str_view.columns and f not in int_fields]
+        
+        active = pd.concat([
+            ~str_view[text_fields].isin(('0', 'nan', '')) & data[text_fields].notna(),
+            (data[int_fields] != 0) & data[int_fields].notna(),
+            data[other_fields].notna(),
+        ], axis=1)
+        return active[fields]
+    
     def _analyze_field_activity(self, data: pd.DataFrame) -> Dict[str, Any]:
         """DATA-DRIVEN анализ активности полей"""
         
         activity_analysis = {}
         
+        fields_by_group = self._fields_by_group(data)
+        all_fields = list(dict.fromkeys(f for fields in fields_by_group.values() for f in fields))
+        
+        # Активации всех полей - одна маска на весь блок и одна сумма по столбцам
+        field_activations = self._active_block(data, all_fields).sum(axis=0)
+        
         # Анализ каждой группы БЕЗ априорных весов
-        for group_name, prefixes in self.indicator_groups.items():
-            group_fields = []
-            for prefix in prefixes:
-                group_fields.extend([col for col in data.columns 
-                                   if col.startswith(prefix) and col not in self.metadata_fields])
-            
+        for group_name, group_fields in fields_by_group.items():
             if group_fields:
-                total_activations = 0
-                non_zero_fields = 0
-                
-                for field in group_fields:
-                    field_data = data[field].dropna()
-                    if len(field_data) > 0:
-                        activations = ((field_data.astype(str) != '0') & 
-                                     (field_data.astype(str) != 'nan') & 
-                                     (field_data.astype(str) != '')).sum()
-                        
-                        if activations > 0:
-                            non_zero_fields += 1
-                            total_activations += activations
+                activations = field_activations[group_fields]
+                total_activations = int(activations.sum())
+                non_zero_fields = int((activations > 0).sum())
                 
                 activity_analysis[group_name] = {
                     'fields_count': len(group_fields),
@@ -139,13 +277,11 @@ class ParserIntegration:
                 }
         
         # Анализ метаданных
-        metadata_activations = 0
-        for field in self.metadata_fields:
-            if field in data.columns:
-                metadata_activations += data[field].notna().sum()
+        metadata_present = [f for f in self.metadata_fields if f in data.columns]
+        metadata_activations = int(data[metadata_present].notna().to_numpy().sum())
         
         activity_analysis['metadata'] = {
-            'fields_count': len([f for f in self.metadata_fields if f in data.columns]),
+            'fields_count': len(metadata_present),
             'total_activations': metadata_activations,
             'activity_rate': metadata_activations / max(1, len(data)),
             'data_driven_priority': 0.1  # Только метаданные ниже
@@ -153,9 +289,13 @@ class ParserIntegration:
         
         return activity_analysis
     
-    def get_features_for_main_system(self) -> pd.DataFrame:
+    def get_features_for_main_system(self, downcast: bool = True) -> pd.DataFrame:
         """
         DATA-DRIVEN создание признаков БЕЗ априорных предположений
+        
+        Args:
+            downcast: хранить индикаторные признаки во float32 (META_ остаются
+                      float64 - по ним ищутся ценовые экстремумы)
         """
         if 'full_data' not in self.parsing_results:
             print("❌ Сначала запустите replace_old_parser()")
@@ -166,7 +306,7 @@ class ParserIntegration:
         full_data = self.parsing_results['full_data']
         
         # Создание признаков с data-driven приоритизацией
-        features_df = self._create_data_driven_features(full_data)
+        features_df = self._create_data_driven_features(full_data, downcast)
         
         print(f"✅ Создано {len(features_df.columns)} признаков")
         
@@ -175,84 +315,101 @@ class ParserIntegration:
         
         return features_df
     
-    def _create_data_driven_features(self, data: pd.DataFrame) -> pd.DataFrame:
+    def _create_data_driven_features(self, data: pd.DataFrame, downcast: bool = False) -> pd.DataFrame:
         """
         DATA-DRIVEN создание признаков: ВСЕ индикаторы равны
         """
-        features = pd.DataFrame(index=data.index)
+        # Колонки копятся в словаре, DataFrame собирается один раз в конце
+        cols = {}
         
         print("🎯 ШАГ 1: Индикаторные поля (ВСЕ РАВНЫ)")
-        self._add_equal_indicator_features(features, data)
+        self._add_equal_indicator_features(cols, data)
         
         print("🔄 ШАГ 2: Производные от индикаторов") 
-        self._add_indicator_derivatives(features, data)
+        self._add_indicator_derivatives(cols, data)
         
         print("📊 ШАГ 3: Метаданные (справочно)")
-        self._add_metadata_features(features, data)
+        self._add_metadata_features(cols, data)
+        
+        # Понижение точности до сборки - DataFrame строится один раз, без astype-копии
+        if downcast:
+            for name, values in cols.items():
+                if values.dtype == np.float64 and not name.startswith('META_'):
+                    cols[name] = values.astype(np.float32)
+        
+        features = pd.DataFrame(cols, index=data.index)
         
         # Финальная очистка
         features.fillna(0, inplace=True)
         
         return features
     
-    def _add_equal_indicator_features(self, features: pd.DataFrame, data: pd.DataFrame) -> None:
+    def _add_equal_indicator_features(self, cols: Dict[str, np.ndarray], data: pd.DataFrame) -> None:
         """Добавление индикаторных признаков с РАВНЫМ статусом"""
         
         total_indicator_fields = 0
         
         # ВСЕ группы обрабатываются ОДИНАКОВО
-        for group_name, prefixes in self.indicator_groups.items():
-            group_fields = []
-            for prefix in prefixes:
-                group_fields.extend([col for col in data.columns 
-                                   if col.startswith(prefix) and col not in self.metadata_fields])
-            
+        fields_by_group = self._fields_by_group(data)
+        
+        # Строковое представление и маски активности - один проход по всем полям
+        all_fields = list(dict.fromkeys(f for fields in fields_by_group.values() for f in fields))
+        str_block = self._string_view(data)
+        active_block = self._active_block(data, all_fields)
+        
+        for group_name, group_fields in fields_by_group.items():
             print(f"   {group_name}: {len(group_fields)} полей (равный приоритет)")
             
             for field in group_fields:
                 # 1. ОСНОВНОЕ ЗНАЧЕНИЕ (все поля равны)
                 numeric_data = self._safe_numeric_conversion(data[field])
-                features[f"IND_{field}"] = numeric_data  # Префикс IND_ = индикатор
+                cols[f"IND_{field}"] = numeric_data.to_numpy()  # Префикс IND_ = индикатор
                 
                 # 2. АКТИВНОСТЬ ПОЛЯ
-                active_mask = ((data[field].astype(str) != '0') & 
-                              (data[field].astype(str) != 'nan') & 
-                              (data[field].astype(str) != '') & 
-                              data[field].notna())
-                features[f"IND_{field}_ACTIVE"] = active_mask.astype(int)
+                cols[f"IND_{field}_ACTIVE"] = active_block[field].to_numpy(dtype=np.int8)
                 
                 # 3. СПЕЦИАЛЬНЫЕ ЗНАЧЕНИЯ (если есть)
-                if self.special_values_detected:
+                if self.special_values_detected and field in str_block.columns:
+                    field_str = str_block[field]
                     for special_val, numeric_equiv in self.special_values_detected.items():
-                        special_mask = (data[field].astype(str) == special_val)
-                        if special_mask.sum() > 0:
+                        special_mask = (field_str == special_val)
+                        if special_mask.any():
                             clean_name = special_val.replace('!', 'EXCL')
-                            features[f"IND_{field}_{clean_name}"] = (special_mask.astype(int) * numeric_equiv)
+                            cols[f"IND_{field}_{clean_name}"] = special_mask.to_numpy(dtype=np.int32) * np.int32(numeric_equiv)
                 
                 total_indicator_fields += 1
         
         print(f"   ✅ Обработано {total_indicator_fields} индикаторных полей с РАВНЫМ статусом")
     
-    def _add_indicator_derivatives(self, features: pd.DataFrame, data: pd.DataFrame) -> None:
+    def _add_indicator_derivatives(self, cols: Dict[str, np.ndarray], data: pd.DataFrame) -> None:
         """Производные признаки ТОЛЬКО от индикаторных полей"""
         
         # Выбираем индикаторные поля для лагов
-        indicator_cols = [col for col in features.columns if col.startswith('IND_')]
-        
         # Берем первые 10 для временного анализа
-        for col in indicator_cols[:10]:
-            if col in features.columns:
-                # Лаговые признаки
-                features[f"{col}_LAG1"] = features[col].shift(1)
-                features[f"{col}_LAG2"] = features[col].shift(2)
-                
-                # Изменения
-                features[f"{col}_DIFF"] = features[col].diff()
-                
-                # Скользящие средние
-                features[f"{col}_MA3"] = features[col].rolling(3).mean()
+        indicator_cols = [col for col in cols if col.startswith('IND_')][:10]
+        if not indicator_cols:
+            return
+        
+        values = np.column_stack([cols[col] for col in indicator_cols]).astype(np.float64, copy=False)
+        n_rows = len(values)
+        
+        # Все производные пишутся в один блок (N, F, 4): LAG1, LAG2, DIFF, MA3.
+        # NaN в первых строках - как у shift()/rolling(3)
+        derived = np.full((n_rows, len(indicator_cols), 4), np.nan)
+        derived[1:, :, 0] = values[:-1]
+        derived[2:, :, 1] = values[:-2]
+        np.subtract(values, derived[:, :, 0], out=derived[:, :, 2])
+        if BOTTLENECK_AVAILABLE:
+            derived[:, :, 3] = bn.move_mean(values, window=3, axis=0)
+        elif n_rows >= 3:
+            windows = np.lib.stride_tricks.sliding_window_view(values, 3, axis=0)
+            derived[2:, :, 3] = windows.mean(axis=-1)
+        
+        # Порядок колонок: LAG1, LAG2, DIFF, MA3 для каждого поля
+        names = [f"{col}_{suffix}" for col in indicator_cols for suffix in ('LAG1', 'LAG2', 'DIFF', 'MA3')]
+        cols.update(zip(names, derived.reshape(n_rows, len(names)).T))
     
-    def _add_metadata_features(self, features: pd.DataFrame, data: pd.DataFrame) -> None:
+    def _add_metadata_features(self, cols: Dict[str, np.ndarray], data: pd.DataFrame) -> None:
         """Добавление метаданных с низким приоритетом"""
         
         metadata_weight = self.priority_levels['metadata']  # 0.1
@@ -260,30 +417,34 @@ class ParserIntegration:
         
         for field in self.metadata_fields:
             if field in data.columns:
-                features[f"META_{field}"] = data[field] * metadata_weight
+                cols[f"META_{field}"] = data[field].to_numpy() * metadata_weight
                 metadata_count += 1
         
         # Простые производные от метаданных
         required_ohlc = ['open', 'high', 'low', 'close']
-        if all(f"META_{col}" in features.columns for col in required_ohlc):
-            features['META_price_range'] = ((features['META_high'] - 
-                                           features['META_low']) * metadata_weight)
+        if all(f"META_{col}" in cols for col in required_ohlc):
+            cols['META_price_range'] = ((cols['META_high'] - 
+                                       cols['META_low']) * metadata_weight)
         
         print(f"   📊 Добавлено {metadata_count} метаданных (низкий приоритет)")
     
     def _safe_numeric_conversion(self, series: pd.Series) -> pd.Series:
         """Безопасная конвертация в числовые значения"""
-        result = series.copy()
+        # Специальные значения (только в нечисловых колонках) - одной заменой по словарю
+        if self.special_values_detected and not pd.api.types.is_numeric_dtype(series.dtype):
+            series = series.replace(self.special_values_detected)
         
-        # Конвертация специальных значений
-        for special_val, numeric_equiv in self.special_values_detected.items():
-            mask = (result.astype(str) == special_val)
-            result.loc[mask] = numeric_equiv
-        
-        # Конвертация в числа
-        result = pd.to_numeric(result, errors='coerce').fillna(0)
-        
-        return result
+        return pd.to_numeric(series, errors='coerce').fillna(0)
+    
+    def _numeric_block(self, block: pd.DataFrame) -> np.ndarray:
+        """Блочный аналог _safe_numeric_conversion: матрица (строки x поля) float64"""
+        text_cols = [col for col, dtype in block.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if self.special_values_detected and text_cols:
+            block = block.copy(deep=False)
+            block[text_cols] = block[text_cols].replace(self.special_values_detected)
+        
+        numeric = block.apply(pd.to_numeric, errors='coerce')
+        return numeric.to_numpy(dtype=np.float64, na_value=0.0)
     
     def _report_data_driven_approach(self, features: pd.DataFrame) -> None:
         """Отчет о data-driven подходе"""
@@ -322,34 +483,26 @@ class ParserIntegration:
         
         # События по специальным значениям (если есть)
         if self.special_values_detected:
-            special_events = pd.Series(0, index=full_data.index)
-            
-            for col in full_data.columns:
-                if col not in self.metadata_fields:
-                    for special_val in self.special_values_detected.keys():
-                        mask = (full_data[col].astype(str) == special_val)
-                        special_events += mask.astype(int)
+            # Все поля и все специальные значения - один isin по строковому блоку
+            special_mask = self._string_view(full_data).isin(list(self.special_values_detected))
+            special_events = special_mask.to_numpy().sum(axis=1, dtype=np.int32)
             
             targets['is_event'] = (special_events > 0).astype(int)
             targets['special_activations'] = special_events
         
         # События по статистическим экстремумам (data-driven пороги)
-        extreme_events = pd.Series(0, index=full_data.index)
+        # Счетчик int32: маски суммируются сразу в узкий тип, без int64-промежуточных
+        extreme_events = pd.Series(np.zeros(len(full_data), dtype=np.int32), index=full_data.index)
         
-        for group_name, prefixes in self.indicator_groups.items():
-            for prefix in prefixes:
-                group_fields = [col for col in full_data.columns 
-                              if col.startswith(prefix) and col not in self.metadata_fields]
-                
-                for field in group_fields:
-                    numeric_data = self._safe_numeric_conversion(full_data[field])
-                    if len(numeric_data.dropna()) > 10:
-                        # Data-driven пороги (без предвзятости)
-                        q95 = numeric_data.quantile(0.95)
-                        q05 = numeric_data.quantile(0.05)
-                        
-                        extreme_mask = (numeric_data > q95) | (numeric_data < q05)
-                        extreme_events += extreme_mask.astype(int)
+        indicator_fields = [col for fields in self._fields_by_group(full_data).values() for col in fields]
+        
+        # Пороги считаются только при > 10 значениях (после конвертации пропусков нет)
+        if indicator_fields and len(full_data) > 10:
+            values = self._numeric_block(full_data[indicator_fields])
+            
+            # Data-driven пороги (без предвзятости) - оба квантиля всех полей одним вызовом
+            q05, q95 = _column_quantiles(values, [0.05, 0.95])
+            extreme_events[:] = _count_extremes(values, q05, q95)
         
         # Комбинированные события
         targets['is_event'] = ((targets['is_event'] == 1) | (extreme_events > 2)).astype(int)
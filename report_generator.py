@@ -6,10 +6,146 @@
 
 import pandas as pd
 import numpy as np
+import re
 import json
+import heapq
+import hashlib
+import pickle
+from operator import itemgetter
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+# Многопоточное чтение CSV - если установлен pyarrow
+try:
+    import pyarrow.csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Быстрый разбор JSON - если установлен orjson
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Описания базовых полей понятным языком (префикс поля -> описание)
+FIELD_DESCRIPTIONS = {
+    'volume': 'Объем торгов (активность рынка)',
+    'price_change': 'Изменение цены (волатильность)',
+    'co': 'Индикатор перепроданности/перекупленности',
+    'mo': 'Momentum индикатор (сила движения)',
+    'ro': 'Индикатор разворота',
+    'as': 'Индикатор ускорения',
+    'ze': 'Z-score экстремум',
+    'ef': 'Фактор эффективности',
+    'mz': 'Momentum Z-score',
+    'rz': 'Разворот Z-score',
+    'maz': 'MA Z-score',
+    'cvz': 'Волатильность Z-score',
+    'rd': 'Индикатор направления',
+    'md': 'MA дивергенция',
+    'do': 'Перекупленность',
+    'so': 'Перепроданность'
+}
+
+# Описания типов событий для отчета
+EVENT_DESCRIPTIONS = {
+    'retracement_2_3pct': {
+        'description': 'Откат 2-3% - коррекция без обновления экстремума',
+        'practical': 'Возможность входа по тренду'
+    },
+    'retracement_5_7pct': {
+        'description': 'Откат 5-7% - значительная коррекция', 
+        'practical': 'Хорошая точка входа в тренд'
+    },
+    'consolidation': {
+        'description': 'Консолидация - боковое движение',
+        'practical': 'Ожидание пробоя, осторожность'
+    },
+    'continuation': {
+        'description': 'Продолжение движения - пробой уровней',
+        'practical': 'Подтверждение направления тренда'
+    },
+    'culmination': {
+        'description': 'Кульминация - точка разворота тренда',
+        'practical': 'Возможная смена направления'
+    },
+    'transition_zone': {
+        'description': 'Переходная зона - неопределенность',
+        'practical': 'Ожидание четких сигналов'
+    }
+}
+
+# Префиксы описаний одной альтернативой: ветви проверяются слева направо,
+# то есть в порядке словаря - первое подходящее описание, как при переборе
+_FIELD_BASE_RE = re.compile('|'.join(map(re.escape, FIELD_DESCRIPTIONS)))
+# Временной фрейм - вхождение подстроки в любом месте названия
+_FAST_TF_RE = re.compile('2|5|15|30')
+_SLOW_TF_RE = re.compile('1h|4h|1d')
+
+# Надежность сигнала по доле срабатываний: границы (0.4, 0.6, 0.8] и подписи корзин
+RELIABILITY_BINS = [0.4, 0.6, 0.8]
+RELIABILITY_LABELS = np.array(["низкая", "средняя", "высокая", "очень высокая"])
+
+# Сколько самых важных полей попадает в отчет
+TOP_FIELDS_IN_REPORT = 10
+
+
+@lru_cache(maxsize=None)
+def _describe_field_name(field_name):
+    """Описание поля по названию (названия повторяются - результат кэшируется)"""
+    match = _FIELD_BASE_RE.match(field_name)
+    if match is None:
+        return 'Технический индикатор'
+    
+    # Добавление временного фрейма
+    desc = FIELD_DESCRIPTIONS[match.group()]
+    if _FAST_TF_RE.search(field_name):
+        return desc + ' (быстрый сигнал)'
+    if _SLOW_TF_RE.search(field_name):
+        return desc + ' (медленный сигнал)'
+    if '_L' in field_name:
+        return desc + ' (с задержкой)'
+    return desc
+
+
+def _read_csv(path):
+    """
+    Чтение CSV-таблицы результатов
+    
+    С pyarrow файл разбирается блоками по 1 МБ во всех потоках; пустые строки
+    становятся пропусками, как в pd.read_csv.
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(path)
+    
+    table = pyarrow.csv.read_csv(
+        path,
+        read_options=pyarrow.csv.ReadOptions(use_threads=True, block_size=1 << 20),
+        convert_options=pyarrow.csv.ConvertOptions(strings_can_be_null=True)
+    )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _read_json(path):
+    """
+    Чтение JSON-файла результатов
+    
+    orjson не принимает NaN/Infinity, которые пишет json.dump, - такие файлы
+    разбираются стандартным json.
+    """
+    if ORJSON_AVAILABLE:
+        data = Path(path).read_bytes()
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(data)
+    
+    with open(path, 'r') as f:
+        return json.load(f)
+
 class ClearReportGenerator:
     """Генератор понятных отчетов из технических результатов"""
     
@@ -19,32 +155,63 @@ class ClearReportGenerator:
         self.scoring_config = None
         self.temporal_lags = None
         self.veto_rules = None
+        self.cache_dir = self.results_dir / ".cache"
         
     def load_results(self):
         """Загрузка всех результатов анализа"""
         try:
             # Основные результаты
             if (self.results_dir / "weight_matrix.csv").exists():
-                self.weight_matrix = pd.read_csv(self.results_dir / "weight_matrix.csv")
+                self.weight_matrix = self._load_cached(self.results_dir / "weight_matrix.csv", _read_csv)
             
             if (self.results_dir / "scoring_config.json").exists():
-                with open(self.results_dir / "scoring_config.json", 'r') as f:
-                    self.scoring_config = json.load(f)
+                self.scoring_config = self._load_cached(self.results_dir / "scoring_config.json", _read_json)
             
             # LTF результаты
             if (self.results_dir / "ltf" / "temporal_lags_ltf.csv").exists():
-                self.temporal_lags = pd.read_csv(self.results_dir / "ltf" / "temporal_lags_ltf.csv")
+                self.temporal_lags = self._load_cached(self.results_dir / "ltf" / "temporal_lags_ltf.csv", _read_csv)
             
             # VETO результаты
             if (self.results_dir / "veto_system" / "veto_rules.json").exists():
-                with open(self.results_dir / "veto_system" / "veto_rules.json", 'r') as f:
-                    self.veto_rules = json.load(f)
+                self.veto_rules = self._load_cached(self.results_dir / "veto_system" / "veto_rules.json", _read_json)
                     
             return True
         except Exception as e:
             print(f"Ошибка загрузки результатов: {e}")
             return False
     
+    def _load_cached(self, path, loader):
+        """
+        Результат loader(path) с кэшем в results/.cache
+        
+        Ключ - путь, время изменения и размер файла: после перезаписи
+        результатов анализа файл читается заново.
+        """
+        stat = path.stat()
+        key = f"{path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+        cache_path = self.cache_dir / f"report_{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl"
+        
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                print(f"⚠️ Кэш {cache_path.name} не прочитан ({e}), читаем {path.name}")
+        
+        data = loader(path)
+        
+        # Запись через временный файл - без полузаписанного кэша
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            print(f"⚠️ Кэш результатов не сохранен: {e}")
+        
+        return data
+    
     def generate_trader_friendly_report(self):
         """Создание отчета понятного для трейдера"""
         if not self.load_results():
@@ -73,10 +240,10 @@ class ClearReportGenerator:
             "   (чем выше вес, тем важнее поле для прогноза)"
         ])
         
-        # Топ полей по важности
-        top_fields = self._get_top_fields()
-        for i, (field, weight, description) in enumerate(top_fields[:10], 1):
-            report_lines.append(f"   {i:2d}. {field:15s} (вес: {weight:.3f}) - {description}")
+        # Топ полей по важности (описываются только попавшие в отчет)
+        top_fields = self._get_top_fields(TOP_FIELDS_IN_REPORT)
+        report_lines.extend(f"   {i:2d}. {field:15s} (вес: {weight:.3f}) - {description}"
+                            for i, (field, weight, description) in enumerate(top_fields, 1))
         
         report_lines.extend([
             "",
@@ -85,8 +252,8 @@ class ClearReportGenerator:
         
         # Временные лаги
         timing_info = self._analyze_timing()
-        for group, info in timing_info.items():
-            report_lines.append(f"   {group}: срабатывает за {info['lag']:.1f} периодов, надежность {info['reliability']}")
+        report_lines.extend(f"   {group}: срабатывает за {info['lag']:.1f} периодов, надежность {info['reliability']}"
+                            for group, info in timing_info.items())
         
         report_lines.extend([
             "",
@@ -95,8 +262,7 @@ class ClearReportGenerator:
         
         # Стоп-поля
         stop_signals = self._get_stop_signals()
-        for field, reason in stop_signals[:5]:
-            report_lines.append(f"   ❌ {field}: {reason}")
+        report_lines.extend(f"   ❌ {field}: {reason}" for field, reason in stop_signals[:5])
         
         report_lines.extend([
             "",
@@ -105,8 +271,8 @@ class ClearReportGenerator:
         
         # События
         events_info = self._analyze_events()
-        for event_type, info in events_info.items():
-            report_lines.append(f"   📈 {event_type}: {info['description']} ({info['frequency']})")
+        report_lines.extend(f"   📈 {event_type}: {info['description']} ({info['frequency']})"
+                            for event_type, info in events_info.items())
         
         report_lines.extend([
             "",
@@ -115,8 +281,7 @@ class ClearReportGenerator:
         
         # Рекомендации
         recommendations = self._generate_recommendations()
-        for i, rec in enumerate(recommendations, 1):
-            report_lines.append(f"   {i}. {rec}")
+        report_lines.extend(f"   {i}. {rec}" for i, rec in enumerate(recommendations, 1))
         
         report_lines.extend([
             "",
@@ -125,8 +290,7 @@ class ClearReportGenerator:
         
         # Предупреждения
         warnings = self._generate_warnings()
-        for warning in warnings:
-            report_lines.append(f"   ⚠️ {warning}")
+        report_lines.extend(f"   ⚠️ {warning}" for warning in warnings)
         
         report_lines.extend([
             "",
@@ -139,23 +303,27 @@ class ClearReportGenerator:
             "=" * 60
         ])
         
-        # Сохранение отчета
+        # Сохранение отчета - текст собирается один раз
+        report = '\n'.join(report_lines)
         output_file = self.results_dir / "ПОНЯТНЫЙ_ОТЧЕТ.txt"
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(report_lines))
+            f.write(report)
         
         print(f"📋 Понятный отчет создан: {output_file}")
-        return '\n'.join(report_lines)
+        return report
     
-    def _get_top_fields(self):
-        """Получение топ полей с описаниями"""
+    def _get_top_fields(self, limit=None):
+        """Получение топ полей с описаниями (limit - сколько самых важных нужно)"""
         if not self.scoring_config or 'weights' not in self.scoring_config:
             return []
         
         weights = self.scoring_config['weights']
         
-        # Сортировка по важности
-        sorted_fields = sorted(weights.items(), key=lambda x: x[1], reverse=True)
+        # Сортировка по важности: для первых limit полей - частичный отбор без полной сортировки
+        if limit is None:
+            sorted_fields = sorted(weights.items(), key=itemgetter(1), reverse=True)
+        else:
+            sorted_fields = heapq.nlargest(limit, weights.items(), key=itemgetter(1))
         
         result = []
         for field, weight in sorted_fields:
@@ -171,94 +339,55 @@ class ClearReportGenerator:
     
     def _describe_field(self, field_name):
         """Описание поля понятным языком"""
-        descriptions = {
-            'volume': 'Объем торгов (активность рынка)',
-            'price_change': 'Изменение цены (волатильность)',
-            'co': 'Индикатор перепроданности/перекупленности',
-            'mo': 'Momentum индикатор (сила движения)',
-            'ro': 'Индикатор разворота',
-            'as': 'Индикатор ускорения',
-            'ze': 'Z-score экстремум',
-            'ef': 'Фактор эффективности',
-            'mz': 'Momentum Z-score',
-            'rz': 'Разворот Z-score',
-            'maz': 'MA Z-score',
-            'cvz': 'Волатильность Z-score',
-            'rd': 'Индикатор направления',
-            'md': 'MA дивергенция',
-            'do': 'Перекупленность',
-            'so': 'Перепроданность'
-        }
-        
-        # Поиск базового названия
-        for base, desc in descriptions.items():
-            if field_name.startswith(base):
-                # Добавление временного фрейма
-                if any(tf in field_name for tf in ['2', '5', '15', '30']):
-                    desc += ' (быстрый сигнал)'
-                elif any(tf in field_name for tf in ['1h', '4h', '1d']):
-                    desc += ' (медленный сигнал)'
-                elif '_L' in field_name:
-                    desc += ' (с задержкой)'
-                return desc
-        
-        return 'Технический индикатор'
+        return _describe_field_name(field_name)
     
     def _analyze_timing(self):
         """Анализ временных характеристик"""
-        if not self.temporal_lags:
+        if self.temporal_lags is None or self.temporal_lags.empty:
             return {}
         
-        timing = {}
+        groups = self.temporal_lags.iloc[:, 0].tolist()  # Первая колонка - название группы
+        mean_lags = self.temporal_lags['mean_lag'].tolist()
+        rates = self.temporal_lags['activation_rate'].to_numpy(dtype=np.float64)
         
-        for _, row in self.temporal_lags.iterrows():
-            group = row.iloc[0]  # Первая колонка - название группы
-            mean_lag = row['mean_lag']
-            activation_rate = row['activation_rate']
-            
-            # Оценка надежности
-            if activation_rate > 0.8:
-                reliability = "очень высокая"
-            elif activation_rate > 0.6:
-                reliability = "высокая"
-            elif activation_rate > 0.4:
-                reliability = "средняя"
-            else:
-                reliability = "низкая"
-            
-            timing[group] = {
+        # Оценка надежности всех групп разом (строго больше границы - следующая корзина)
+        bins = np.digitize(rates, RELIABILITY_BINS, right=True)
+        bins[np.isnan(rates)] = 0
+        reliabilities = RELIABILITY_LABELS[bins].tolist()
+        
+        return {
+            group: {
                 'lag': mean_lag,
                 'reliability': reliability,
                 'activation_rate': activation_rate
             }
-        
-        return timing
+            for group, mean_lag, reliability, activation_rate in zip(groups, mean_lags, reliabilities, rates.tolist())
+        }
     
     def _get_stop_signals(self):
         """Получение стоп-сигналов"""
         if not self.veto_rules:
             return []
         
+        # (поле, сила, причина) - сила нужна для сортировки
         stop_signals = []
         
         # Блокирующие поля
         blocking_fields = self.veto_rules.get('blocking_fields', {})
         for field, info in blocking_fields.items():
             strength = info.get('blocking_strength', 0)
-            reason = f"блокирует сигналы с силой {strength:.1%}"
-            stop_signals.append((field, reason))
+            stop_signals.append((field, strength, f"блокирует сигналы с силой {strength:.1%}"))
         
         # Ложные сигналы
         false_signals = self.veto_rules.get('false_signal_filters', {})
         for field, info in false_signals.items():
             false_rate = info.get('false_positive_rate', 0)
-            reason = f"дает ложные сигналы в {false_rate:.1%} случаев"
-            stop_signals.append((field, reason))
+            stop_signals.append((field, false_rate, f"дает ложные сигналы в {false_rate:.1%} случаев"))
         
-        # Сортировка по важности блокировки
-        stop_signals.sort(key=lambda x: x[1], reverse=True)
+        # Сортировка по важности блокировки - по числовой силе, а не по тексту причины
+        stop_signals.sort(key=itemgetter(1), reverse=True)
         
-        return stop_signals
+        return [(field, reason) for field, _, reason in stop_signals]
     
     def _analyze_events(self):
         """Анализ типов событий"""
@@ -269,56 +398,20 @@ class ClearReportGenerator:
             return {}
         
         try:
-            with open(events_file, 'r') as f:
-                events_stats = json.load(f)
+            events_stats = _read_json(events_file)
         except:
             return {}
         
-        events_info = {}
-        
-        # Описание событий
-        event_descriptions = {
-            'retracement_2_3pct': {
-                'description': 'Откат 2-3% - коррекция без обновления экстремума',
-                'practical': 'Возможность входа по тренду'
-            },
-            'retracement_5_7pct': {
-                'description': 'Откат 5-7% - значительная коррекция', 
-                'practical': 'Хорошая точка входа в тренд'
-            },
-            'consolidation': {
-                'description': 'Консолидация - боковое движение',
-                'practical': 'Ожидание пробоя, осторожность'
-            },
-            'continuation': {
-                'description': 'Продолжение движения - пробой уровней',
-                'practical': 'Подтверждение направления тренда'
-            },
-            'culmination': {
-                'description': 'Кульминация - точка разворота тренда',
-                'practical': 'Возможная смена направления'
-            },
-            'transition_zone': {
-                'description': 'Переходная зона - неопределенность',
-                'practical': 'Ожидание четких сигналов'
+        # Только известные типы событий (summary и прочие служебные ключи пропускаются)
+        return {
+            event_type: {
+                'description': EVENT_DESCRIPTIONS[event_type]['description'],
+                'frequency': f"{stats.get('percentage', 0):.1f}% случаев",
+                'practical': EVENT_DESCRIPTIONS[event_type]['practical']
             }
+            for event_type, stats in events_stats.items()
+            if event_type in EVENT_DESCRIPTIONS
         }
-        
-        for event_type, stats in events_stats.items():
-            if event_type == 'summary':
-                continue
-            
-            frequency = stats.get('percentage', 0)
-            
-            if event_type in event_descriptions:
-                info = event_descriptions[event_type]
-                events_info[event_type] = {
-                    'description': info['description'],
-                    'frequency': f"{frequency:.1f}% случаев",
-                    'practical': info['practical']
-                }
-        
-        return events_info
     
     def _generate_recommendations(self):
         """Генерация практических рекомендаций"""
@@ -9,13 +9,118 @@
 
 import sys
 import os
+import warnings
+from collections import Counter
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from advanced_log_parser import AdvancedLogParser
+from scalp_kernels import last_valid_fill, future_extreme_fill, source_hash
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 
+# JIT-компиляция вычислительных ядер - если установлен numba
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Заранее скомпилированные ядра (python scalp_kernels.py) - без JIT при первом запуске.
+# Сборка из другой версии scalp_kernels.py не используется
+try:
+    import _scalp_kernels
+    AOT_KERNELS_AVAILABLE = getattr(_scalp_kernels, 'source_hash', lambda: None)() == source_hash()
+    if not AOT_KERNELS_AVAILABLE:
+        print("⚠️ _scalp_kernels собран из другой версии scalp_kernels.py - пересоберите: python scalp_kernels.py")
+except ImportError:
+    AOT_KERNELS_AVAILABLE = False
+
+# Окно поиска локальных экстремумов (центрированное, как rolling(center=True))
+EXTREMUM_WINDOW = 10
+# Горизонт поиска отката: свеча экстремума + 30 следующих
+REBOUND_HORIZON = 30
+# Минимум свечей в окне (включая экстремум), иначе экстремум пропускается
+MIN_FUTURE_CANDLES = 10
+# Сколько свечей до события просматривается в поисках значения индикатора
+PATTERN_LOOKBACK = 5
+
+
+def _local_extrema(values: np.ndarray, window: int, find_lows: bool) -> np.ndarray:
+    """
+    Флаги локальных минимумов (find_lows) или максимумов
+    
+    Значение равно экстремуму центрированного окна [i - window//2, i + window - window//2)
+    и строго ниже (выше) обоих соседей. Окна с пропусками экстремумов не дают.
+    """
+    flags = np.zeros(len(values), dtype=bool)
+    if len(values) < window:
+        return flags
+    
+    offset = window // 2
+    windows = sliding_window_view(values, window)
+    extreme = windows.min(axis=1) if find_lows else windows.max(axis=1)
+    
+    center = values[offset:offset + len(extreme)]
+    before = values[offset - 1:offset - 1 + len(extreme)]
+    after = values[offset + 1:offset + 1 + len(extreme)]
+    if find_lows:
+        flags[offset:offset + len(extreme)] = (center == extreme) & (before > center) & (after > center)
+    else:
+        flags[offset:offset + len(extreme)] = (center == extreme) & (before < center) & (after < center)
+    return flags
+
+
+def _future_extreme(values: np.ndarray, positions: np.ndarray, find_max: bool) -> np.ndarray:
+    """
+    Максимум (find_max) или минимум values в окне [p, p + REBOUND_HORIZON] для каждой позиции p
+    
+    Пропуски (NaN) игнорируются, как в Series.max()/min().
+    """
+    if _future_extreme_kernel is not None:
+        out = np.empty(len(positions))
+        _future_extreme_kernel(values, positions, REBOUND_HORIZON, find_max, out)
+        return out
+    
+    # Без numba: окна по массиву с NaN-хвостом, fmax/fmin пропускают NaN
+    padded = np.concatenate([values, np.full(REBOUND_HORIZON, np.nan)])
+    windows = sliding_window_view(padded, REBOUND_HORIZON + 1)[positions]
+    return (np.fmax if find_max else np.fmin).reduce(windows, axis=1)
+
+
+# Ядра: AOT-модуль, иначе JIT numba, иначе numpy-варианты в _last_valid/_future_extreme
+if AOT_KERNELS_AVAILABLE:
+    _last_valid_kernel = _scalp_kernels.last_valid_fill
+    _future_extreme_kernel = _scalp_kernels.future_extreme_fill
+elif NUMBA_AVAILABLE:
+    _last_valid_kernel = njit(cache=True)(last_valid_fill)
+    _future_extreme_kernel = njit(cache=True)(future_extreme_fill)
+else:
+    _last_valid_kernel = None
+    _future_extreme_kernel = None
+
+
+def _last_valid(values: np.ndarray, lines: np.ndarray, lookback: int) -> np.ndarray:
+    """
+    Матрица (события x индикаторы): последнее непустое значение за lookback строк до события
+    
+    NaN - если в окне нет ни одного значения.
+    """
+    out = np.full((len(lines), values.shape[1]), np.nan)
+    if _last_valid_kernel is not None:
+        _last_valid_kernel(np.ascontiguousarray(values), lines, lookback, out)
+        return out
+    
+    # Без numba: от ближайшей строки назад, заполняются только оставшиеся пропуски
+    for offset in range(1, lookback + 1):
+        rows = lines - offset
+        candidate = values[np.maximum(rows, 0)]
+        candidate[rows < 0] = np.nan
+        np.copyto(out, candidate, where=np.isnan(out))
+    return out
+
+
 class ScalpAnalyzer:
     """Простой анализатор для контртрендового скальпа"""
     
@@ -31,7 +136,7 @@ class ScalpAnalyzer:
         
         # 1. Парсим данные
         print("\n1️⃣ ПАРСИНГ ДАННЫХ...")
-        self.df = self.parser.parse_log_file(log_file)
+        self.df = self.parser.parse_log_file_cached(log_file)
         
         if self.df.empty:
             print("❌ Данные не извлечены!")
@@ -52,89 +157,52 @@ class ScalpAnalyzer:
     def find_events(self):
         """Поиск событий: лои/хаи с откатами vs продолжения"""
         
-        # Вычисляем локальные минимумы и максимумы
-        window = 10  # окно для поиска экстремумов
-        
-        self.df['is_local_low'] = (
-            (self.df['low'] == self.df['low'].rolling(window=window, center=True).min()) &
-            (self.df['low'].shift(1) > self.df['low']) &
-            (self.df['low'].shift(-1) > self.df['low'])
-        )
+        low = self.df['low'].to_numpy(dtype=np.float64)
+        high = self.df['high'].to_numpy(dtype=np.float64)
         
-        self.df['is_local_high'] = (
-            (self.df['high'] == self.df['high'].rolling(window=window, center=True).max()) &
-            (self.df['high'].shift(1) < self.df['high']) &
-            (self.df['high'].shift(-1) < self.df['high'])
-        )
+        # Вычисляем локальные минимумы и максимумы - окна по массивам, без rolling/shift
+        is_local_low = _local_extrema(low, EXTREMUM_WINDOW, find_lows=True)
+        is_local_high = _local_extrema(high, EXTREMUM_WINDOW, find_lows=False)
+        self.df['is_local_low'] = is_local_low
+        self.df['is_local_high'] = is_local_high
         
-        # Ищем откаты после экстремумов
-        events = []
+        # Ищем откаты после экстремумов - все окна сразу, без цикла по свечам
+        has_future = np.arange(len(self.df)) <= len(self.df) - MIN_FUTURE_CANDLES
         
-        # Находим лои с откатами вверх
-        local_lows = self.df[self.df['is_local_low']].copy()
+        low_pos = np.flatnonzero(is_local_low & has_future)
+        high_pos = np.flatnonzero(is_local_high & has_future)
         
-        for idx, low_candle in local_lows.iterrows():
-            # Ищем откат вверх в следующих 30 свечах
-            future_data = self.df.loc[idx:idx+30]
-            if len(future_data) < 10:
-                continue
-                
-            max_price_after = future_data['high'].max()
-            rebound_pct = ((max_price_after - low_candle['low']) / low_candle['low']) * 100
-            
-            if rebound_pct >= 3.0:  # Откат вверх 3%+
-                events.append({
-                    'type': 'ЛОЙ_КОНТРТРЕНД',
-                    'timestamp': low_candle['timestamp'],
-                    'price': low_candle['low'],
-                    'rebound_pct': rebound_pct,
-                    'line_number': idx
-                })
-            elif rebound_pct < 1.0:  # Продолжение дампа
-                events.append({
-                    'type': 'ПРОДОЛЖЕНИЕ_ДАМПА',
-                    'timestamp': low_candle['timestamp'],
-                    'price': low_candle['low'],
-                    'rebound_pct': rebound_pct,
-                    'line_number': idx
-                })
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Лои: откат вверх в следующих 30 свечах
+            rebound_pct = ((_future_extreme(high, low_pos, find_max=True) - low[low_pos]) / low[low_pos]) * 100
+            # Хаи: откат вниз в следующих 30 свечах
+            pullback_pct = ((high[high_pos] - _future_extreme(low, high_pos, find_max=False)) / high[high_pos]) * 100
         
-        # Находим хаи с откатами вниз
-        local_highs = self.df[self.df['is_local_high']].copy()
+        events = []
         
-        for idx, high_candle in local_highs.iterrows():
-            # Ищем откат вниз в следующих 30 свечах
-            future_data = self.df.loc[idx:idx+30]
-            if len(future_data) < 10:
-                continue
-                
-            min_price_after = future_data['low'].min()
-            pullback_pct = ((high_candle['high'] - min_price_after) / high_candle['high']) * 100
+        # Откат 3%+ - контртренд, меньше 1% - продолжение дампа/пампа
+        for positions, prices, pct, pct_key, reversal_type, continuation_type in (
+                (low_pos, low, rebound_pct, 'rebound_pct', 'ЛОЙ_КОНТРТРЕНД', 'ПРОДОЛЖЕНИЕ_ДАМПА'),
+                (high_pos, high, pullback_pct, 'pullback_pct', 'ХАЙ_КОНТРТРЕНД', 'ПРОДОЛЖЕНИЕ_ПАМПА')):
+            selected = (pct >= 3.0) | (pct < 1.0)
+            positions = positions[selected]
             
-            if pullback_pct >= 3.0:  # Откат вниз 3%+
-                events.append({
-                    'type': 'ХАЙ_КОНТРТРЕНД',
-                    'timestamp': high_candle['timestamp'],
-                    'price': high_candle['high'],
-                    'pullback_pct': pullback_pct,
-                    'line_number': idx
-                })
-            elif pullback_pct < 1.0:  # Продолжение пампа
+            for timestamp, price, value, idx in zip(self.df['timestamp'].iloc[positions].tolist(),
+                                                    prices[positions].tolist(),
+                                                    pct[selected].tolist(),
+                                                    self.df.index[positions].tolist()):
                 events.append({
-                    'type': 'ПРОДОЛЖЕНИЕ_ПАМПА',
-                    'timestamp': high_candle['timestamp'],
-                    'price': high_candle['high'],
-                    'pullback_pct': pullback_pct,
+                    'type': reversal_type if value >= 3.0 else continuation_type,
+                    'timestamp': timestamp,
+                    'price': price,
+                    pct_key: value,
                     'line_number': idx
                 })
         
         self.events = events
         
-        # Статистика событий
-        event_counts = {}
-        for event in events:
-            event_type = event['type']
-            event_counts[event_type] = event_counts.get(event_type, 0) + 1
+        # Статистика событий (Counter считает в C, порядок - первое появление типа)
+        event_counts = Counter(event['type'] for event in events)
         
         print("📊 НАЙДЕННЫЕ СОБЫТИЯ:")
         for event_type, count in event_counts.items():
@@ -152,44 +220,50 @@ class ScalpAnalyzer:
         # Ключевые индикаторы для анализа
         key_indicators = ['nw2', 'ef2', 'as2', 'vc2', 'ze2', 'co2', 'ro2', 'so2']
         
-        patterns = {}
-        
-        for event in self.events:
-            event_type = event['type']
-            line_num = event['line_number']
-            
-            if event_type not in patterns:
-                patterns[event_type] = {indicator: [] for indicator in key_indicators}
-            
-            # Смотрим индикаторы за 5 свечей до события
-            start_idx = max(0, line_num - 5)
-            end_idx = line_num
-            
-            event_data = self.df.iloc[start_idx:end_idx]
-            
-            for indicator in key_indicators:
-                if indicator in self.df.columns:
-                    # Берем последнее непустое значение
-                    values = event_data[indicator].dropna()
-                    if len(values) > 0:
-                        last_value = values.iloc[-1]
-                        patterns[event_type][indicator].append(last_value)
+        indicators = [indicator for indicator in key_indicators if indicator in self.df.columns]
+        
+        # Смотрим индикаторы за 5 свечей до события: последнее непустое значение,
+        # все события и индикаторы - одним проходом по числовой матрице
+        event_lines = np.array([event['line_number'] for event in self.events], dtype=np.int64)
+        last_values = _last_valid(self.df[indicators].to_numpy(dtype=np.float64, na_value=np.nan),
+                                  event_lines, PATTERN_LOOKBACK)
+        
+        # Типы событий в порядке появления и номер события внутри своего типа
+        type_index = {}
+        type_ids = np.array([type_index.setdefault(event['type'], len(type_index)) for event in self.events],
+                            dtype=np.int64)
+        type_counts = np.bincount(type_ids)
+        order = np.argsort(type_ids, kind='stable')
+        slots = np.empty(len(type_ids), dtype=np.int64)
+        slots[order] = np.arange(len(order)) - np.repeat(np.cumsum(type_counts) - type_counts, type_counts)
+        
+        # Блок (типы x события типа x индикаторы), недостающее - NaN:
+        # каждая статистика считается одним nan-вызовом для всех типов и индикаторов
+        padded = np.full((len(type_index), type_counts.max(), len(indicators)), np.nan)
+        padded[type_ids, slots] = last_values
+        
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # пустые срезы дают NaN
+            counts = np.count_nonzero(~np.isnan(padded), axis=1)
+            means = np.nanmean(padded, axis=1)
+            mins = np.nanmin(padded, axis=1)
+            maxs = np.nanmax(padded, axis=1)
+            stds = np.nanstd(padded, axis=1)
         
         # Вычисляем статистики по паттернам
         self.pattern_stats = {}
         
-        for event_type, indicators in patterns.items():
-            self.pattern_stats[event_type] = {}
-            
-            for indicator, values in indicators.items():
-                if values:
-                    self.pattern_stats[event_type][indicator] = {
-                        'count': len(values),
-                        'mean': np.mean(values),
-                        'min': np.min(values),
-                        'max': np.max(values),
-                        'std': np.std(values) if len(values) > 1 else 0
-                    }
+        for t, event_type in enumerate(type_index):
+            self.pattern_stats[event_type] = {
+                indicator: {
+                    'count': int(counts[t, j]),
+                    'mean': means[t, j],
+                    'min': mins[t, j],
+                    'max': maxs[t, j],
+                    'std': stds[t, j] if counts[t, j] > 1 else 0
+                }
+                for j, indicator in enumerate(indicators) if counts[t, j] > 0
+            }
         
         print("✅ Анализ паттернов завершен")
     
@@ -207,26 +281,25 @@ class ScalpAnalyzer:
         event_types = list(self.pattern_stats.keys())
         indicators = ['nw2', 'ef2', 'as2', 'vc2', 'ze2', 'co2', 'ro2', 'so2']
         
-        print(f"\n🎯 СРЕДНИЕ ЗНАЧЕНИЯ ИНДИКАТОРОВ:")
-        print(f"{'ИНДИКАТОР':<10} | ", end="")
-        for event_type in event_types:
-            print(f"{event_type[:15]:<15} | ", end="")
-        print()
-        print("-" * (10 + 17 * len(event_types)))
+        # Ячейки "среднее(число)" по индикаторам и типам, колонки шириной 15 как в заголовке
+        cells = [
+            [f"{stats[indicator]['mean']:>6.2f}({stats[indicator]['count']:>2})" if indicator in stats else 'N/A'
+             for stats in (self.pattern_stats[event_type] for event_type in event_types)]
+            for indicator in indicators
+        ]
+        
+        table_lines = [
+            f"\n🎯 СРЕДНИЕ ЗНАЧЕНИЯ ИНДИКАТОРОВ:",
+            f"{'ИНДИКАТОР':<10} | " + "".join(f"{event_type[:15]:<15} | " for event_type in event_types),
+            "-" * (10 + 17 * len(event_types))
+        ]
+        table_lines.extend(
+            f"{indicator:<10} | " + "".join(f"{cell:>15} | " for cell in row)
+            for indicator, row in zip(indicators, cells)
+        )
         
-        for indicator in indicators:
-            print(f"{indicator:<10} | ", end="")
-            
-            for event_type in event_types:
-                if (event_type in self.pattern_stats and 
-                    indicator in self.pattern_stats[event_type]):
-                    
-                    mean_val = self.pattern_stats[event_type][indicator]['mean']
-                    count = self.pattern_stats[event_type][indicator]['count']
-                    print(f"{mean_val:>6.2f}({count:>2})<7 | ", end="")
-                else:
-                    print(f"{'N/A':>13} | ", end="")
-            print()
+        # Таблица выводится одной строкой
+        print("\n".join(table_lines))
         
         # Поиск потенциальных VETO полей
         print(f"\n🚫 ПОТЕНЦИАЛЬНЫЕ VETO ПОЛЯ:")
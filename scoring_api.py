@@ -4,15 +4,52 @@ API для интеграции скоринговой системы
 Простой интерфейс для использования обученной модели
 """
 
+import re
 import json
 import pickle
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
+from contextlib import nullcontext
+from collections import deque
 import warnings
 warnings.filterwarnings('ignore')
 
+# JIT-компиляция ядра скоринга - если установлен numba
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Регулярные выражения разбора строки лога (компилируются один раз)
+_OHLC_RE = re.compile(r'o:([\d.]+).*?h:([\d.]+).*?l:([\d.]+).*?c:([\d.]+)')
+_FIELD_RE = re.compile(r'([a-zA-Z]+\d*)-?([\d.-]+%?[a-zA-Z]*!*)')
+
+# Символы, удаляемые из значения поля перед float() - один проход str.translate
+_STRIP_TABLE = str.maketrans('', '', '%!σ')
+
+# Сколько разобранных строк держит кэш parse_log_line
+_PARSE_CACHE_SIZE = 10000
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _score_kernel(values, thresholds, weights, contributions, active_idx):
+        """Сумма вкладов активных полей и их число - те же операции, что в calculate_score"""
+        score = 0.0
+        count = 0
+        for j in range(values.shape[0]):
+            abs_value = abs(values[j])
+            if abs_value > thresholds[j] and weights[j] > 0:
+                contributions[j] = weights[j] * min(abs_value / thresholds[j], 3.0)
+                score += contributions[j]
+                active_idx[count] = j
+                count += 1
+        return score, count
+
+
 class ScoringAPI:
     """
     API для применения обученной скоринговой системы
@@ -30,8 +67,18 @@ class ScoringAPI:
         self.weights = None
         self.thresholds = {}
         self.field_weights = {}
+        self._field_order = []
+        self._thr_arr = None
+        self._w_arr = None
         self.is_ready = False
         
+        # Метка времени на каждую строку нужна только в реальном времени
+        self._emit_timestamp = False
+        
+        # Кэш разобранных строк: словарь + очередь ключей для вытеснения старых
+        self._parse_cache = {}
+        self._parse_cache_order = deque(maxlen=_PARSE_CACHE_SIZE)
+        
         try:
             self.load_configuration(config_path, weights_path)
         except Exception as e:
@@ -49,6 +96,7 @@ class ScoringAPI:
             
             self.thresholds = self.config.get('thresholds', {})
             self.field_weights = self.config.get('weights', {})
+            self._build_score_arrays()
         else:
             raise FileNotFoundError(f"Конфигурация не найдена: {config_path}")
         
@@ -61,10 +109,33 @@ class ScoringAPI:
         self.is_ready = True
         print("✅ Конфигурация загружена")
     
+    def _build_score_arrays(self):
+        """Выровненные по порядку полей массивы порогов и весов для score_batch"""
+        self._field_order = list(self.thresholds)
+        thresholds = [self.thresholds[f] for f in self._field_order]
+        weights = [self.field_weights.get(f"{f}_activated", 0) for f in self._field_order]
+        
+        # Нечисловые или нулевые пороги calculate_score обрабатывает
+        # через исключение - для них score_batch считает построчно
+        if all(isinstance(x, (int, float)) for x in thresholds + weights) and 0 not in thresholds:
+            self._thr_arr = np.array(thresholds, dtype=np.float64)
+            self._w_arr = np.array(weights, dtype=np.float64)
+            
+            # Буферы одной строки для _score_kernel
+            self._value_buf = np.empty(len(thresholds), dtype=np.float64)
+            self._contrib_buf = np.empty(len(thresholds), dtype=np.float64)
+            self._active_idx_buf = np.empty(len(thresholds), dtype=np.int64)
+        else:
+            self._thr_arr = None
+            self._w_arr = None
+    
     def parse_log_line(self, log_line):
         """
         Парсинг одной строки лога в структурированные данные
         
+        Повторяющиеся строки берутся из кэша. Ключ - часть строки после
+        четвертого '|': метка времени и первые колонки на результат не влияют.
+        
         Args:
             log_line: строка лога
             
@@ -74,6 +145,27 @@ class ScoringAPI:
         if not isinstance(log_line, str) or not log_line.strip():
             return {}
         
+        parts = log_line.split('|', 4)
+        if len(parts) < 5:
+            return self._parse_log_line(log_line)
+        
+        key = parts[4]
+        cached = self._parse_cache.get(key)
+        if cached is None:
+            cached = self._parse_log_line(log_line)
+            if len(self._parse_cache_order) == self._parse_cache_order.maxlen:
+                del self._parse_cache[self._parse_cache_order[0]]
+            self._parse_cache[key] = cached
+            self._parse_cache_order.append(key)
+        
+        # Копия - вызывающий код может менять словарь
+        return dict(cached)
+    
+    def _parse_log_line(self, log_line):
+        """Разбор строки лога без кэша"""
+        if not isinstance(log_line, str) or not log_line.strip():
+            return {}
+        
         data = {}
         
         try:
@@ -81,8 +173,9 @@ class ScoringAPI:
             if '|' not in log_line:
                 return {}
             
-            # Разделение на части
-            parts = log_line.split('|')
+            # Разделение на части: всё после шестого '|' остаётся одним
+            # хвостом, который целиком уходит в regex OHLC и полей
+            parts = log_line.split('|', 6)
             
             if len(parts) < 6:
                 return {}
@@ -91,14 +184,17 @@ class ScoringAPI:
             try:
                 data['color'] = parts[4] if len(parts) > 4 else 'UNKNOWN'
                 data['price_change'] = self._parse_percentage(parts[5]) if len(parts) > 5 else 0
-                data['volume'] = self._parse_volume(parts[6]) if len(parts) > 6 else 0
+                data['volume'] = self._parse_volume(parts[6].split('|', 1)[0]) if len(parts) > 6 else 0
             except (IndexError, ValueError):
                 pass
             
             # Поиск OHLC данных
-            remaining_data = '|'.join(parts[6:]) if len(parts) > 6 else ''
+            remaining_data = parts[6] if len(parts) > 6 else ''
             
-            ohlc_match = re.search(r'o:([\d.]+).*?h:([\d.]+).*?l:([\d.]+).*?c:([\d.]+)', remaining_data)
+            # Без маркеров 'o:' и 'c:' regex заведомо не совпадёт
+            ohlc_match = None
+            if 'o:' in remaining_data and 'c:' in remaining_data:
+                ohlc_match = _OHLC_RE.search(remaining_data)
             if ohlc_match:
                 data['open'] = float(ohlc_match.group(1))
                 data['high'] = float(ohlc_match.group(2))
@@ -107,21 +203,21 @@ class ScoringAPI:
                 data['range'] = data['high'] - data['low']
             
             # Парсинг полей
-            import re
-            field_pattern = r'([a-zA-Z]+\d*)-?([\d.-]+%?[a-zA-Z]*!*)'
-            fields = re.findall(field_pattern, remaining_data)
+            fields = _FIELD_RE.findall(remaining_data) if remaining_data else []
             
             for field_name, field_value in fields:
                 if field_name in ['o', 'h', 'l', 'c', 'rng']:
                     continue
                 
+                # Очистка и конвертация значения: float() сам проверяет формат,
+                # буквенный суффикс ('12K', '-inf', '-nan') оставляет строку
+                clean_value = field_value.translate(_STRIP_TABLE)
+                if clean_value[-1:].isalpha():
+                    data[field_name] = field_value
+                    continue
+                
                 try:
-                    # Очистка и конвертация значения
-                    clean_value = field_value.replace('%', '').replace('!', '').replace('σ', '')
-                    if clean_value.replace('.', '').replace('-', '').isdigit():
-                        data[field_name] = float(clean_value)
-                    else:
-                        data[field_name] = field_value
+                    data[field_name] = float(clean_value)
                 except ValueError:
                     data[field_name] = field_value
             
@@ -165,6 +261,9 @@ class ScoringAPI:
             return {'error': 'API не готов', 'score': 0, 'confidence': 0}
         
         try:
+            if NUMBA_AVAILABLE and self._thr_arr is not None:
+                return self._calculate_score_jit(data_dict)
+            
             score = 0.0
             active_features = 0
             feature_contributions = {}
@@ -191,25 +290,100 @@ class ScoringAPI:
                                 'contribution': contribution
                             }
             
-            # Нормализация скора
-            if active_features > 0:
-                normalized_score = min(score / active_features, 1.0)
-                confidence = min(active_features / 5.0, 1.0)  # Больше активных полей = больше уверенности
-            else:
-                normalized_score = 0.0
-                confidence = 0.0
-            
-            return {
-                'score': normalized_score,
-                'confidence': confidence,
-                'active_features': active_features,
-                'feature_contributions': feature_contributions,
-                'raw_score': score
-            }
+            return self._score_result(score, active_features, feature_contributions)
             
         except Exception as e:
             return {'error': str(e), 'score': 0, 'confidence': 0}
     
+    def _calculate_score_jit(self, data_dict):
+        """calculate_score через _score_kernel: один dict.get на поле, остальное в нативном цикле"""
+        self._value_buf[:] = [value if isinstance(value, (int, float)) else np.nan
+                              for value in map(data_dict.get, self._field_order)]
+        
+        score, active_features = _score_kernel(self._value_buf, self._thr_arr, self._w_arr,
+                                               self._contrib_buf, self._active_idx_buf)
+        
+        feature_contributions = {}
+        if active_features:
+            contributions = self._contrib_buf.tolist()
+            for j in self._active_idx_buf[:active_features].tolist():
+                field_name = self._field_order[j]
+                feature_contributions[field_name] = {
+                    'value': data_dict[field_name],
+                    'threshold': self.thresholds[field_name],
+                    'weight': self.field_weights[f"{field_name}_activated"],
+                    'contribution': contributions[j]
+                }
+        
+        return self._score_result(score, active_features, feature_contributions)
+    
+    def _score_result(self, score, active_features, feature_contributions):
+        """Нормализация скора и сборка результата"""
+        if active_features > 0:
+            normalized_score = min(score / active_features, 1.0)
+            confidence = min(active_features / 5.0, 1.0)  # Больше активных полей = больше уверенности
+        else:
+            normalized_score = 0.0
+            confidence = 0.0
+        
+        return {
+            'score': normalized_score,
+            'confidence': confidence,
+            'active_features': active_features,
+            'feature_contributions': feature_contributions,
+            'raw_score': score
+        }
+    
+    def score_batch(self, dicts):
+        """
+        Векторный расчет скора для пачки распарсенных строк
+        
+        Args:
+            dicts: список словарей с данными полей
+            
+        Returns:
+            list: результаты в формате calculate_score для каждого словаря
+        """
+        if not self.is_ready or self._thr_arr is None or not dicts:
+            return [self.calculate_score(data_dict) for data_dict in dicts]
+        
+        try:
+            # Матрица значений (строки x поля), отсутствующие и нечисловые - NaN
+            values = np.full((len(dicts), len(self._field_order)), np.nan)
+            for j, field_name in enumerate(self._field_order):
+                for i, data_dict in enumerate(dicts):
+                    field_value = data_dict.get(field_name)
+                    if isinstance(field_value, (int, float)):
+                        values[i, j] = field_value
+            
+            abs_values = np.abs(values)
+            active = (abs_values > self._thr_arr) & (self._w_arr > 0)
+            contributions = np.where(active, self._w_arr * np.minimum(abs_values / self._thr_arr, 3.0), 0.0)
+            
+            # Суммирование по полям в том же порядке, что и в calculate_score
+            raw_scores = np.zeros(len(dicts))
+            for j in range(len(self._field_order)):
+                raw_scores += contributions[:, j]
+            active_counts = active.sum(axis=1)
+        except Exception:
+            return [self.calculate_score(data_dict) for data_dict in dicts]
+        
+        results = []
+        for i, data_dict in enumerate(dicts):
+            feature_contributions = {}
+            for j in np.flatnonzero(active[i]):
+                field_name = self._field_order[j]
+                feature_contributions[field_name] = {
+                    'value': data_dict[field_name],
+                    'threshold': self.thresholds[field_name],
+                    'weight': self.field_weights[f"{field_name}_activated"],
+                    'contribution': float(contributions[i, j])
+                }
+            
+            results.append(self._score_result(float(raw_scores[i]), int(active_counts[i]), feature_contributions))
+        
+        return results
+    
     def score_log_line(self, log_line):
         """
         Скоринг одной строки лога
@@ -228,7 +402,8 @@ class ScoringAPI:
         
         # Расчет скора
         result = self.calculate_score(data)
-        result['timestamp'] = datetime.now().isoformat()
+        if self._emit_timestamp:
+            result['timestamp'] = datetime.now().isoformat()
         result['parsed_fields'] = len(data)
         
         return result
@@ -243,22 +418,37 @@ class ScoringAPI:
         Returns:
             list: результаты скоринга для каждой строки
         """
+        parsed = [self.parse_log_line(line) for line in log_lines]
+        batch_results = iter(self.score_batch([data for data in parsed if data]))
+        
         results = []
         
-        for i, line in enumerate(log_lines):
-            result = self.score_log_line(line)
+        for i, data in enumerate(parsed):
+            if data:
+                result = next(batch_results)
+                if self._emit_timestamp:
+                    result['timestamp'] = datetime.now().isoformat()
+                result['parsed_fields'] = len(data)
+            else:
+                result = {'error': 'Не удалось распарсить строку', 'score': 0, 'confidence': 0}
             result['line_number'] = i + 1
             results.append(result)
         
         return results
     
-    def score_file(self, file_path, output_path=None):
+    def score_file(self, file_path, output_path=None, keep_results=False, include_contributions=False):
         """
-        Скоринг файла лога
+        Потоковый скоринг файла лога
+        
+        Результаты строк пишутся в output_path по мере чтения (JSONL, последняя
+        запись - сводка), статистика считается на лету - память не растет с
+        размером лога.
         
         Args:
             file_path: путь к файлу лога
-            output_path: путь для сохранения результатов
+            output_path: путь для сохранения результатов (JSONL)
+            keep_results: вернуть результаты строк в памяти
+            include_contributions: сохранять feature_contributions в результатах строк
             
         Returns:
             dict: сводные результаты
@@ -269,49 +459,77 @@ class ScoringAPI:
             return {'error': 'Файл не найден'}
         
         results = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
+        total_lines = 0
+        valid_lines = 0
+        high_score_lines = 0
+        low_score_lines = 0
+        score_sum = 0.0
+        confidence_sum = 0.0
+        max_score = -np.inf
+        min_score = np.inf
+        
+        output_file = open(output_path, 'w', encoding='utf-8') if output_path else nullcontext()
+        
+        with open(file_path, 'r', encoding='utf-8') as f, output_file as out:
             for line_num, line in enumerate(f, 1):
                 line = line.strip()
                 if not line:
                     continue
                 
-                result = self.score_log_line(line)
+                # score_log_line без лишнего вызова на каждую строку
+                data = self.parse_log_line(line)
+                if data:
+                    result = self.calculate_score(data)
+                    if self._emit_timestamp:
+                        result['timestamp'] = datetime.now().isoformat()
+                    result['parsed_fields'] = len(data)
+                else:
+                    result = {'error': 'Не удалось распарсить строку', 'score': 0, 'confidence': 0}
                 result['line_number'] = line_num
-                results.append(result)
-        
-        # Сводная статистика
-        valid_results = [r for r in results if 'error' not in r]
-        
-        if valid_results:
-            scores = [r['score'] for r in valid_results]
-            confidences = [r['confidence'] for r in valid_results]
+                if not include_contributions:
+                    result.pop('feature_contributions', None)
+                
+                # Сводная статистика по ходу чтения
+                total_lines += 1
+                if 'error' not in result:
+                    score = result['score']
+                    valid_lines += 1
+                    score_sum += score
+                    confidence_sum += result['confidence']
+                    max_score = max(max_score, score)
+                    min_score = min(min_score, score)
+                    if score > 0.7:
+                        high_score_lines += 1
+                    elif score < 0.3:
+                        low_score_lines += 1
+                
+                if out is not None:
+                    out.write(json.dumps(result, ensure_ascii=False) + '\n')
+                if keep_results:
+                    results.append(result)
             
-            summary = {
-                'total_lines': len(results),
-                'valid_lines': len(valid_results),
-                'avg_score': np.mean(scores),
-                'max_score': np.max(scores),
-                'min_score': np.min(scores),
-                'avg_confidence': np.mean(confidences),
-                'high_score_lines': len([s for s in scores if s > 0.7]),
-                'low_score_lines': len([s for s in scores if s < 0.3])
-            }
-        else:
-            summary = {'error': 'Нет валидных результатов'}
+            if valid_lines:
+                summary = {
+                    'total_lines': total_lines,
+                    'valid_lines': valid_lines,
+                    'avg_score': score_sum / valid_lines,
+                    'max_score': max_score,
+                    'min_score': min_score,
+                    'avg_confidence': confidence_sum / valid_lines,
+                    'high_score_lines': high_score_lines,
+                    'low_score_lines': low_score_lines
+                }
+            else:
+                summary = {'error': 'Нет валидных результатов'}
+            
+            if out is not None:
+                out.write(json.dumps({
+                    'summary': summary,
+                    'generation_time': datetime.now().isoformat(),
+                    'config_used': self.config
+                }, ensure_ascii=False) + '\n')
         
-        # Сохранение результатов
         if output_path:
-            output_data = {
-                'summary': summary,
-                'line_results': results,
-                'generation_time': datetime.now().isoformat(),
-                'config_used': self.config
-            }
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
-            
             print(f"💾 Результаты сохранены: {output_path}")
         
         print(f"✅ Скоринг завершен. Средний скор: {summary.get('avg_score', 0):.3f}")
@@ -384,7 +602,7 @@ class ScoringAPI:
         Returns:
             dict: данные для dashboard
         """
-        results = self.score_file(file_path)
+        results = self.score_file(file_path, keep_results=True, include_contributions=True)
         
         if 'error' in results:
             return results
@@ -429,6 +647,7 @@ class RealTimeScoringAPI(ScoringAPI):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._emit_timestamp = True
         self.recent_scores = []
         self.alert_threshold = 0.8
         self.max_history = 1000
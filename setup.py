@@ -92,7 +92,7 @@ matplotlib>=3.5.0
 seaborn>=0.11.0
 
 # Машинное обучение
-scikit-learn>=1.1.0
+scikit-learn>=1.2.0
 
 # Работа с конфигурацией
 PyYAML>=6.0
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+БЫСТРЫЙ ТЕСТ РЕЗЕРВНОГО ПАРСЕРА - ВЕКТОРНЫЙ РАЗБОР ПРОТИВ ПОСТРОЧНОГО ЭТАЛОНА
+"""
+
+import sys
+import os
+import re
+import tempfile
+import pandas as pd
+
+# Добавляем путь к папке с модулями
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from main import HonestDataDrivenAnalyzer
+    print("✅ ИМПОРТ АНАЛИЗАТОРА УСПЕШЕН")
+except ImportError as e:
+    print(f"❌ ОШИБКА ИМПОРТА: {e}")
+    sys.exit(1)
+
+CANDLE = "RED|-1.79%|11.5K|BIG_BODY|66%|-18.8%_24h|o:50254.8|h:50258.6|l:48888|c:49353.4|rng:1370.6"
+
+# Смешанный лог: штатные строки, некорректное время, повторы полей, сигналы '!',
+# значения с '%'/'σ', нечисловые значения, битые OHLC, комментарии и пустые строки
+MIXED_LOG = [
+    f"[2024-08-05T09:24:00.000+03:00]: LTF|event|1|2024-08-05 06:24|{CANDLE}|ef2--7.19|as2-3.33|nw2-!!|ze2--4.12",
+    f"[2024-08-05T09:25:00.000+03:00]: LTF|event|1|2024-08-05 06:25|{CANDLE}|ef2-1.5%|vc2-2.4σ|nw2-!!!|co2--213",
+    "# комментарий",
+    "",
+    f"LTF|event|1|2024-08-05 06:26|{CANDLE}|ef2-0.7|as2-1|as2-2|nw2-3%",
+    f"[не время]: LTF|event|1|2024-08-05 06:27|{CANDLE}|vc2-x|ro2-11%|so2-1.5σ",
+    "[2024-08-05T09:28:00.000+03:00]: LTF|event|1|o:1.2.3|h:2|l:1|c:1.5|rng:1|ef2-9",
+    "строка без разделителей",
+    f"[2024-08-05T09:29:00.000+03:00]: HTF|event|1|2024-08-05 06:29|{CANDLE}|ef1h--2.5|nw2-abc|ro2-!|ef2-4",
+    f"[2024-08-05T09:30:00.000+03:00]: LTF|event|1|2024-08-05 06:30|RED|-1%|7.5K|DOJI|10%|1%_24h|co2-5|co2-!!|vc2--0.25",
+    f"[2024-08-05T09:31:00.000+03:00]: LTF|event|1|2024-08-05 06:31|{CANDLE}|nw2-!|as2-1e3|ze2-.5",
+]
+
+def reference_parse_line(line, line_num):
+    """Эталон: построчный разбор резервного парсера до векторизации"""
+    parts = line.split('|')
+    if len(parts) < 3:
+        return None
+    
+    record = {'line_number': line_num}
+    
+    timestamp_match = re.search(r'\[([^\]]+)\]', line)
+    if timestamp_match:
+        record['timestamp'] = timestamp_match.group(1)
+    
+    ohlc_match = re.search(r'o:([0-9.]+).*?h:([0-9.]+).*?l:([0-9.]+).*?c:([0-9.]+)', line)
+    if ohlc_match:
+        record['open'] = float(ohlc_match.group(1))
+        record['high'] = float(ohlc_match.group(2))
+        record['low'] = float(ohlc_match.group(3))
+        record['close'] = float(ohlc_match.group(4))
+    
+    volume_match = re.search(r'\|([0-9.]+K)\|', line)
+    if volume_match:
+        record['volume'] = float(volume_match.group(1).replace('K', '')) * 1000
+    
+    rng_match = re.search(r'rng:([0-9.]+)', line)
+    if rng_match:
+        record['range'] = float(rng_match.group(1))
+    
+    for field_name, field_value in re.findall(r'([a-zA-Z]+\d+)-([^,|]+)', line):
+        if field_name.startswith('nw'):
+            exclamation_count = field_value.count('!')
+            if exclamation_count > 0:
+                record[field_name] = exclamation_count
+                record[f"{field_name}_signal"] = field_value
+            else:
+                try:
+                    record[field_name] = float(field_value.replace('%', ''))
+                except ValueError:
+                    record[field_name] = 0
+        else:
+            try:
+                record[field_name] = float(field_value.replace('%', '').replace('σ', ''))
+            except ValueError:
+                record[field_name] = 0
+    
+    return record
+
+def reference_parse(lines):
+    """Эталонный DataFrame: строки с ошибкой разбора отбрасываются целиком"""
+    data = []
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            try:
+                record = reference_parse_line(line, i)
+                if record:
+                    data.append(record)
+            except ValueError:
+                continue
+    return pd.DataFrame(data)
+
+def test_fallback_matches_reference():
+    """Векторный резервный парсер совпадает с построчным при любых границах блоков"""
+    
+    print(f"\n🧪 ТЕСТ РЕЗЕРВНОГО ПАРСЕРА")
+    print("=" * 40)
+    
+    expected = reference_parse(MIXED_LOG)
+    analyzer = HonestDataDrivenAnalyzer()
+    analyzer.config.setdefault('performance', {})['n_jobs'] = 2
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_file = os.path.join(tmp_dir, "mixed_log.txt")
+        with open(log_file, 'w', encoding='utf-8') as f:
+            f.write("\n".join(MIXED_LOG) + "\n")
+        
+        # Блок больше файла, блоки по несколько строк и по одной строке
+        for chunk_bytes in (1 << 20, 300, 1):
+            assert analyzer._fallback_parse_log_file(log_file, chunk_bytes=chunk_bytes), \
+                f"разбор не удался (блок {chunk_bytes} байт)"
+            pd.testing.assert_frame_equal(analyzer.parsed_data, expected)
+            print(f"   ✅ блок {chunk_bytes} байт: {len(expected)} записей, {len(expected.columns)} колонок")
+        
+        # Потоковый разбор: те же записи по блокам
+        streamed = pd.concat(list(analyzer.iter_log_chunks(log_file, chunk_bytes=300)), ignore_index=True)
+        pd.testing.assert_frame_equal(streamed, expected)
+        print("   ✅ iter_log_chunks совпадает с эталоном")
+
+if __name__ == "__main__":
+    print("🚀 БЫСТРЫЙ ТЕСТ РЕЗЕРВНОГО ПАРСЕРА")
+    print("=" * 50)
+    
+    try:
+        test_fallback_matches_reference()
+        passed = True
+    except AssertionError as e:
+        print(f"   ❌ {e}")
+        passed = False
+    
+    print(f"\n🏆 ИТОГОВЫЙ РЕЗУЛЬТАТ: {'✅ ПРОЙДЕН' if passed else '❌ ПРОВАЛЕН'}")
@@ -127,6 +127,27 @@ def test_file_parsing():
     
     return found_critical >= 4
 
+def test_template_cache():
+    """Кэш шаблонов: строки с одинаковым ключом и разными именами полей (as5 / as15)"""
+    
+    print(f"\n🧩 ТЕСТ КЭША ШАБЛОНОВ")
+    print("=" * 40)
+    
+    prefix = "[2024-08-05T09:24:00.000+03:00]: LTF|event|1|o:1|h:1|l:1|c:1|"
+    
+    # Один парсер на обе строки: без цифр заголовки совпадают ('...|as-')
+    parser = AdvancedLogParser()
+    first = parser._parse_single_line(prefix + "as-3|as5-1", 0)
+    second = parser._parse_single_line(prefix + "as5-3|as15-1", 1)
+    
+    print(f"   первая строка: as5={first.get('as5')}")
+    print(f"   вторая строка: as5={second.get('as5')}, as15={second.get('as15')}")
+    
+    assert first.get('as5') == 1.0, f"as5 в первой строке: {first.get('as5')}"
+    assert second.get('as5') == 3.0, f"as5 потерян во второй строке: {second.get('as5')}"
+    assert second.get('as15') == 1.0, f"as15 во второй строке: {second.get('as15')}"
+    print("   ✅ поля второй строки не потеряны")
+
 if __name__ == "__main__":
     print("🚀 БЫСТРЫЙ ТЕСТ ПАРСЕРА")
     print("=" * 50)
@@ -137,11 +158,20 @@ if __name__ == "__main__":
     # Тест 2: парсинг файла  
     test2_passed = test_file_parsing()
     
+    # Тест 3: кэш шаблонов строк
+    try:
+        test_template_cache()
+        test3_passed = True
+    except AssertionError as e:
+        print(f"   ❌ {e}")
+        test3_passed = False
+    
     print(f"\n🏆 ИТОГОВЫЙ РЕЗУЛЬТАТ:")
     print(f"   Тест строки: {'✅ ПРОЙДЕН' if test1_passed else '❌ ПРОВАЛЕН'}")
     print(f"   Тест файла: {'✅ ПРОЙДЕН' if test2_passed else '❌ ПРОВАЛЕН'}")
+    print(f"   Тест кэша шаблонов: {'✅ ПРОЙДЕН' if test3_passed else '❌ ПРОВАЛЕН'}")
     
-    if test1_passed and test2_passed:
+    if test1_passed and test2_passed and test3_passed:
         print(f"\n🎉 ПАРСЕР РАБОТАЕТ ПРАВИЛЬНО!")
         print(f"   Можно запускать скальп анализатор")
     else: